@@ -0,0 +1,53 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# atomic_file.py                            #
+# ######################################### #
+
+from contextlib import contextmanager, suppress
+from typing import IO, Iterator
+import os
+import stat
+import tempfile
+
+
+@contextmanager
+def atomic_write(path: str | os.PathLike, mode: str = "wb", durable: bool = True) -> Iterator[IO]:
+    """Open a temporary file that replaces ``path`` when the block succeeds.
+
+    The data is flushed to disk before the rename, so a crash leaves either
+    the old or the new content but never a truncated file. Pass ``durable``
+    false to skip the flush for data that can be made again: readers still
+    never see a partial file, but a crash may leave an empty one.
+    """
+    path = os.fspath(path)
+    fd, tmp = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)), prefix=".", suffix=".tmp"
+    )
+    try:
+        try:
+            os.chmod(tmp, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        encoding = None if "b" in mode else "utf-8"
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+
+
+def write_atomic(path: str | os.PathLike, data: bytes, durable: bool = True) -> None:
+    """Replace the content of ``path`` with ``data`` atomically, see :func:`atomic_write`."""
+    with atomic_write(path, durable=durable) as f:
+        f.write(data)
@@ -0,0 +1,151 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# audio_bundle.py                           #
+# ######################################### #
+
+"""Single-file bundle of rendered utterances.
+
+Layout, all integers little endian::
+
+    header   magic "ESTB", version u16, reserved u16, count u32, data offset u64
+    index    count entries of: id u32, sample rate u32, offset u64,
+             length u64, content key 32 bytes (sha256)
+    data     16 bit mono PCM of every utterance, each starting on a
+             16 byte boundary
+
+The reader only needs the standard library, so the module can be copied to
+a device that plays the bundle without espeak-ng.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+import mmap
+import struct
+import sys
+
+MAGIC = b"ESTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ")
+ENTRY = struct.Struct("<IIQQ32s")
+ALIGNMENT = 16
+
+
+@dataclass(frozen=True)
+class BundleEntry:
+    """Where the audio of one preset lies in the bundle."""
+
+    id: int
+    sample_rate: int
+    offset: int
+    length: int
+    key: str
+
+    @property
+    def duration(self) -> float:
+        return self.length / 2 / self.sample_rate if self.sample_rate else 0.0
+
+
+def _align(position: int) -> int:
+    return -position % ALIGNMENT
+
+
+def write_bundle(out, utterances: Iterable[tuple[int, int, bytes, str]]) -> int:
+    """Write ``(id, sample_rate, pcm, key)`` utterances to the binary file ``out``.
+
+    Utterances with the same key are stored once and their entries point to
+    the same samples. Return the number of utterances written.
+    """
+    utterances = list(utterances)
+    data_offset = HEADER.size + ENTRY.size * len(utterances)
+    data_offset += _align(data_offset)
+    out.write(HEADER.pack(MAGIC, VERSION, 0, len(utterances), data_offset))
+    offset = data_offset
+    offsets: dict[str, int] = {}
+    stored: list[bytes] = []
+    for preset_id, sample_rate, pcm, key in utterances:
+        if key not in offsets:
+            offsets[key] = offset
+            stored.append(pcm)
+            offset += len(pcm) + _align(len(pcm))
+        out.write(ENTRY.pack(preset_id, sample_rate, offsets[key], len(pcm), bytes.fromhex(key)))
+    out.write(b"\0" * _align(HEADER.size + ENTRY.size * len(utterances)))
+    for pcm in stored:
+        out.write(pcm)
+        out.write(b"\0" * _align(len(pcm)))
+    return len(utterances)
+
+
+class AudioBundle:
+    """Memory-mapped reader of a bundle written by :func:`write_bundle`.
+
+    :meth:`pcm` returns views into the mapping, so no audio is copied until
+    it is written somewhere. Release the views before calling :meth:`close`.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = str(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, version, _, count, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not an audio bundle")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported bundle version {version}")
+        self._entries: dict[int, BundleEntry] = {}
+        self._by_key: dict[str, int] = {}
+        for index in range(count):
+            preset_id, sample_rate, offset, length, key = ENTRY.unpack_from(
+                self._map, HEADER.size + index * ENTRY.size
+            )
+            if offset + length > len(self._map):
+                self.close()
+                raise ValueError(f"{self.path} is truncated")
+            entry = BundleEntry(preset_id, sample_rate, offset, length, key.hex())
+            self._entries[preset_id] = entry
+            self._by_key.setdefault(entry.key, preset_id)
+
+    def __enter__(self) -> "AudioBundle":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, preset_id: int) -> bool:
+        return preset_id in self._entries
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._entries)
+
+    def entry(self, preset_id: int) -> BundleEntry:
+        return self._entries[preset_id]
+
+    def find(self, key: str) -> int | None:
+        """Return the id of the utterance with content ``key``, if any."""
+        return self._by_key.get(key)
+
+    def pcm(self, preset_id: int) -> memoryview:
+        """Return the PCM bytes of ``preset_id`` without copying them."""
+        entry = self._entries[preset_id]
+        return self._view[entry.offset:entry.offset + entry.length]
+
+    def samples(self, preset_id: int) -> memoryview:
+        """Return the samples of ``preset_id`` as 16 bit integers, without copying."""
+        if sys.byteorder != "little":
+            raise NotImplementedError("Sample views require a little endian machine")
+        return self.pcm(preset_id).cast("h")
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
+            self._map = None
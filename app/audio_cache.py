@@ -0,0 +1,166 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# audio_cache.py                            #
+# ######################################### #
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+
+from app.atomic_file import write_atomic
+from app.command_builder import EspeakParameters, normalize_parameters
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "estui", "audio")
+DEFAULT_CACHE_SIZE_MB = 64
+
+
+def content_key(params: EspeakParameters, fingerprint: str = "") -> str:
+    """Return the content address of ``params`` rendered by ``fingerprint``.
+
+    Parameters are normalized first, so presets written differently but
+    spoken the same share their audio.
+    """
+    payload = json.dumps(
+        {"params": asdict(normalize_parameters(params)), "engine": fingerprint},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Disk-backed, size-bounded LRU cache of synthesized WAV files.
+
+    Entries are addressed by :meth:`key_for`, a hash of the synthesis
+    parameters and of the engine ``fingerprint``, which may be a future
+    still being computed. The least recently used
+    entries are removed once the total size exceeds ``max_bytes``.
+
+    :meth:`get` and :meth:`put` touch the disk and may be called from worker
+    threads. Entries are not synced to disk, since they can be rendered
+    again; one left empty by a crash is dropped on the next start.
+    """
+
+    SUFFIX = ".wav"
+
+    def __init__(self, directory: str, max_bytes: int, fingerprint: "str | Future[str]" = "") -> None:
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _scan(self) -> None:
+        """Rebuild the LRU order from the files already on disk."""
+        found = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                st = path.stat()
+                if not st.st_size:
+                    path.unlink()
+                    continue
+            except OSError:
+                continue
+            found.append((st.st_mtime_ns, path.stem, st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._size += size
+        self.evict()
+
+    @property
+    def fingerprint(self) -> str:
+        """The engine fingerprint, waited for on first use if still computed."""
+        if isinstance(self._fingerprint, Future):
+            self._fingerprint = self._fingerprint.result()
+        return self._fingerprint
+
+    def key_for(self, params: EspeakParameters) -> str:
+        """Return the content address of ``params`` for this engine."""
+        return content_key(params, self.fingerprint)
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Path | None:
+        """Return the cached file for ``key`` or ``None`` on a miss."""
+        path = self.path_for(key)
+        exists = path.exists()
+        with self._lock:
+            if key not in self._entries or not exists:
+                self._forget(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)  # persist recency across restarts
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, data: bytes) -> Path:
+        """Store ``data`` under ``key`` and return the path of the entry."""
+        path = self.path_for(key)
+        write_atomic(path, data, durable=False)
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(data)
+            self._size += len(data)
+            self._evict()
+        return path
+
+    def evict(self) -> None:
+        """Remove least recently used entries until within ``max_bytes``.
+
+        The most recent entry is always kept so that a freshly stored file
+        can be played even when it is larger than the whole cache.
+        """
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        while len(self._entries) > 1 and self._size > self.max_bytes:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                self.path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _forget(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    def stats(self) -> dict:
+        """Return counters describing the cache usage."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
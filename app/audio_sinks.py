@@ -0,0 +1,132 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# audio_sinks.py                            #
+# ######################################### #
+
+import asyncio
+import contextlib
+import shlex
+
+from app.defaults import Defaults
+
+WAV_HEADER_SIZE = 44
+
+
+class AudioSink:
+    """Destination of the WAV stream of one utterance at a time.
+
+    :meth:`open` is called before the first chunk of every utterance and
+    :meth:`close` after the last one. :meth:`abort` replaces :meth:`close`
+    when the utterance is cancelled.
+    """
+
+    async def open(self) -> None:
+        pass
+
+    async def write(self, chunk: bytes) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    async def abort(self) -> None:
+        await self.close()
+
+
+class NullSink(AudioSink):
+    """Discard the audio, only counting what was received."""
+
+    def __init__(self) -> None:
+        self.chunks = 0
+        self.bytes = 0
+
+    async def write(self, chunk: bytes) -> None:
+        self.chunks += 1
+        self.bytes += len(chunk)
+
+
+class FileSink(AudioSink):
+    """Append the raw PCM samples of every utterance to ``path``.
+
+    The WAV header of each utterance is dropped so that the file, or a named
+    pipe, carries one continuous 16 bit mono stream. Opening and writing may
+    block until a pipe has a reader, so they run in a thread.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = None
+        self._header_left = 0
+
+    async def open(self) -> None:
+        self._file = await asyncio.to_thread(open, self.path, "ab")
+        self._header_left = WAV_HEADER_SIZE
+
+    async def write(self, chunk: bytes) -> None:
+        if self._header_left:
+            skipped = min(self._header_left, len(chunk))
+            self._header_left -= skipped
+            chunk = chunk[skipped:]
+        if chunk:
+            await asyncio.to_thread(self._write, self._file, chunk)
+
+    @staticmethod
+    def _write(file, chunk: bytes) -> None:
+        file.write(chunk)
+        file.flush()
+
+    async def close(self) -> None:
+        if self._file is not None:
+            file, self._file = self._file, None
+            await asyncio.to_thread(file.close)
+
+
+class PlayerSink(AudioSink):
+    """Feed the stream to a local player process reading from stdin."""
+
+    def __init__(self, player: str = Defaults.PLAYER) -> None:
+        self.player = player
+        self._process: asyncio.subprocess.Process | None = None
+
+    async def open(self) -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            *shlex.split(self.player), stdin=asyncio.subprocess.PIPE
+        )
+
+    async def write(self, chunk: bytes) -> None:
+        assert self._process is not None and self._process.stdin is not None
+        self._process.stdin.write(chunk)
+        await self._process.stdin.drain()
+
+    async def close(self) -> None:
+        if self._process is not None:
+            self._process.stdin.close()
+            await self._process.wait()
+            self._process = None
+
+    async def abort(self) -> None:
+        if self._process is not None:
+            with contextlib.suppress(ProcessLookupError):
+                self._process.kill()
+            await self._process.wait()
+            self._process = None
+
+
+SINKS = ("player", "file", "null")
+
+
+def create_sink(name: str, player: str = Defaults.PLAYER, path: str | None = None) -> AudioSink:
+    """Return a new sink given one of the names in :data:`SINKS`."""
+    if name == "player":
+        return PlayerSink(player)
+    if name == "file":
+        if not path:
+            raise ValueError("The file sink requires a path")
+        return FileSink(path)
+    if name == "null":
+        return NullSink()
+    raise ValueError(f"Unknown sink: {name}")
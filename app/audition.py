@@ -0,0 +1,222 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# audition.py                               #
+# ######################################### #
+
+from dataclasses import replace
+from functools import partial
+from itertools import product
+from typing import Callable
+import asyncio
+import os
+
+from textual import on
+from textual.app import ComposeResult
+from textual.containers import Grid, Horizontal, Vertical, VerticalScroll
+from textual.screen import ModalScreen
+from textual.widgets import Button, Input, Static
+
+from app.command_builder import EspeakParameters
+from app.playback import PlaybackScheduler
+
+AUDITION_WORKERS = os.cpu_count() or 2
+MAX_CELLS = 100
+DEFAULT_STEP = 10
+
+
+def parse_sweep(spec: str) -> list[str]:
+    """Return the values listed by ``spec``.
+
+    ``spec`` is a comma separated list of numbers and ranges written
+    ``start-stop:step`` (both ends included, the step defaults to 10), e.g.
+    ``140-220:20`` or ``50,60-80:5``. An empty spec gives no values.
+    """
+    values: list[str] = []
+    for item in spec.replace(" ", "").split(","):
+        if not item:
+            continue
+        bounds, _, step = item.partition(":")
+        start, dash, stop = bounds.partition("-")
+        try:
+            if not dash:
+                if step:
+                    raise ValueError
+                values.append(str(int(start)))
+                continue
+            first, last = int(start), int(stop)
+            increment = int(step) if step else DEFAULT_STEP
+        except ValueError:
+            raise ValueError(f"Invalid sweep: {item}") from None
+        if increment <= 0 or last < first:
+            raise ValueError(f"Invalid sweep: {item}")
+        values.extend(str(value) for value in range(first, last + 1, increment))
+    return list(dict.fromkeys(values))
+
+
+def parse_voices(spec: str) -> list[str]:
+    """Return the comma separated voices of ``spec``, without duplicates."""
+    return list(dict.fromkeys(voice for voice in spec.replace(" ", "").split(",") if voice))
+
+
+def audition_parameters(
+    base: EspeakParameters,
+    voices: list[str],
+    speeds: list[str],
+    pitches: list[str],
+) -> list[EspeakParameters]:
+    """Return ``base`` with every combination of voice, pitch and speed.
+
+    Empty lists keep the value of ``base``. Combinations are ordered by
+    voice, then pitch, then speed, the order of the cells of the grid.
+    """
+    return [
+        replace(base, voice=voice, pitch=pitch, speed=speed)
+        for voice, pitch, speed in product(
+            voices or [base.voice], pitches or [base.pitch], speeds or [base.speed]
+        )
+    ]
+
+
+async def render_all(
+    playback: PlaybackScheduler,
+    cells: list[EspeakParameters],
+    workers: int = AUDITION_WORKERS,
+    done: Callable[[int, Exception | None], None] | None = None,
+) -> None:
+    """Render ``cells`` into the audio cache, at most ``workers`` at a time.
+
+    ``done`` is called with the index of every cell as it completes, and the
+    exception if it failed.
+    """
+    semaphore = asyncio.Semaphore(workers)
+
+    async def render(index: int, params: EspeakParameters) -> None:
+        async with semaphore:
+            try:
+                await playback.render(params)
+            except Exception as exc:
+                if done is not None:
+                    done(index, exc)
+                return
+        if done is not None:
+            done(index, None)
+
+    await asyncio.gather(*(render(index, params) for index, params in enumerate(cells)))
+
+
+class AuditionScreen(ModalScreen[None]):
+    """Grid of the current text spoken with several voices, speeds and pitches.
+
+    Every combination is rendered into the audio cache in parallel; a cell
+    becomes playable as soon as its audio is ready.
+    """
+
+    BINDINGS = [("escape", "close", "Close")]
+
+    def __init__(self, base: EspeakParameters, workers: int = AUDITION_WORKERS) -> None:
+        super().__init__()
+        self.base = base
+        self.render_workers = workers
+        self.cells: list[EspeakParameters] = []
+        self.ready = 0
+        # bumped by every render, so callbacks of an older grid are ignored
+        self.generation = 0
+
+    def compose(self) -> ComposeResult:
+        with Vertical(id="audition"):
+            yield Static(f"Audition: {self.base.text}", id="audition-title")
+            with Horizontal(id="audition-controls"):
+                yield Input(self.base.voice, placeholder="Voices: it,en+f1", id="audition-voices")
+                yield Input(self.base.speed, placeholder="Speeds: 140-220:20", id="audition-speeds")
+                yield Input(self.base.pitch, placeholder="Pitches: 40,50,60", id="audition-pitches")
+                yield Button("Render", id="audition-render")
+                yield Button("Close", id="audition-close")
+            yield Static("", id="audition-status")
+            with VerticalScroll(id="audition-scroll"):
+                yield Grid(id="audition-grid")
+
+    def on_mount(self) -> None:
+        self.set_focus(self.query_one("#audition-speeds", Input))
+
+    def action_close(self) -> None:
+        self.dismiss()
+
+    @on(Button.Pressed, "#audition-close")
+    def close_pressed(self) -> None:
+        self.dismiss()
+
+    @on(Input.Submitted)
+    @on(Button.Pressed, "#audition-render")
+    async def render_grid(self) -> None:
+        """Lay out the cells of the requested sweep and render them."""
+        status = self.query_one("#audition-status", Static)
+        try:
+            voices = parse_voices(self.query_one("#audition-voices", Input).value)
+            speeds = parse_sweep(self.query_one("#audition-speeds", Input).value)
+            pitches = parse_sweep(self.query_one("#audition-pitches", Input).value)
+        except ValueError as exc:
+            status.update(str(exc))
+            return
+        catalog = self.app.voice_catalog
+        unknown = [voice for voice in voices if catalog is not None and not catalog.is_valid(voice)]
+        if unknown:
+            status.update(f"Unknown voice: {', '.join(unknown)}")
+            return
+        cells = audition_parameters(self.base, voices, speeds, pitches)
+        if len(cells) > MAX_CELLS:
+            status.update(f"{len(cells)} combinations, at most {MAX_CELLS} can be auditioned")
+            return
+        self.workers.cancel_group(self, "audition")
+        self.generation += 1
+        generation = self.generation
+        self.cells = cells
+        self.ready = 0
+        columns = len(speeds) or 1
+        grid = self.query_one("#audition-grid", Grid)
+        grid.styles.grid_size_columns = columns + 1
+        await grid.remove_children()
+        if generation != self.generation:
+            return
+        widgets = [Static("")]
+        widgets.extend(Static(params.speed, classes="audition-header") for params in cells[:columns])
+        for index, params in enumerate(cells):
+            if index % columns == 0:
+                widgets.append(Static(f"{params.voice} p{params.pitch}", classes="audition-header"))
+            widgets.append(Button(params.speed, id=f"cell-{index}", classes="audition-cell", disabled=True))
+        await grid.mount_all(widgets)
+        if generation != self.generation:
+            return
+        self.update_status()
+        self.run_worker(
+            render_all(self.app.playback, cells, self.render_workers, partial(self.cell_done, generation)),
+            group="audition",
+            exclusive=True,
+        )
+
+    def cell_done(self, generation: int, index: int, error: Exception | None) -> None:
+        if generation != self.generation:
+            return
+        cell = self.query_one(f"#cell-{index}", Button)
+        if error is not None:
+            cell.label = "failed"
+            cell.variant = "error"
+            cell.tooltip = str(error)
+        else:
+            cell.disabled = False
+            cell.variant = "success"
+            self.ready += 1
+        self.update_status()
+
+    def update_status(self) -> None:
+        self.query_one("#audition-status", Static).update(
+            f"Rendered {self.ready}/{len(self.cells)}, select a cell to play it"
+        )
+
+    @on(Button.Pressed, ".audition-cell")
+    def play_cell(self, event: Button.Pressed) -> None:
+        index = int(event.button.id.removeprefix("cell-"))
+        self.app.playback.enqueue(self.cells[index])
@@ -0,0 +1,237 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# batch_render.py                           #
+# ######################################### #
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from app.atomic_file import atomic_write, write_atomic
+from app.audio_bundle import write_bundle
+from app.audio_cache import content_key
+from app.bulk_compose import SanitizeReport, sanitize_presets
+from app.command_builder import EspeakParameters
+from app.engines import SynthesisEngine, create_engine
+from app.preset_store import JsonlPresetStore, load_presets
+from app.wav import split_wav
+
+MANIFEST_NAME = "manifest.json"
+
+_worker_engine: SynthesisEngine | None = None
+
+
+@dataclass
+class RenderReport:
+    """Summary of a :func:`render_document` run."""
+
+    rendered: int = 0
+    skipped: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    """Make ``dst`` a hard link to ``src``, copying when links are unsupported."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _init_worker(engine_name: str, engine_options: dict) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(engine_name, **engine_options)
+
+
+def _render_one(params: EspeakParameters, path: str) -> None:
+    assert _worker_engine is not None
+    write_atomic(Path(path), _worker_engine.synthesize_blocking(params))
+
+
+def _load_manifest(out_dir: Path) -> dict[str, str]:
+    try:
+        with open(out_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def render_document(
+    doc_path: str,
+    out_dir: str,
+    jobs: int | None = None,
+    engine_name: str = "subprocess",
+    out: TextIO = sys.stdout,
+    engine_options: dict | None = None,
+) -> RenderReport:
+    """Write one WAV file per preset of ``doc_path`` into ``out_dir``.
+
+    Presets are rendered by a pool of ``jobs`` worker processes. A manifest
+    records the content key of every file, so files whose preset did not
+    change are skipped and moved presets reuse the audio already on disk.
+    Identical presets are rendered once and their files are hard links to
+    the same audio.
+    ``engine_options`` are passed to :func:`create_engine` in every worker.
+    """
+    engine_options = engine_options or {}
+    start = time.perf_counter()
+    report = RenderReport()
+    target = Path(out_dir)
+    target.mkdir(parents=True, exist_ok=True)
+    presets = load_presets(doc_path)
+    engine = create_engine(engine_name, **engine_options)
+    fingerprint = engine.fingerprint()
+    engine.close()
+
+    old_manifest = _load_manifest(target)
+    existing = {
+        key: target / name
+        for name, key in old_manifest.items()
+        if (target / name).exists()
+    }
+    manifest: dict[str, str] = {}
+    reused: list[tuple[Path, str]] = []
+    # identical presets are rendered once and share the file
+    pending: dict[str, tuple[EspeakParameters, list[Path]]] = {}
+    width = max(5, len(str(len(presets))))
+    sanitized = SanitizeReport()
+    try:
+        for index, params in enumerate(sanitize_presets(presets, sanitized)):
+            key = content_key(params, fingerprint)
+            name = f"{index:0{width}d}.wav"
+            path = target / name
+            if old_manifest.get(name) == key and path.exists():
+                report.skipped += 1
+                manifest[name] = key
+            elif key in existing:
+                reused.append((path, key))
+            elif key in pending:
+                pending[key][1].append(path)
+            else:
+                pending[key] = (params, [path])
+    finally:
+        if isinstance(presets, JsonlPresetStore):
+            presets.close()
+
+    # Reordered presets reuse audio already on disk. The sources are staged
+    # first because the files they are copied to may be sources themselves.
+    with tempfile.TemporaryDirectory(dir=target) as staging:
+        staged: dict[str, Path] = {}
+        for _, key in reused:
+            if key not in staged:
+                staged[key] = Path(staging) / f"{key}.wav"
+                _link_or_copy(existing[key], staged[key])
+        for index, (path, key) in enumerate(reused):
+            placed = Path(staging) / f"{index}.tmp"
+            _link_or_copy(staged[key], placed)
+            os.replace(placed, path)
+            report.skipped += 1
+            manifest[path.name] = key
+    # Outdated files are removed so that a failed render leaves no stale audio.
+    for name in old_manifest:
+        if name not in manifest:
+            (target / name).unlink(missing_ok=True)
+
+    total = len(pending)
+    shared = sum(len(paths) - 1 for _, paths in pending.values())
+    print(
+        f"{len(presets)} presets, {report.skipped} up to date, {total} to render"
+        + (f", {shared} identical to another" if shared else ""),
+        file=out,
+    )
+    if sanitized.changed:
+        print(
+            f"Control characters removed from the text of {len(sanitized.changed)} presets",
+            file=out,
+        )
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(engine_name, engine_options)
+        ) as pool:
+            futures = {
+                pool.submit(_render_one, params, str(paths[0])): (paths, key)
+                for key, (params, paths) in pending.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                paths, key = futures[future]
+                try:
+                    future.result()
+                except Exception as exc:
+                    report.failed += len(paths)
+                    print(f"[{done}/{total}] {paths[0].name} failed: {exc}", file=out)
+                    continue
+                for path in paths[1:]:
+                    path.unlink(missing_ok=True)
+                    _link_or_copy(paths[0], path)
+                for path in paths:
+                    manifest[path.name] = key
+                report.rendered += len(paths)
+                print(f"[{done}/{total}] {', '.join(path.name for path in paths)}", file=out)
+
+    write_atomic(
+        target / MANIFEST_NAME,
+        json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"),
+    )
+    report.seconds = time.perf_counter() - start
+    rate = report.rendered / report.seconds if report.seconds else 0.0
+    print(
+        f"Rendered {report.rendered}, skipped {report.skipped}, failed {report.failed} "
+        f"in {report.seconds:.2f}s ({rate:.1f} presets/s)",
+        file=out,
+    )
+    return report
+
+
+def pack_bundle(render_dir: str, bundle_path: str) -> int:
+    """Pack the WAV files listed in the manifest of ``render_dir`` into a bundle.
+
+    Each utterance is stored under the position of its preset in the
+    document; identical presets share their samples. Return the number of
+    utterances packed.
+    """
+    source = Path(render_dir)
+    utterances = []
+    audio: dict[str, tuple[int, bytes]] = {}
+    for name, key in sorted(_load_manifest(source).items()):
+        if key not in audio:
+            audio[key] = split_wav((source / name).read_bytes())
+        sample_rate, pcm = audio[key]
+        utterances.append((int(Path(name).stem), sample_rate, pcm, key))
+    with atomic_write(bundle_path) as f:
+        return write_bundle(f, utterances)
+
+
+def export_bundle(
+    doc_path: str,
+    bundle_path: str,
+    jobs: int | None = None,
+    engine_name: str = "subprocess",
+    out: TextIO = sys.stdout,
+    engine_options: dict | None = None,
+    render_dir: str | None = None,
+) -> RenderReport:
+    """Render ``doc_path`` and pack its audio into the bundle ``bundle_path``.
+
+    The WAV files are kept in ``render_dir`` when given, so that exporting
+    again only renders the presets that changed; a temporary directory is
+    used otherwise.
+    """
+    with tempfile.TemporaryDirectory() as scratch:
+        target = render_dir or scratch
+        report = render_document(doc_path, target, jobs, engine_name, out, engine_options)
+        count = pack_bundle(target, bundle_path)
+    size = os.path.getsize(bundle_path)
+    print(f"Packed {count} utterances into {bundle_path} ({size} bytes)", file=out)
+    return report
@@ -0,0 +1,54 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# bulk_compose.py                           #
+# ######################################### #
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from app.command_builder import CONTROL_CHARACTERS, EspeakParameters, compose_args
+from app.defaults import Defaults
+from app.presets import MessagePreset
+
+
+@dataclass
+class SanitizeReport:
+    """Presets seen by :func:`sanitize_presets`, filled in as it is consumed."""
+
+    total: int = 0
+    # positions of the presets whose text had characters removed
+    changed: list[int] = field(default_factory=list)
+
+
+def sanitize_presets(
+    presets: Iterable[MessagePreset], report: SanitizeReport | None = None
+) -> Iterator[EspeakParameters]:
+    """Yield the synthesis parameters of every preset, with sanitized text.
+
+    Presets are read one at a time, so a whole document is never copied.
+    """
+    table = CONTROL_CHARACTERS
+    for index, preset in enumerate(presets):
+        text = preset.text
+        clean = text.translate(table)
+        if report is not None:
+            report.total = index + 1
+            if len(clean) != len(text):
+                report.changed.append(index)
+        yield EspeakParameters(
+            clean, preset.voice, preset.speed, preset.pitch, preset.volume, preset.word_gap
+        )
+
+
+def compose_presets(
+    presets: Iterable[MessagePreset],
+    executable: str = Defaults.ESPEAK,
+    report: SanitizeReport | None = None,
+) -> Iterator[list[str]]:
+    """Yield the ``espeak-ng`` argument list of every preset, with sanitized text."""
+    for params in sanitize_presets(presets, report):
+        yield compose_args(params, executable)
@@ -0,0 +1,139 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# chunked_synthesis.py                      #
+# ######################################### #
+
+from array import array
+from contextlib import aclosing
+from dataclasses import replace
+from typing import AsyncIterator
+import asyncio
+import re
+import sys
+
+from app.audio_sinks import AudioSink, PlayerSink
+from app.command_builder import EspeakParameters
+from app.engines import StreamingEngine, SynthesisEngine
+from app.wav import pcm_to_wav, split_wav, wav_header
+
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+FADE_SAMPLES = 64
+
+
+def split_sentences(text: str, max_chars: int = 200, min_chars: int = 20) -> list[str]:
+    """Split ``text`` into sentences, and overly long sentences into clauses.
+
+    Pieces shorter than ``min_chars`` are merged with the following one so
+    that very short fragments do not cost a synthesis of their own.
+    """
+    pieces: list[str] = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        if len(sentence) > max_chars:
+            pieces.extend(CLAUSE_END.split(sentence))
+        elif sentence:
+            pieces.append(sentence)
+    chunks: list[str] = []
+    pending = ""
+    for piece in pieces:
+        pending = f"{pending} {piece}" if pending else piece
+        if len(pending) >= min_chars:
+            chunks.append(pending)
+            pending = ""
+    if pending:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+    return chunks
+
+
+def fade_edges(pcm: bytes, fade_in: bool, fade_out: bool) -> bytes:
+    """Ramp the first and last samples of ``pcm`` to avoid clicks at joins."""
+    samples = array("h", pcm)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    n = min(FADE_SAMPLES, len(samples) // 2)
+    for i in range(n):
+        if fade_in:
+            samples[i] = samples[i] * i // n
+        if fade_out:
+            samples[-1 - i] = samples[-1 - i] * i // n
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+class ChunkedSynthesizer:
+    """Synthesize long texts sentence by sentence on a pool of workers.
+
+    Up to ``workers`` chunks render concurrently while the results are
+    consumed strictly in order, so playback starts with the first sentence.
+    Chunks are joined sample-exactly with short fades at the boundaries.
+    """
+
+    def __init__(self, engine: SynthesisEngine, workers: int) -> None:
+        self.engine = engine
+        self.workers = workers
+
+    def applies(self, params: EspeakParameters) -> bool:
+        """Return ``True`` if ``params`` is long enough to be split."""
+        return len(split_sentences(params.text)) > 1
+
+    async def pcm_chunks(self, params: EspeakParameters) -> AsyncIterator[tuple[int, bytes]]:
+        """Yield ``(sample_rate, pcm)`` for every chunk of ``params`` in order."""
+        texts = split_sentences(params.text)
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def render(text: str) -> tuple[int, bytes]:
+            async with semaphore:
+                return split_wav(await self.engine.synthesize(replace(params, text=text)))
+
+        tasks = [asyncio.create_task(render(text)) for text in texts]
+        try:
+            sample_rate = None
+            last = len(tasks) - 1
+            for index, task in enumerate(tasks):
+                rate, pcm = await task
+                if sample_rate is not None and rate != sample_rate:
+                    raise ValueError("Chunks were rendered at different sample rates")
+                sample_rate = rate
+                yield rate, fade_edges(pcm, index > 0, index < last)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def synthesize(self, params: EspeakParameters) -> bytes:
+        """Return the whole utterance as a single WAV."""
+        sample_rate = 0
+        parts = []
+        async with aclosing(self.pcm_chunks(params)) as chunks:
+            async for sample_rate, pcm in chunks:
+                parts.append(pcm)
+        return pcm_to_wav(b"".join(parts), sample_rate)
+
+    async def speak_and_capture(self, params: EspeakParameters) -> bytes:
+        """Play chunks as they become ready and return the whole WAV."""
+        if isinstance(self.engine, StreamingEngine):
+            sink: AudioSink = self.engine.sink
+        else:
+            sink = PlayerSink(self.engine.player)
+        sample_rate = 0
+        parts = []
+        await sink.open()
+        try:
+            async with aclosing(self.pcm_chunks(params)) as chunks:
+                async for sample_rate, pcm in chunks:
+                    if not parts:
+                        await sink.write(wav_header(sample_rate))
+                    parts.append(pcm)
+                    await sink.write(pcm)
+        except BaseException:
+            await sink.abort()
+            raise
+        await sink.close()
+        return pcm_to_wav(b"".join(parts), sample_rate)
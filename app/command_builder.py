@@ -8,9 +8,12 @@
 # ######################################### #
 
 from dataclasses import dataclass
+from functools import lru_cache
 import shlex
 
-@dataclass
+from app.defaults import Defaults
+
+@dataclass(slots=True)
 class EspeakParameters:
     text: str = ""
     voice: str = ""
@@ -20,8 +23,56 @@ class EspeakParameters:
     word_gap: str = "0"
 
 
-def compose_command(params: EspeakParameters) -> str:
-    args = ["espeak-ng"]
+# control characters, C1 controls and the Unicode line and paragraph separators
+CONTROL_CHARACTERS = dict.fromkeys([*range(0x20), *range(0x7F, 0xA0), 0x2028, 0x2029])
+
+
+def sanitize_text(text: str) -> str:
+    """Remove control and invisible characters from text."""
+    # all of them are non printable, and most texts have none
+    return text if text.isprintable() else text.translate(CONTROL_CHARACTERS)
+
+
+# documents use few distinct values, requests to the service may use any
+CANONICAL_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=CANONICAL_CACHE_SIZE)
+def _canonical_number(value: str) -> str:
+    try:
+        return str(int(value))
+    except ValueError:
+        return value.strip()
+
+
+def normalize_parameters(params: EspeakParameters) -> EspeakParameters:
+    """Return ``params`` written the canonical way, without changing the speech.
+
+    The text is sanitized and its runs of white space collapsed, the voice
+    is stripped and numbers lose their blanks and leading zeros.
+    """
+    return EspeakParameters(
+        " ".join(sanitize_text(params.text).split()),
+        params.voice.strip(),
+        _canonical_number(params.speed),
+        _canonical_number(params.pitch),
+        _canonical_number(params.volume),
+        _canonical_number(params.word_gap),
+    )
+
+
+def compose_args(
+    params: EspeakParameters,
+    executable: str = Defaults.ESPEAK,
+    stdout: bool = False,
+) -> list[str]:
+    """Return the ``espeak-ng`` invocation for ``params`` as an argument list.
+
+    ``executable`` replaces ``espeak-ng``, e.g. to run a stand-in binary, and
+    ``stdout`` asks for the WAV on standard output. The text comes last,
+    after ``--``, so that a text starting with ``-`` is never an option.
+    """
+    args = [executable]
     if params.voice:
         args += ["-v", params.voice]
     if params.speed:
@@ -32,7 +83,25 @@ def compose_command(params: EspeakParameters) -> str:
         args += ["-a", params.volume]
     if params.word_gap:
         args += ["-g", params.word_gap]
+    if stdout:
+        args.append("--stdout")
+    if params.text:
+        args += ["--", params.text]
+    return args
+
+
+def phoneme_args(voice: str, text: str, executable: str = Defaults.ESPEAK) -> list[str]:
+    """Return the ``espeak-ng`` invocation printing the phonemes of ``text``."""
+    args = [executable, "-q", "-x"]
+    if voice:
+        args += ["-v", voice]
+    args += ["--", text]
+    return args
+
+
+def compose_command(params: EspeakParameters) -> str:
+    args = compose_args(params)
     if params.text:
-        args.append(shlex.quote(params.text))  # 👈 protection from unusual characters
+        args[-1] = shlex.quote(params.text)  # 👈 protection from unusual characters
     retValue = " ".join(args)
     return retValue
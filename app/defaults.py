@@ -15,3 +15,12 @@ class Defaults:
     VOLUME = "100"
     WORD_GAP = "0"
     TEXT = ""
+    PLAYER = "aplay -q"
+    ESPEAK = "espeak-ng"
+    PRERENDER_DELAY = 0.5
+    PHONEME_DELAY = 0.3
+    SEARCH_DELAY = 0.2
+    WATCH_INTERVAL = 1.0
+    SERVE_HOST = "127.0.0.1"
+    SERVE_WORKERS = 2
+    SERVE_BACKLOG = 16
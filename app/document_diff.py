@@ -0,0 +1,134 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# document_diff.py                          #
+# ######################################### #
+
+from bisect import bisect_right
+from collections.abc import MutableSequence
+from typing import Sequence
+
+# (tag, i1, i2, j1, j2) like the opcodes of difflib.SequenceMatcher, without
+# the "equal" ranges
+Change = tuple[str, int, int, int, int]
+
+# edits searched for before the differing middle is replaced as a whole
+MAX_EDITS = 1000
+
+
+def _common_runs(
+    old: Sequence[int], new: Sequence[int], max_edits: int
+) -> list[tuple[int, int, int]] | None:
+    """Return the ``(i, j, length)`` runs common to a shortest edit of ``old`` into ``new``.
+
+    This is the Myers O(ND) algorithm: its cost grows with the number of
+    edits D rather than with the product of the lengths, and repeated
+    hashes do not slow it down. ``None`` when more than ``max_edits`` edits
+    are needed.
+    """
+    n, m = len(old), len(new)
+    frontier = {1: 0}
+    trace = []
+    for d in range(max_edits + 1):
+        trace.append(dict(frontier))
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and frontier[k - 1] < frontier[k + 1]):
+                x = frontier[k + 1]
+            else:
+                x = frontier[k - 1] + 1
+            y = x - k
+            while x < n and y < m and old[x] == new[y]:
+                x += 1
+                y += 1
+            frontier[k] = x
+            if x >= n and y >= m:
+                return _backtrack(trace, n, m)
+    return None
+
+
+def _backtrack(trace: list[dict[int, int]], x: int, y: int) -> list[tuple[int, int, int]]:
+    runs = []
+    for d in range(len(trace) - 1, -1, -1):
+        frontier = trace[d]
+        k = x - y
+        if k == -d or (k != d and frontier[k - 1] < frontier[k + 1]):
+            previous = k + 1
+        else:
+            previous = k - 1
+        start_x = frontier[previous]
+        start_y = start_x - previous
+        # the diagonal followed after the edit of step d
+        snake = min(x - start_x, y - start_y)
+        if snake > 0:
+            runs.append((x - snake, y - snake, snake))
+        x, y = start_x, start_y
+    runs.reverse()
+    return runs
+
+
+def diff_hashes(old: Sequence[int], new: Sequence[int]) -> list[Change]:
+    """Return the changes turning the presets hashed ``old`` into those hashed ``new``.
+
+    The common head and tail are skipped before matching, and the matching
+    costs time in proportion to the number of edits, so a few edits in a
+    large document are cheap to find. Past :data:`MAX_EDITS` edits the
+    differing middle is reported as one replacement.
+    """
+    head = 0
+    limit = min(len(old), len(new))
+    while head < limit and old[head] == new[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old[-1 - tail] == new[-1 - tail]:
+        tail += 1
+    i_end, j_end = len(old) - tail, len(new) - tail
+    if head == i_end and head == j_end:
+        return []
+    runs = _common_runs(old[head:i_end], new[head:j_end], MAX_EDITS)
+    if runs is None:
+        runs = []
+    changes: list[Change] = []
+    i = j = 0
+    for run_i, run_j, length in [*runs, (i_end - head, j_end - head, 0)]:
+        if run_i > i or run_j > j:
+            tag = "replace" if run_i > i and run_j > j else "delete" if run_i > i else "insert"
+            changes.append((tag, i + head, run_i + head, j + head, run_j + head))
+        i, j = run_i + length, run_j + length
+    return changes
+
+
+def apply_changes(presets: MutableSequence, new: Sequence, changes: list[Change]) -> None:
+    """Edit ``presets`` in place so that it holds the items of ``new``.
+
+    Only the ranges listed in ``changes`` are touched; rows replaced one
+    for one are assigned so that their neighbours do not move.
+    """
+    for tag, i1, i2, j1, j2 in reversed(changes):
+        common = min(i2 - i1, j2 - j1)
+        for offset in range(common):
+            presets[i1 + offset] = new[j1 + offset]
+        for index in range(i2 - 1, i1 + common - 1, -1):
+            del presets[index]
+        for offset in range(common, j2 - j1):
+            presets.insert(i1 + offset, new[j1 + offset])
+
+
+class IndexMap:
+    """Map the index of a row before a set of changes to its index after them."""
+
+    def __init__(self, changes: list[Change]) -> None:
+        self._starts = [i1 for _, i1, _, _, _ in changes]
+        self._changes = changes
+
+    def __call__(self, index: int) -> int | None:
+        """Return the new index of row ``index``, ``None`` if it was changed."""
+        position = bisect_right(self._starts, index) - 1
+        if position < 0:
+            return index
+        _, i1, i2, j1, j2 = self._changes[position]
+        if index < i2:
+            return None
+        return index - i2 + j2
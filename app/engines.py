@@ -0,0 +1,394 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# engines.py                                #
+# ######################################### #
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+import asyncio
+import contextlib
+import ctypes
+import ctypes.util
+import shlex
+import subprocess
+import threading
+import time
+
+from app.audio_sinks import AudioSink, PlayerSink
+from app.command_builder import EspeakParameters, compose_args, phoneme_args
+from app.defaults import Defaults
+from app.espeak_checker import EspeakNgChecker
+from app.metrics import mark
+from app.wav import pcm_to_wav
+
+
+async def communicate(
+    process: asyncio.subprocess.Process, data: bytes | None = None
+) -> bytes | None:
+    """Wait for ``process`` and return its output, killing it when cancelled."""
+    try:
+        out, _ = await process.communicate(data)
+    except asyncio.CancelledError:
+        with contextlib.suppress(ProcessLookupError):
+            process.kill()
+        await process.wait()
+        raise
+    return out
+
+
+def join_clauses(lines: list[str]) -> str:
+    """Join the phonemes printed for each clause, one per line."""
+    return "\n".join(line.strip() for line in lines if line.strip())
+
+
+class SynthesisEngine:
+    """Interface shared by the speech synthesis backends.
+
+    Every backend accepts :class:`EspeakParameters` and can either speak them
+    directly or return the synthesized audio as WAV bytes.
+    """
+
+    name = ""
+
+    def __init__(self, player: str = Defaults.PLAYER) -> None:
+        self.player = player
+
+    def fingerprint(self) -> str:
+        """Return a string identifying the engine version and voice data."""
+        raise NotImplementedError
+
+    async def synthesize(self, params: EspeakParameters) -> bytes:
+        """Return the audio for ``params`` as WAV bytes."""
+        raise NotImplementedError
+
+    def synthesize_blocking(self, params: EspeakParameters) -> bytes:
+        """Blocking variant of :meth:`synthesize` for code without an event loop."""
+        raise NotImplementedError
+
+    async def phonemes(self, voice: str, text: str) -> str:
+        """Return the phoneme mnemonics of ``text`` spoken by ``voice``, one line per clause."""
+        raise NotImplementedError
+
+    async def speak(self, params: EspeakParameters) -> None:
+        """Play ``params`` on the sound device."""
+        await self.play_bytes(await self.synthesize(params))
+
+    async def speak_and_capture(self, params: EspeakParameters) -> bytes:
+        """Play ``params`` and return the WAV bytes that were played."""
+        data = await self.synthesize(params)
+        await self.play_bytes(data)
+        return data
+
+    async def play_file(self, path: Path) -> None:
+        """Play a WAV file with :attr:`player`."""
+        process = await asyncio.create_subprocess_exec(
+            *shlex.split(self.player), str(path)
+        )
+        await communicate(process)
+
+    async def play_bytes(self, data: bytes) -> None:
+        """Play WAV ``data`` by piping it into :attr:`player`."""
+        process = await asyncio.create_subprocess_exec(
+            *shlex.split(self.player), stdin=asyncio.subprocess.PIPE
+        )
+        await communicate(process, data)
+
+    def close(self) -> None:
+        """Release the resources held by the engine."""
+
+
+class SubprocessEngine(SynthesisEngine):
+    """Run one ``espeak-ng`` process per utterance."""
+
+    name = "subprocess"
+
+    def __init__(self, player: str = Defaults.PLAYER, executable: str = Defaults.ESPEAK) -> None:
+        super().__init__(player)
+        self.executable = executable
+
+    def fingerprint(self) -> str:
+        return EspeakNgChecker(self.executable).fingerprint()
+
+    async def speak(self, params: EspeakParameters) -> None:
+        args = compose_args(params, self.executable)
+        mark("command_build")
+        process = await asyncio.create_subprocess_exec(*args)
+        mark("spawn")
+        await communicate(process)
+        mark("synthesis_end", overwrite=True)
+
+    async def synthesize(self, params: EspeakParameters) -> bytes:
+        args = compose_args(params, self.executable, stdout=True)
+        mark("command_build")
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        mark("spawn")
+        data = await communicate(process)
+        mark("first_byte")
+        mark("synthesis_end", overwrite=True)
+        if process.returncode != 0:
+            raise RuntimeError(f"espeak-ng exited with status {process.returncode}")
+        return data
+
+    async def phonemes(self, voice: str, text: str) -> str:
+        process = await asyncio.create_subprocess_exec(
+            *phoneme_args(voice, text, self.executable),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        out = await communicate(process)
+        if process.returncode != 0:
+            raise RuntimeError(f"espeak-ng exited with status {process.returncode}")
+        return join_clauses(out.decode("utf-8", errors="replace").splitlines())
+
+    def synthesize_blocking(self, params: EspeakParameters) -> bytes:
+        result = subprocess.run(
+            compose_args(params, self.executable, stdout=True), stdout=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"espeak-ng exited with status {result.returncode}")
+        return result.stdout
+
+
+@dataclass
+class StreamTiming:
+    """Timings of one streamed utterance, in seconds from the process spawn."""
+
+    first_byte: float
+    total: float
+
+
+class StreamingEngine(SubprocessEngine):
+    """Stream ``espeak-ng --stdout`` into an :class:`AudioSink` chunk by chunk.
+
+    Audio reaches the sink as soon as the first chunk is produced instead of
+    after the whole utterance has been rendered.
+    """
+
+    name = "stream"
+    CHUNK_SIZE = 4096
+
+    def __init__(
+        self,
+        player: str = Defaults.PLAYER,
+        sink: AudioSink | None = None,
+        executable: str = Defaults.ESPEAK,
+    ) -> None:
+        super().__init__(player, executable)
+        self.sink = sink or PlayerSink(player)
+        self.last_timing: StreamTiming | None = None
+
+    async def speak(self, params: EspeakParameters) -> None:
+        await self.speak_and_capture(params)
+
+    async def speak_and_capture(self, params: EspeakParameters) -> bytes:
+        start = time.perf_counter()
+        first_byte = None
+        chunks: list[bytes] = []
+        args = compose_args(params, self.executable, stdout=True)
+        mark("command_build")
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdout=asyncio.subprocess.PIPE,
+        )
+        mark("spawn")
+        await self.sink.open()
+        try:
+            while chunk := await process.stdout.read(self.CHUNK_SIZE):
+                if first_byte is None:
+                    first_byte = time.perf_counter() - start
+                    mark("first_byte")
+                chunks.append(chunk)
+                await self.sink.write(chunk)
+            await process.wait()
+            mark("synthesis_end", overwrite=True)
+        except asyncio.CancelledError:
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+            await process.wait()
+            await self.sink.abort()
+            raise
+        await self.sink.close()
+        if process.returncode != 0:
+            raise RuntimeError(f"espeak-ng exited with status {process.returncode}")
+        total = time.perf_counter() - start
+        self.last_timing = StreamTiming(first_byte if first_byte is not None else total, total)
+        return b"".join(chunks)
+
+    async def play_file(self, path: Path) -> None:
+        with open(path, "rb") as f:
+            await self.play_bytes(f.read())
+
+    async def play_bytes(self, data: bytes) -> None:
+        await self.sink.open()
+        try:
+            for offset in range(0, len(data), self.CHUNK_SIZE):
+                await self.sink.write(data[offset:offset + self.CHUNK_SIZE])
+        except asyncio.CancelledError:
+            await self.sink.abort()
+            raise
+        await self.sink.close()
+
+
+_SYNTH_CALLBACK = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p
+)
+
+
+class LibEspeakEngine(SynthesisEngine):
+    """Keep ``libespeak-ng`` loaded and initialized across utterances.
+
+    The library is not thread safe, so every call into it happens on a single
+    dedicated worker thread.
+    """
+
+    name = "lib"
+
+    AUDIO_OUTPUT_SYNCHRONOUS = 2
+    INITIALIZE_DONT_EXIT = 0x8000
+    CHARS_UTF8 = 1
+    POS_CHARACTER = 1
+    RATE, VOLUME, PITCH, WORDGAP = 1, 2, 3, 7
+
+    def __init__(self, player: str = Defaults.PLAYER, library: str | None = None) -> None:
+        super().__init__(player)
+        library = library or ctypes.util.find_library("espeak-ng")
+        if library is None:
+            raise RuntimeError("libespeak-ng not found")
+        self._lib = ctypes.CDLL(library)
+        self._lib.espeak_Info.restype = ctypes.c_char_p
+        self._lib.espeak_Info.argtypes = [ctypes.POINTER(ctypes.c_char_p)]
+        self._lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        self._lib.espeak_TextToPhonemes.restype = ctypes.c_char_p
+        self._lib.espeak_TextToPhonemes.argtypes = [
+            ctypes.POINTER(ctypes.c_void_p), ctypes.c_int, ctypes.c_int
+        ]
+        self._lib.espeak_Synth.argtypes = [
+            ctypes.c_void_p,
+            ctypes.c_size_t,
+            ctypes.c_uint,
+            ctypes.c_int,
+            ctypes.c_uint,
+            ctypes.c_uint,
+            ctypes.POINTER(ctypes.c_uint),
+            ctypes.c_void_p,
+        ]
+        self._samples: list[bytes] = []
+        # abort event of the request the library is synthesizing
+        self._abort: threading.Event | None = None
+        self._callback = _SYNTH_CALLBACK(self._on_samples)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="libespeak-ng")
+        self.sample_rate = self._executor.submit(self._initialize).result()
+
+    def _initialize(self) -> int:
+        rate = self._lib.espeak_Initialize(
+            self.AUDIO_OUTPUT_SYNCHRONOUS, 0, None, self.INITIALIZE_DONT_EXIT
+        )
+        if rate <= 0:
+            raise RuntimeError("libespeak-ng initialization failed")
+        self._lib.espeak_SetSynthCallback(self._callback)
+        return rate
+
+    def _on_samples(self, wav, count: int, events) -> int:
+        if wav and count > 0:
+            self._samples.append(ctypes.string_at(wav, count * 2))
+        return 1 if self._abort is not None and self._abort.is_set() else 0
+
+    def fingerprint(self) -> str:
+        data_path = ctypes.c_char_p()
+        version = self._lib.espeak_Info(ctypes.byref(data_path)) or b""
+        return f"libespeak-ng {version.decode()} {(data_path.value or b'').decode()}"
+
+    def _synthesize(self, params: EspeakParameters, abort: threading.Event) -> bytes:
+        if abort.is_set():
+            raise RuntimeError("Synthesis cancelled")
+        # Unset fields fall back to the espeak-ng defaults rather than
+        # keeping the values of the previous utterance.
+        voice = params.voice or "en"
+        if self._lib.espeak_SetVoiceByName(voice.encode()) != 0:
+            raise RuntimeError(f"Unknown voice: {voice}")
+        for parameter, value, default in (
+            (self.RATE, params.speed, 175),
+            (self.VOLUME, params.volume, 100),
+            (self.PITCH, params.pitch, 50),
+            (self.WORDGAP, params.word_gap, 0),
+        ):
+            self._lib.espeak_SetParameter(parameter, int(value) if value else default, 0)
+        text = params.text.encode("utf-8") + b"\0"
+        self._samples = []
+        self._abort = abort
+        try:
+            self._lib.espeak_Synth(
+                text, len(text), 0, self.POS_CHARACTER, 0, self.CHARS_UTF8, None, None
+            )
+            self._lib.espeak_Synchronize()
+        finally:
+            self._abort = None
+        if abort.is_set():
+            # the audio is cut short and must not be returned, e.g. to a cache
+            raise RuntimeError("Synthesis cancelled")
+        return pcm_to_wav(b"".join(self._samples), self.sample_rate)
+
+    async def synthesize(self, params: EspeakParameters) -> bytes:
+        loop = asyncio.get_running_loop()
+        abort = threading.Event()
+        try:
+            data = await loop.run_in_executor(self._executor, self._synthesize, params, abort)
+        except asyncio.CancelledError:
+            # stops this request only, when running or once it starts
+            abort.set()
+            raise
+        mark("first_byte")
+        mark("synthesis_end", overwrite=True)
+        return data
+
+    def synthesize_blocking(self, params: EspeakParameters) -> bytes:
+        return self._executor.submit(self._synthesize, params, threading.Event()).result()
+
+    def _phonemes(self, voice: str, text: str) -> str:
+        voice = voice or "en"
+        if self._lib.espeak_SetVoiceByName(voice.encode()) != 0:
+            raise RuntimeError(f"Unknown voice: {voice}")
+        buffer = ctypes.create_string_buffer(text.encode("utf-8"))
+        # the library advances the pointer clause by clause, to NULL at the end
+        pointer = ctypes.c_void_p(ctypes.addressof(buffer))
+        lines = []
+        while pointer.value:
+            phonemes = self._lib.espeak_TextToPhonemes(ctypes.byref(pointer), self.CHARS_UTF8, 0)
+            lines.append((phonemes or b"").decode())
+        return join_clauses(lines)
+
+    async def phonemes(self, voice: str, text: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._phonemes, voice, text)
+
+    def close(self) -> None:
+        self._executor.submit(self._lib.espeak_Terminate).result()
+        self._executor.shutdown()
+
+
+ENGINES = {
+    SubprocessEngine.name: SubprocessEngine,
+    StreamingEngine.name: StreamingEngine,
+    LibEspeakEngine.name: LibEspeakEngine,
+}
+
+
+def create_engine(name: str, player: str = Defaults.PLAYER, **options) -> SynthesisEngine:
+    """Return a new engine given one of the names in :data:`ENGINES`.
+
+    ``options`` are passed to the engine class, e.g. ``sink`` for ``stream``
+    or ``executable`` for the engines running ``espeak-ng``.
+    """
+    try:
+        engine_cls = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine: {name}") from None
+    return engine_cls(player, **options)
@@ -7,18 +7,88 @@
 # espeak_checker.py                         #
 # ######################################### #
 
+from typing import TYPE_CHECKING
+import os
 import shutil
+import subprocess
+
+from app.defaults import Defaults
+
+if TYPE_CHECKING:
+    from app.voice_catalog import VoiceCatalog
 
 class EspeakNgChecker:
-    """Utility class to verify that the ``espeak-ng`` command is available."""
+    """Utility class to verify that the ``espeak-ng`` command is available.
+
+    ``executable`` is the command to check, a name looked up in ``PATH`` or
+    a path to a compatible binary.
+    """
 
-    @staticmethod
-    def check_exists() -> bool:
-        """Return ``True`` if ``espeak-ng`` is found in ``PATH``."""
-        return shutil.which("espeak-ng") is not None
+    def __init__(self, executable: str = Defaults.ESPEAK) -> None:
+        self.executable = executable
+
+    def check_exists(self) -> bool:
+        """Return ``True`` if the executable is found in ``PATH``."""
+        return shutil.which(self.executable) is not None
 
     def validate_or_raise(self) -> None:
-        """Raise ``RuntimeError`` if ``espeak-ng`` is not available."""
+        """Raise ``RuntimeError`` if the executable is not available."""
         if not self.check_exists():
-            raise RuntimeError("espeak-ng executable not found")
+            raise RuntimeError(f"{self.executable} executable not found")
+
+    def version(self) -> str:
+        """Return the output of ``espeak-ng --version`` or ``""`` on failure."""
+        try:
+            result = subprocess.run(
+                [self.executable, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+        except (OSError, subprocess.SubprocessError):
+            return ""
+        return result.stdout.strip()
+
+    def fingerprint(self) -> str:
+        """Return a string identifying the installed engine and voice data.
+
+        The ``espeak-ng --version`` banner names the data directory; its
+        modification time is appended so that updated voices change the value.
+        """
+        version = self.version()
+        _, sep, data_dir = version.partition("Data at:")
+        if sep:
+            try:
+                mtime = os.stat(data_dir.strip()).st_mtime_ns
+            except OSError:
+                mtime = 0
+            return f"{version}|{mtime}"
+        return version
+
+    def binary_fingerprint(self) -> str:
+        """Return the resolved path, size and mtime of the executable."""
+        path = shutil.which(self.executable)
+        if path is None:
+            return ""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path
+        return f"{os.path.realpath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+    def voice_catalog(self, path: str | None = None) -> "VoiceCatalog":
+        """Return the catalog of installed voices.
+
+        The catalog saved in ``path`` is used while the executable and the
+        voice data are unchanged; otherwise it is rebuilt from
+        ``espeak-ng --voices`` and saved again.
+        """
+        from app.voice_catalog import DEFAULT_VOICES_PATH, VoiceCatalog
 
+        path = path or DEFAULT_VOICES_PATH
+        fingerprint = f"{self.binary_fingerprint()}|{self.fingerprint()}"
+        catalog = VoiceCatalog.load(path, fingerprint)
+        if catalog is None:
+            catalog = VoiceCatalog.build(self.executable)
+            catalog.save(path, fingerprint)
+        return catalog
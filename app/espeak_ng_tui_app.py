@@ -8,8 +8,25 @@
 # ######################################### #
 
 from textual.app import App
+from textual.reactive import reactive
+from typing import TYPE_CHECKING
+import asyncio
+import subprocess
 
+from app.audio_cache import AudioCache
+from app.chunked_synthesis import ChunkedSynthesizer
+from app.defaults import Defaults
+from app.engines import SynthesisEngine, SubprocessEngine
+from app.espeak_checker import EspeakNgChecker
 from app.main_screen import MainScreen
+from app.metrics import Metrics, MetricsServer
+from app.phonemes import PhonemeCache
+from app.playback import PlaybackScheduler
+from app.startup_profile import StartupProfile
+from app.voice_catalog import DEFAULT_VOICES_PATH, VoiceCatalog
+
+if TYPE_CHECKING:
+    from app.synthesis_service import SynthesisServer
 
 
 class EspeakNgTuiApp(App):
@@ -17,10 +34,76 @@ class EspeakNgTuiApp(App):
 
     CSS_PATH = "estui.css"
 
-    def __init__(self, presets_path: str) -> None:
+    voice_catalog: reactive[VoiceCatalog | None] = reactive(None)
+
+    def __init__(
+        self,
+        presets_path: str,
+        audio_cache: AudioCache | None = None,
+        engine: SynthesisEngine | None = None,
+        chunk_workers: int = 0,
+        prerender_delay: float = Defaults.PRERENDER_DELAY,
+        metrics: Metrics | None = None,
+        metrics_port: int | None = None,
+        voices_path: str | None = DEFAULT_VOICES_PATH,
+        server: "SynthesisServer | None" = None,
+        profile: StartupProfile | None = None,
+    ) -> None:
         super().__init__()
+        self.startup = profile or StartupProfile()
+        self.server = server
         self.presets_path = presets_path
+        self.voices_path = voices_path
+        self.prerender_delay = prerender_delay
+        self.audio_cache = audio_cache
+        self.engine = engine or SubprocessEngine()
+        self.metrics = metrics or Metrics()
+        self.metrics_server = MetricsServer(self.metrics, metrics_port) if metrics_port is not None else None
+        chunker = ChunkedSynthesizer(self.engine, chunk_workers) if chunk_workers else None
+        self.playback = PlaybackScheduler(self.engine, audio_cache, chunker, self.metrics)
+        self.phonemes = PhonemeCache(self.engine)
 
     def on_mount(self) -> None:
-        self.push_screen(MainScreen(self.presets_path))
+        self.playback.start()
+        self.push_screen(MainScreen(self.presets_path, self.prerender_delay))
+        self.call_after_refresh(self.after_first_frame)
+
+    async def after_first_frame(self) -> None:
+        """Start the work the editor does not need to be shown and used."""
+        self.startup.mark("first frame")
+        if self.voices_path:
+            self.run_worker(self.load_voice_catalog(), group="voices")
+        if self.metrics_server is not None:
+            try:
+                await self.metrics_server.start()
+            except OSError as exc:
+                self.metrics_server = None
+                self.notify(f"Metrics endpoint not started: {exc}", severity="error")
+        if self.server is not None:
+            try:
+                await self.server.start()
+            except OSError as exc:
+                self.server = None
+                self.notify(f"Synthesis service not started: {exc}", severity="error")
+        if self.metrics_server is not None or self.server is not None:
+            self.startup.done("servers")
+
+    async def load_voice_catalog(self) -> None:
+        """Load or rebuild the voice catalog without blocking the interface."""
+        checker = EspeakNgChecker(getattr(self.engine, "executable", Defaults.ESPEAK))
+        try:
+            self.voice_catalog = await asyncio.to_thread(checker.voice_catalog, self.voices_path)
+        except (OSError, subprocess.SubprocessError) as exc:
+            # voices stay unchecked, espeak-ng reports unknown ones on Play
+            self.log(f"Voice catalog unavailable: {exc}")
+        self.startup.done("voice catalog")
+
+    async def on_unmount(self) -> None:
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+        if self.server is not None:
+            await self.server.close()
+        await self.playback.close()
+        await self.metrics.close()
+        self.engine.close()
 
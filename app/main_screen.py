@@ -10,20 +10,58 @@
 from textual.app import ComposeResult
 from textual.containers import Grid, Horizontal, Vertical, Container
 from textual.screen import Screen
-from textual.widgets import Static, Input, Button, ListView
+from textual.widgets import Static, Input, Button, Checkbox, ProgressBar
 
-from app.info_modal import InfoModal
 from textual.reactive import reactive
-from textual import on, events
+from textual.timer import Timer
+from textual.worker import get_current_worker
+from textual import on, events, work
+from textual.validation import ValidationResult, Validator
 from rich.text import Text
-import re
-import asyncio
+from collections.abc import MutableSequence
 import os
 
-from app.command_builder import EspeakParameters, compose_command
-from app.presets import MessagePreset, MessageDocument
+from app.command_builder import EspeakParameters, compose_command, sanitize_text
+from app.presets import NUMERIC_FIELDS, MessagePreset, is_parameter_number
+from app.preset_index import ContentIndex, PresetIndex, PresetQuery, parse_query, unique_positions
+from app.document_diff import IndexMap, apply_changes, diff_hashes
+from app.preset_store import (
+    JsonlPresetStore,
+    PresetReader,
+    StaleDocumentError,
+    close_snapshot,
+    document_hashes,
+    retain_presets,
+    save_presets,
+    share_parsed,
+    snapshot_presets,
+)
 from app.defaults import Defaults
-from app.message_item import MessageItem
+from app.message_list import MessageList
+from app.metrics import QUANTILES, UtteranceTiming
+from app.voice_catalog import VoiceCatalog, VoiceSuggester, VoiceValidator
+
+
+MAX_REPORTED_ERRORS = 5
+
+
+def _file_signature(path: str) -> tuple[int, int] | None:
+    """Return the modification time and size of ``path``, ``None`` if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ParameterValidator(Validator):
+    """Accept the numeric values a preset can be saved and opened again with."""
+
+    def __init__(self) -> None:
+        super().__init__(failure_description="Expected a whole number, 0 or more")
+
+    def validate(self, value: str) -> ValidationResult:
+        return self.success() if is_parameter_number(value) else self.failure()
 
 
 class MainScreen(Screen):
@@ -32,12 +70,57 @@ class MainScreen(Screen):
     BINDINGS = [
         ("ctrl+o", "open_document", "Open"),
         ("ctrl+s", "save_document", "Save"),
+        ("ctrl+t", "stop_speech", "Stop"),
+        ("ctrl+g", "audition", "Audition"),
+        ("ctrl+r", "deduplicate_document", "Remove duplicates"),
+        ("escape", "cancel_loading", "Cancel loading"),
     ]
 
-    def __init__(self, presets_path: str) -> None:
+    PARAMETERS = ("text", "voice", "speed", "pitch", "volume", "word_gap")
+
+    def __init__(self, presets_path: str, prerender_delay: float = Defaults.PRERENDER_DELAY) -> None:
         super().__init__()
         self.presets_path = presets_path
         self.file_name = os.path.basename(presets_path)
+        self.prerender_delay = prerender_delay
+        self._prerender_timer: Timer | None = None
+        self._phoneme_timer: Timer | None = None
+        self._search_timer: Timer | None = None
+        self.document: MutableSequence[MessagePreset] = []
+        self.search_query = PresetQuery()
+        # built in a worker on the first search, then kept in sync with
+        # every edit
+        self.preset_index = PresetIndex()
+        self._index_ready = False
+        self._indexing = False
+        # counted in a worker on the first Add, then kept in sync with every
+        # edit; the presets added meanwhile are checked once it is ready
+        self.content_index: ContentIndex | None = None
+        self._counting_contents = False
+        self._unchecked: list[MessagePreset] = []
+        self.voice_suggester = VoiceSuggester()
+        self.voice_validator = VoiceValidator()
+        # set while a document is loaded in the background
+        self._reader: PresetReader | None = None
+        self._previous_document: MutableSequence[MessagePreset] | None = None
+        self._saving = False
+        self._save_again = False
+        # what the document file held when last opened, saved or reloaded;
+        # ``None`` until then, and the file is not watched
+        self._disk_hashes: list[int | None] | None = None
+        self._disk_signature: tuple[int, int] | None = None
+        self._loading_hashes: list[int] = []
+        self._reloading = False
+        # count of the edits made to the document, and the count at which
+        # the document matched the file
+        self._edits = 0
+        self._synced_edits = 0
+        self._load_edits = 0
+        # count of the reloads that changed the document in place
+        self._reloads = 0
+        # set when presets of the document file could not be opened, so that
+        # saving does not drop them from the file
+        self._open_incomplete = False
 
     text: reactive[str] = reactive(Defaults.TEXT)
     voice: reactive[str] = reactive(Defaults.VOICE)
@@ -47,26 +130,26 @@ class MainScreen(Screen):
     word_gap: reactive[str] = reactive(Defaults.WORD_GAP)
 
     preview_widget: Static
-    messages_view: ListView
+    phonemes_widget: Static
+    messages_view: MessageList
     empty_label: Static
     copy_button: Button
     current_command: str = ""
 
-    def sanitize_text(self, text: str) -> str:
-        """Remove control and invisible characters from text."""
-        return re.sub(r"[\x00-\x1F\x7F\x9B\x80-\x9F\u2028\u2029]", "", text)
-
-    def update_preview(self) -> None:
-        """Compose command and display it in the preview widget."""
-        clean_text = self.sanitize_text(self.text)
-        params = EspeakParameters(
-            text=clean_text,
+    def current_parameters(self) -> EspeakParameters:
+        """Return the parameters currently shown in the editor."""
+        return EspeakParameters(
+            text=sanitize_text(self.text),
             voice=self.voice,
             speed=self.speed,
             pitch=self.pitch,
             volume=self.volume,
             word_gap=self.word_gap,
         )
+
+    def update_preview(self) -> None:
+        """Compose command and display it in the preview widget."""
+        params = self.current_parameters()
         command = compose_command(params)
         self.current_command = command
         self.preview_widget.update(Text(command))
@@ -84,15 +167,20 @@ class MainScreen(Screen):
                 with Container(id="left"):
                     with Vertical(id="controls"):
                         yield Static("Voice (e.g. it+f1)", classes="label")
-                        yield Input(id="voice", value=Defaults.VOICE)
+                        yield Input(
+                            id="voice",
+                            value=Defaults.VOICE,
+                            suggester=self.voice_suggester,
+                            validators=[self.voice_validator],
+                        )
                         yield Static("Speed (80-500)", classes="label")
-                        yield Input(id="speed", value=Defaults.SPEED)
+                        yield Input(id="speed", value=Defaults.SPEED, validators=[ParameterValidator()])
                         yield Static("Pitch (0-99)", classes="label")
-                        yield Input(id="pitch", value=Defaults.PITCH)
+                        yield Input(id="pitch", value=Defaults.PITCH, validators=[ParameterValidator()])
                         yield Static("Volume (0-200)", classes="label")
-                        yield Input(id="volume", value=Defaults.VOLUME)
+                        yield Input(id="volume", value=Defaults.VOLUME, validators=[ParameterValidator()])
                         yield Static("Word gap (x10ms)", classes="label")
-                        yield Input(id="word_gap", value=Defaults.WORD_GAP)
+                        yield Input(id="word_gap", value=Defaults.WORD_GAP, validators=[ParameterValidator()])
                         yield Static("Text to synthesize", classes="label")
                         yield Input(
                             id="text",
@@ -100,10 +188,19 @@ class MainScreen(Screen):
                             placeholder="Type something here...",
                         )
                         yield Button(label="Play", id="play")
+                        yield Button(label="Stop", id="stop")
                         yield Button(label="Add", id="add")
+                        yield Checkbox("Interrupt current", id="interrupt")
+                        yield Static("Queue: 0", id="queue-depth")
+                        yield Static("", id="stats")
                 with Container(id="right"):
                     yield Static("Messages", classes="label")
-                    yield ListView(id="messages")
+                    yield Input(
+                        id="search",
+                        placeholder="Search: words, ^prefix, voice:it speed:140-200 pitch:40-60",
+                    )
+                    yield ProgressBar(id="load-progress", total=100, show_eta=False)
+                    yield MessageList(id="messages")
                     yield Static(
                         "No messages yet. Use the 'Add' button to create one.",
                         id="empty-label",
@@ -113,24 +210,308 @@ class MainScreen(Screen):
             with Grid(id="preview-row"):
                 yield Static("", id="preview")
                 yield Button(label="Copy", id="copy")
+            yield Static("Phonemes", classes="label")
+            yield Static("", id="phonemes")
 
     def on_mount(self) -> None:
         self.preview_widget = self.query_one("#preview", Static)
-        self.messages_view = self.query_one("#messages", ListView)
+        self.phonemes_widget = self.query_one("#phonemes", Static)
+        self.messages_view = self.query_one("#messages", MessageList)
+        self.messages_view.set_presets(self.document)
         self.copy_button = self.query_one("#copy", Button)
         self.empty_label = self.query_one("#empty-label", Static)
+        self.load_progress = self.query_one("#load-progress", ProgressBar)
+        self.load_progress.display = False
         self.info_button = self.query_one("#info", Button)
+        self.queue_label = self.query_one("#queue-depth", Static)
+        self.app.playback.listeners.append(self.update_queue_depth)
+        self.stats_label = self.query_one("#stats", Static)
+        self.app.metrics.listeners.append(self.update_stats)
+        self.watch(self.app, "voice_catalog", self.set_voice_catalog)
+        # utterances per minute decay even when nothing is spoken
+        self.set_interval(5, self.update_stats)
+        self.set_interval(Defaults.WATCH_INTERVAL, self.check_document_file)
+        self.update_stats()
         self.update_empty_label_visibility()
         self.update_preview()
         # Focus the text input when the screen is first shown
         self.set_focus(self.query_one("#text", Input))
+        self.call_after_refresh(self.open_initial_document)
+
+    def open_initial_document(self) -> None:
+        """Load the document once the editor is on screen."""
+        if os.path.exists(self.presets_path):
+            self.action_open_document()
 
     def on_screen_resume(self, event: events.ScreenResume) -> None:
         """Return focus to the text input when coming back from a modal."""
         self.set_focus(self.query_one("#text", Input))
 
+    def on_unmount(self) -> None:
+        self.app.playback.listeners.remove(self.update_queue_depth)
+        self.app.metrics.listeners.remove(self.update_stats)
+
+    def set_voice_catalog(self, catalog: VoiceCatalog | None) -> None:
+        """Check and complete the voice input against ``catalog``."""
+        self.voice_suggester.catalog = catalog
+        self.voice_validator.catalog = catalog
+        voice_input = self.query_one("#voice", Input)
+        voice_input.validate(voice_input.value)
+        self.schedule_phonemes()
+
+    def voice_is_valid(self) -> bool:
+        return self.voice_validator.validate(self.voice).is_valid
+
+    def invalid_parameter(self) -> str | None:
+        """Return the name of the first numeric parameter that is not a valid number."""
+        for name in NUMERIC_FIELDS:
+            if not is_parameter_number(getattr(self, name)):
+                return name
+        return None
+
+    def check_numbers(self) -> bool:
+        """Return ``True`` if the numeric parameters can be stored, otherwise say why."""
+        name = self.invalid_parameter()
+        if name is not None:
+            label = name.replace("_", " ").capitalize()
+            self.notify(f"{label} must be a whole number, 0 or more: {getattr(self, name)}", severity="error")
+            return False
+        return True
+
+    def editor_changed(self) -> None:
+        """Refresh everything derived from the parameters in the editor."""
+        self.update_preview()
+        self.schedule_phonemes()
+        if self.prerender_delay > 0:
+            self.schedule_prerender()
+
+    def schedule_prerender(self) -> None:
+        """Restart the idle timer that pre-renders the editor state.
+
+        The render of an earlier state is cancelled, it is stale now.
+        """
+        if self._prerender_timer is not None:
+            self._prerender_timer.stop()
+        self.app.playback.cancel_speculation()
+        self._prerender_timer = self.set_timer(self.prerender_delay, self.prerender)
+
+    def prerender(self) -> None:
+        """Render the current parameters into the audio cache ahead of Play."""
+        self._prerender_timer = None
+        params = self.current_parameters()
+        if params.text and self.voice_is_valid() and self.invalid_parameter() is None:
+            self.app.playback.speculate(params)
+
+    def schedule_phonemes(self) -> None:
+        """Show the phonemes of the editor text, transcribing it once typing pauses.
+
+        A transcription in progress for an earlier text is cancelled.
+        """
+        if self._phoneme_timer is not None:
+            self._phoneme_timer.stop()
+            self._phoneme_timer = None
+        self.workers.cancel_group(self, "phonemes")
+        params = self.current_parameters()
+        if not params.text:
+            self.show_phonemes("")
+        elif not self.voice_is_valid():
+            self.show_phonemes(f"Unknown voice: {params.voice}")
+        else:
+            phonemes = self.app.phonemes.get(params.voice, params.text)
+            if phonemes is not None:
+                self.show_phonemes(phonemes)
+            else:
+                # the previous phonemes stay, dimmed, until the new ones arrive
+                self.phonemes_widget.set_class(True, "-pending")
+                self._phoneme_timer = self.set_timer(Defaults.PHONEME_DELAY, self.start_transcription)
+
+    def start_transcription(self) -> None:
+        self._phoneme_timer = None
+        params = self.current_parameters()
+        self.run_worker(
+            self.transcribe_phonemes(params.voice, params.text), group="phonemes", exclusive=True
+        )
+
+    async def transcribe_phonemes(self, voice: str, text: str) -> None:
+        try:
+            phonemes = await self.app.phonemes.transcribe(voice, text)
+        except (OSError, RuntimeError) as exc:
+            phonemes = f"Phonemes unavailable: {exc}"
+        self.show_phonemes(phonemes)
+
+    def show_phonemes(self, phonemes: str) -> None:
+        self.phonemes_widget.set_class(False, "-pending")
+        self.phonemes_widget.update(Text(phonemes))
+
+    def update_queue_depth(self, depth: int) -> None:
+        self.queue_label.update(f"Queue: {depth}")
+        error = self.app.playback.last_error
+        if error is not None:
+            self.app.playback.last_error = None
+            self.notify(f"Playback failed: {error}", severity="error")
+
+    def update_stats(self, timing: UtteranceTiming | None = None) -> None:
+        """Show the latency percentiles and the throughput of spoken utterances."""
+        metrics = self.app.metrics
+        hits, total = metrics.cache_hits()
+        lines = [f"Utterances: {total} ({metrics.per_minute()}/min), cache hits: {hits}"]
+        for label, phase in (("First audio", "first_byte"), ("Synthesis", "synthesis_end"), ("Total", "playback_end")):
+            quantiles = metrics.percentiles(phase)
+            if quantiles is not None:
+                values = "/".join(f"{quantiles[q] * 1000:.0f}" for q in QUANTILES)
+                lines.append(f"{label} p50/95/99: {values} ms")
+        self.stats_label.update("\n".join(lines))
+
     def update_empty_label_visibility(self) -> None:
-        self.empty_label.display = len(self.messages_view.children) == 0
+        if self.document and self.filtering and not self._index_ready:
+            self.empty_label.update("Searching...")
+        elif self.document and self.filtering:
+            self.empty_label.update("No messages match the search.")
+        else:
+            self.empty_label.update("No messages yet. Use the 'Add' button to create one.")
+        self.empty_label.display = len(self.messages_view) == 0
+
+    @property
+    def filtering(self) -> bool:
+        """``True`` while the list shows only the presets matching a search."""
+        return not self.search_query.is_empty
+
+    def ensure_index(self) -> None:
+        """Index the document for searching in the background, unless done already."""
+        if self._index_ready or self._indexing or self._reader is not None:
+            return
+        self._indexing = True
+        self.build_index(self.document_state(), snapshot_presets(self.document))
+
+    @work(thread=True, exclusive=True, group="index")
+    def build_index(self, state: tuple[int, int, int], snapshot: MutableSequence[MessagePreset]) -> None:
+        index: PresetIndex | None = PresetIndex()
+        error = None
+        try:
+            index.extend(snapshot)
+        except (OSError, ValueError) as exc:
+            index, error = None, exc
+        finally:
+            close_snapshot(snapshot)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.finish_indexing, state, snapshot, index, error)
+
+    def finish_indexing(
+        self,
+        state: tuple[int, int, int],
+        snapshot: MutableSequence[MessagePreset],
+        index: PresetIndex | None,
+        error: Exception | None = None,
+    ) -> None:
+        self._indexing = False
+        if self._index_ready:
+            return
+        if index is None:
+            if isinstance(error, StaleDocumentError):
+                self.reload_now()
+            else:
+                self.notify(f"Cannot search {self.file_name}: {error}", severity="error")
+            return
+        # the index must hold the very presets of the document
+        if state != self.document_state() or not share_parsed(self.document, snapshot):
+            # edited meanwhile: index again
+            self.ensure_index()
+            return
+        self.preset_index = index
+        self._index_ready = True
+        if self.filtering:
+            self.show_presets()
+
+    def set_document(self, presets: MutableSequence[MessagePreset]) -> None:
+        """Replace the document and show it through the current search."""
+        self.document = presets
+        self.workers.cancel_group(self, "index")
+        self._index_ready = False
+        self._indexing = False
+        self.preset_index.clear()
+        self.forget_contents()
+        self.show_presets()
+
+    def document_state(self) -> tuple[int, int, int]:
+        """Return a value that changes whenever the document does."""
+        return id(self.document), self._edits, self._reloads
+
+    def forget_contents(self) -> None:
+        """Drop the content index, it is counted again when next needed."""
+        self.workers.cancel_group(self, "contents")
+        self.content_index = None
+        self._counting_contents = False
+        self._unchecked = []
+
+    def ensure_content_index(self) -> None:
+        """Count the content of the document in the background, unless done already."""
+        if self.content_index is not None or self._counting_contents or self._reader is not None:
+            return
+        self._counting_contents = True
+        self.count_contents(self.document_state(), snapshot_presets(self.document))
+
+    @work(thread=True, exclusive=True, group="contents")
+    def count_contents(self, state: tuple[int, int, int], snapshot: MutableSequence[MessagePreset]) -> None:
+        try:
+            index = ContentIndex(snapshot)
+        finally:
+            close_snapshot(snapshot)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.finish_counting_contents, state, index)
+
+    def finish_counting_contents(self, state: tuple[int, int, int], index: ContentIndex) -> None:
+        self._counting_contents = False
+        if self.content_index is not None:
+            return
+        if state != self.document_state():
+            # edited meanwhile: count again
+            self.ensure_content_index()
+            return
+        self.content_index = index
+        unchecked, self._unchecked = self._unchecked, []
+        # every preset added meanwhile is in the count once
+        self.warn_duplicates(sum(index.count(preset) - 1 for preset in unchecked))
+
+    def warn_duplicates(self, count: int) -> None:
+        if count > 0:
+            self.notify(
+                f"{count} identical message(s) already stored, ctrl+r removes duplicates.",
+                severity="warning",
+            )
+
+    def show_presets(self) -> None:
+        """Fill the list with the whole document or with the search results."""
+        if not self.filtering:
+            self.messages_view.set_presets(self.document)
+        elif self._index_ready:
+            self.messages_view.set_presets(self.preset_index.search(self.search_query))
+        else:
+            # filled once the index is built
+            self.messages_view.set_presets([])
+            self.ensure_index()
+        self.update_empty_label_visibility()
+
+    @on(Input.Changed, "#search")
+    def on_search_changed(self, event: Input.Changed) -> None:
+        """Search once typing pauses, or at once when the search is cleared."""
+        if self._search_timer is not None:
+            self._search_timer.stop()
+            self._search_timer = None
+        try:
+            query = parse_query(event.value)
+        except ValueError:
+            event.input.set_class(True, "-invalid")
+            return
+        event.input.set_class(False, "-invalid")
+        if query.is_empty:
+            self.apply_search(query)
+        else:
+            self._search_timer = self.set_timer(Defaults.SEARCH_DELAY, lambda: self.apply_search(query))
+
+    def apply_search(self, query: PresetQuery) -> None:
+        self._search_timer = None
+        self.search_query = query
+        self.show_presets()
 
     @on(Input.Changed)
     def on_input_changed(self, event: Input.Changed) -> None:
@@ -146,70 +527,435 @@ class MainScreen(Screen):
             attr = mapping.get(event.input.id)
             if attr is not None:
                 setattr(self, attr, event.value)
+                self.editor_changed()
 
-    async def execute_espeak(self, command: str) -> None:
-        process = await asyncio.create_subprocess_shell(command)
-        await process.wait()
+    @on(Checkbox.Changed, "#interrupt")
+    def on_interrupt_changed(self, event: Checkbox.Changed) -> None:
+        self.app.playback.interrupt = event.value
+
+    def action_stop_speech(self) -> None:
+        """Stop the utterance being spoken and drop the queued ones."""
+        self.app.playback.stop()
+
+    def action_audition(self) -> None:
+        """Open the audition grid for the text in the editor."""
+        params = self.current_parameters()
+        if not params.text:
+            self.notify("Type a text to audition first.", severity="warning")
+            return
+        if self.app.playback.audio_cache is None:
+            self.notify("Audition needs the audio cache, see --cache-size.", severity="error")
+            return
+        from app.audition import AuditionScreen
+
+        self.app.push_screen(AuditionScreen(params))
+
+    def action_deduplicate_document(self) -> None:
+        """Remove the messages spoken like an earlier one, keeping the first.
+
+        The duplicates are found in the background, then the document is
+        rebuilt in one pass.
+        """
+        if self._reader is not None:
+            self.notify("The document is still loading.", severity="warning")
+            return
+        self.find_duplicates(self.document_state(), snapshot_presets(self.document))
+
+    @work(thread=True, exclusive=True, group="deduplicate")
+    def find_duplicates(self, state: tuple[int, int, int], snapshot: MutableSequence[MessagePreset]) -> None:
+        try:
+            positions, index = unique_positions(snapshot)
+        finally:
+            close_snapshot(snapshot)
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self.remove_duplicates, state, len(snapshot), positions, index)
+
+    def remove_duplicates(
+        self, state: tuple[int, int, int], count: int, positions: list[int], index: ContentIndex
+    ) -> None:
+        """Keep the presets at ``positions`` found by :meth:`find_duplicates`."""
+        if state != self.document_state():
+            self.notify("The document changed meanwhile, remove duplicates again.", severity="warning")
+            return
+        removed = count - len(positions)
+        if not removed:
+            self.notify("No duplicate messages.")
+            return
+        retain_presets(self.document, positions)
+        self._edits += 1
+        self.workers.cancel_group(self, "index")
+        self._index_ready = False
+        self._indexing = False
+        self.preset_index.clear()
+        self.forget_contents()
+        self.content_index = index
+        self.show_presets()
+        self.notify(f"Removed {removed} duplicate messages.")
 
     def action_new_document(self) -> None:
         """Clear all stored messages."""
-        self.messages_view.clear()
-        self.update_empty_label_visibility()
+        self.action_cancel_loading()
+        self._disk_hashes = None
+        self.set_document([])
 
     def action_save_document(self) -> None:
-        """Save presets to :attr:`presets_path`."""
-        presets = []
-        for item in self.messages_view.children:
-            if isinstance(item, MessageItem):
-                presets.append(item.preset)
-        MessageDocument(presets).save(self.presets_path)
+        """Save presets to :attr:`presets_path` in the background.
+
+        A snapshot is saved, so editing can go on while it is written.
+        """
+        if self._reader is not None:
+            self.notify("The document is still loading.", severity="warning")
+            return
+        if self._open_incomplete:
+            self.notify(
+                f"{self.file_name} was not fully opened, saving would lose messages. Fix it and open it again.",
+                severity="error",
+            )
+            return
+        if self._saving:
+            self._save_again = True
+            return
+        self._saving = True
+        self.save_document(self.document, snapshot_presets(self.document), self._edits)
+
+    @work(thread=True, group="save")
+    def save_document(
+        self,
+        presets: MutableSequence[MessagePreset],
+        snapshot: MutableSequence[MessagePreset],
+        edits: int,
+    ) -> None:
+        try:
+            save_presets(self.presets_path, snapshot)
+        except OSError as exc:
+            self.app.call_from_thread(self.finish_saving, presets, snapshot, edits, error=str(exc))
+            return
+        finally:
+            close_snapshot(snapshot)
+        hashes = document_hashes(snapshot)
+        signature = _file_signature(self.presets_path)
+        self.app.call_from_thread(self.finish_saving, presets, snapshot, edits, hashes, signature)
+
+    def finish_saving(
+        self,
+        presets: MutableSequence[MessagePreset],
+        snapshot: MutableSequence[MessagePreset],
+        edits: int,
+        hashes: list[int | None] | None = None,
+        signature: tuple[int, int] | None = None,
+        error: str | None = None,
+    ) -> None:
+        self._saving = False
+        if error is not None:
+            self.notify(f"Save failed: {error}", severity="error")
+        elif presets is self.document:
+            if isinstance(presets, JsonlPresetStore):
+                presets.adopt(snapshot)
+            self._disk_hashes = hashes
+            self._disk_signature = signature
+            self._synced_edits = edits
+        if self._save_again:
+            self._save_again = False
+            self.action_save_document()
 
     def action_open_document(self) -> None:
-        """Load presets from :attr:`presets_path`."""
+        """Load presets from :attr:`presets_path` in the background.
+
+        Presets show up in the list as they are read; cancelling the load
+        brings back the document shown before.
+        """
+        self.action_cancel_loading()
+        reader = PresetReader(self.presets_path)
+        self._previous_document = self.document
+        self._reader = reader
+        self._loading_hashes = []
+        self._load_edits = self._edits
+        self.set_document(reader.presets)
+        self.load_progress.update(progress=0)
+        self.load_progress.display = True
+        self.load_document(reader)
+
+    @work(thread=True, exclusive=True, group="load")
+    def load_document(self, reader: PresetReader) -> None:
+        worker = get_current_worker()
+        signature = _file_signature(reader.path)
         try:
-            doc = MessageDocument.load(self.presets_path)
+            for batch, progress in reader.batches():
+                if worker.is_cancelled:
+                    return
+                hashes = reader.hashes(batch)
+                self.app.call_from_thread(self.add_loaded, reader, batch, hashes, progress)
         except FileNotFoundError:
+            self.app.call_from_thread(self.finish_loading, reader, True)
+        except (OSError, ValueError) as exc:
+            self.app.call_from_thread(self.finish_loading, reader, True, f"Cannot open {reader.path}: {exc}")
+        else:
+            self.app.call_from_thread(self.finish_loading, reader, signature=signature)
+
+    def add_loaded(self, reader: PresetReader, batch: list, hashes: list[int], progress: float) -> None:
+        """Show a batch of presets read by :meth:`load_document`."""
+        if reader is not self._reader:
+            return  # cancelled meanwhile
+        self._loading_hashes.extend(hashes)
+        indexes = reader.add(batch)
+        if self._index_ready:
+            for index in indexes:
+                self.preset_index.add(reader.presets[index])
+        if self.filtering:
+            for index in indexes:
+                preset = reader.presets[index]
+                if self.search_query.matches(preset):
+                    self.messages_view.append(preset)
+        else:
+            self.messages_view.refresh_presets()
+        self.load_progress.update(progress=progress * 100)
+        self.update_empty_label_visibility()
+
+    def finish_loading(
+        self,
+        reader: PresetReader,
+        failed: bool = False,
+        error: str | None = None,
+        signature: tuple[int, int] | None = None,
+    ) -> None:
+        if reader is not self._reader:
+            return
+        previous = self._previous_document
+        self._reader = None
+        self._previous_document = None
+        self.load_progress.display = False
+        if failed:
+            self.set_document(previous)
+            if error is not None:
+                # the file is there but could not be read: keep it as it is
+                self._open_incomplete = True
+        else:
+            self._disk_hashes = self._loading_hashes
+            self._disk_signature = signature
+            self._synced_edits = self._load_edits
+            self._open_incomplete = bool(reader.errors)
+            self.report_invalid_presets(reader.errors)
+            self.app.startup.done("document")
+            if self._unchecked:
+                self.ensure_content_index()
+        self._loading_hashes = []
+        if error is not None:
+            self.notify(error, severity="error")
+
+    def report_invalid_presets(self, errors: list[str]) -> None:
+        """Tell which presets of the document file were left out, a few at a time."""
+        if not errors:
+            return
+        for error in errors[:MAX_REPORTED_ERRORS]:
+            self.notify(f"Invalid {error}", severity="error")
+        more = len(errors) - MAX_REPORTED_ERRORS
+        self.notify(
+            (f"{more} more invalid messages. " if more > 0 else "")
+            + f"Fix {self.file_name} and open it again to save it.",
+            severity="warning",
+        )
+
+    def action_cancel_loading(self) -> None:
+        """Stop loading a document and show the previous one again."""
+        if self._reader is None:
+            return
+        self.workers.cancel_group(self, "load")
+        self.finish_loading(self._reader, True)
+
+    def check_document_file(self) -> None:
+        """Reload the document if its file was changed by another program."""
+        if self._disk_hashes is None or self._reader is not None or self._saving or self._reloading:
+            return
+        signature = _file_signature(self.presets_path)
+        if signature is None or signature == self._disk_signature:
+            return
+        self._disk_signature = signature
+        if self._edits != self._synced_edits:
+            self.notify(
+                f"{self.file_name} changed on disk. Save to overwrite it, or open it to drop your changes.",
+                severity="warning",
+            )
+            return
+        self._reloading = True
+        self.reload_document(self.document, self._disk_hashes, self._edits)
+
+    def reload_now(self) -> None:
+        """Reload the document without waiting for the next check of its file."""
+        self._disk_signature = None
+        self.check_document_file()
+
+    @work(thread=True, exclusive=True, group="reload")
+    def reload_document(
+        self,
+        presets: MutableSequence[MessagePreset],
+        old_hashes: list[int | None],
+        edits: int,
+    ) -> None:
+        signature = _file_signature(self.presets_path)
+        reader = PresetReader(self.presets_path)
+        hashes: list[int] = []
+        try:
+            for batch, _ in reader.batches():
+                hashes.extend(reader.hashes(batch))
+                reader.add(batch)
+            if reader.errors:
+                raise ValueError(reader.errors[0])
+        except (OSError, ValueError):
+            # most likely caught halfway through a write: the end of the
+            # write changes the file again and brings us back here
+            self.app.call_from_thread(self.finish_reload)
+            return
+        changes = diff_hashes(old_hashes, hashes)
+        self.app.call_from_thread(
+            self.finish_reload, presets, edits, reader.presets, hashes, changes, signature
+        )
+
+    def finish_reload(
+        self,
+        presets: MutableSequence[MessagePreset] | None = None,
+        edits: int = 0,
+        new: MutableSequence[MessagePreset] | None = None,
+        hashes: list[int] | None = None,
+        changes: list | None = None,
+        signature: tuple[int, int] | None = None,
+    ) -> None:
+        """Apply the changes found by :meth:`reload_document` to the document.
+
+        Only the changed presets are touched, in the document, the search
+        index and the list, which keeps the cursor and the scroll position.
+        """
+        self._reloading = False
+        if presets is None:
             return
-        self.messages_view.clear()
-        for preset in doc.messages:
-            self.messages_view.append(MessageItem(preset))
+        if presets is not self.document or edits != self._edits:
+            # edited meanwhile: the next check reports the conflict
+            self._disk_signature = None
+            return
+        if not changes and isinstance(presets, JsonlPresetStore):
+            # the same lines, perhaps at other offsets
+            presets.rebase(new)
+            if not self.filtering:
+                self.messages_view.update_presets(presets, lambda index: index)
+        if changes:
+            removed = []
+            if self._index_ready:
+                removed = [presets[i] for _, i1, i2, _, _ in changes for i in range(i1, i2)]
+            if self.filtering:
+                previous = list(self.messages_view.presets)
+            apply_changes(presets, new, changes)
+            if isinstance(presets, JsonlPresetStore):
+                presets.rebase(new)
+            if self._index_ready:
+                self.update_index(removed, changes)
+            self._reloads += 1
+            self.forget_contents()
+            if not self.filtering:
+                self.messages_view.update_presets(presets, IndexMap(changes))
+            elif self._index_ready:
+                results = self.preset_index.search(self.search_query)
+                positions = {id(preset): index for index, preset in enumerate(results)}
+                self.messages_view.update_presets(
+                    results,
+                    lambda index: positions.get(id(previous[index])) if index < len(previous) else None,
+                )
+            else:
+                self.show_presets()
+            self.update_empty_label_visibility()
+            count = sum(max(i2 - i1, j2 - j1) for _, i1, i2, j1, j2 in changes)
+            self.notify(f"Reloaded {self.file_name}: {count} messages changed.")
+        self._disk_hashes = hashes
+        self._disk_signature = signature
+        # the whole file was read this time
+        self._open_incomplete = False
+
+    def update_index(self, removed: list[MessagePreset], changes: list) -> None:
+        """Follow the changes of a reload in the search index."""
+        index = self.preset_index
+        for preset in removed:
+            index.remove(preset)
+        for _, _, _, j1, j2 in changes:
+            count = j2 - j1
+            if not count:
+                continue
+            before = index.order_of(self.document[j1 - 1]) if j1 > 0 else None
+            after = index.order_of(self.document[j2]) if j2 < len(self.document) else None
+            if after is None:
+                # the end of the document: after everything else
+                for position in range(j1, j2):
+                    index.add(self.document[position])
+                continue
+            if before is None:
+                before = after - count - 1
+            step = (after - before) / (count + 1)
+            if before + step == before:
+                # no room left between the neighbours: rebuild on next search
+                self._index_ready = False
+                return
+            for offset, position in enumerate(range(j1, j2), start=1):
+                index.add(self.document[position], before + offset * step)
+
+    @on(MessageList.Deleted, "#messages")
+    def on_message_deleted(self, event: MessageList.Deleted) -> None:
+        self._edits += 1
+        if self.filtering:
+            # the list only held a copy of the search results
+            for index, preset in enumerate(self.document):
+                if preset is event.preset:
+                    del self.document[index]
+                    break
+        if self._index_ready:
+            self.preset_index.remove(event.preset)
+        if self.content_index is not None:
+            self.content_index.remove(event.preset)
         self.update_empty_label_visibility()
 
-    @on(ListView.Selected, "#messages")
-    def on_message_selected(self, event: ListView.Selected) -> None:
-        item = event.item
-        if isinstance(item, MessageItem):
-            preset = item.preset
-            self.query_one("#text", Input).value = preset.text
-            self.query_one("#voice", Input).value = preset.voice
-            self.query_one("#speed", Input).value = preset.speed
-            self.query_one("#pitch", Input).value = preset.pitch
-            self.query_one("#volume", Input).value = preset.volume
-            self.query_one("#word_gap", Input).value = preset.word_gap
-            self.text = preset.text
-            self.voice = preset.voice
-            self.speed = preset.speed
-            self.pitch = preset.pitch
-            self.volume = preset.volume
-            self.word_gap = preset.word_gap
-
-    async def on_button_pressed(self, event: Button.Pressed) -> None:
+    @on(MessageList.Unreadable, "#messages")
+    def on_message_unreadable(self, event: MessageList.Unreadable) -> None:
+        document = self.document
+        if isinstance(document, JsonlPresetStore) and document.stale:
+            self.reload_now()
+            return
+        self.notify(
+            f"Message {event.index + 1} of {self.file_name} cannot be read: {event.error}",
+            severity="error",
+        )
+
+    @on(MessageList.Selected, "#messages")
+    def on_message_selected(self, event: MessageList.Selected) -> None:
+        self.apply_preset(event.preset)
+
+    def apply_preset(self, preset: MessagePreset) -> None:
+        """Load ``preset`` into the editor as a single change.
+
+        The inputs are filled without posting ``Input.Changed``, so the
+        preview, the phonemes and the pre-render are refreshed once rather
+        than once per parameter.
+        """
+        with self.prevent(Input.Changed):
+            for name in self.PARAMETERS:
+                self.query_one(f"#{name}", Input).value = getattr(preset, name)
+        for name in self.PARAMETERS:
+            self.set_reactive(getattr(MainScreen, name), getattr(preset, name))
+        self.editor_changed()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
         if event.button.id == "play":
-            clean_text = self.sanitize_text(self.text)
-            params = EspeakParameters(
-                text=clean_text,
-                voice=self.voice,
-                speed=self.speed,
-                pitch=self.pitch,
-                volume=self.volume,
-                word_gap=self.word_gap,
-            )
+            if not self.voice_is_valid():
+                self.notify(f"Unknown voice: {self.voice}", severity="error")
+                return
+            if not self.check_numbers():
+                return
+            params = self.current_parameters()
             command = compose_command(params)
             self.log(command)
             self.current_command = command
             self.preview_widget.update(Text(command))
-            await self.execute_espeak(command)
+            self.app.playback.enqueue(params)
+        elif event.button.id == "stop":
+            self.action_stop_speech()
         elif event.button.id == "add":
+            if not self.check_numbers():
+                return
             preset = MessagePreset(
                 text=self.text,
                 voice=self.voice,
@@ -218,10 +964,28 @@ class MainScreen(Screen):
                 volume=self.volume,
                 word_gap=self.word_gap,
             )
-            self.messages_view.append(MessageItem(preset))
+            if self.content_index is not None:
+                duplicates = self.content_index.count(preset)
+                self.content_index.add(preset)
+            else:
+                duplicates = 0
+                self._unchecked.append(preset)
+            if not self.filtering:
+                self.messages_view.append(preset)
+            else:
+                self.document.append(preset)
+                if self.search_query.matches(preset):
+                    self.messages_view.append(preset)
+            if self._index_ready:
+                self.preset_index.add(preset)
+            self._edits += 1
             self.update_empty_label_visibility()
+            self.ensure_content_index()
+            self.warn_duplicates(duplicates)
         elif event.button.id == "copy":
             if self.current_command:
                 self.app.copy_to_clipboard(self.current_command)
         elif event.button.id == "info":
+            from app.info_modal import InfoModal
+
             self.app.push_screen(InfoModal())
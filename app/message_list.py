@@ -0,0 +1,315 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# message_list.py                           #
+# ######################################### #
+
+from collections.abc import Callable, MutableSequence
+from typing import ClassVar
+
+from rich.segment import Segment
+from rich.style import Style
+from rich.text import Text
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Region, Size
+from textual.message import Message
+from textual.reactive import reactive
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from app.presets import MessagePreset
+
+
+class MessageList(ScrollView, can_focus=True):
+    """Virtualized list of :class:`MessagePreset`.
+
+    Rows are drawn on demand with the line API instead of being mounted as
+    widgets, so opening and scrolling a document costs the same whatever
+    the number of presets it holds.
+    """
+
+    ROW_HEIGHT = 3
+    DELETE_LABEL = " x "
+    UNREADABLE_LABEL = " (this message cannot be read)"
+
+    BINDINGS: ClassVar[list[Binding]] = [
+        Binding("up", "cursor_up", "Up", show=False),
+        Binding("down", "cursor_down", "Down", show=False),
+        Binding("pageup", "page_up", "Page up", show=False),
+        Binding("pagedown", "page_down", "Page down", show=False),
+        Binding("home", "first", "First", show=False),
+        Binding("end", "last", "Last", show=False),
+        Binding("enter", "select", "Select", show=False),
+        Binding("delete", "delete", "Delete", show=False),
+    ]
+
+    COMPONENT_CLASSES: ClassVar[set[str]] = {
+        "message-list--cursor",
+        "message-list--text",
+        "message-list--params",
+        "message-list--delete",
+    }
+
+    DEFAULT_CSS = """
+    MessageList {
+        overflow-y: auto;
+        overflow-x: hidden;
+    }
+    MessageList > .message-list--cursor {
+        background: $accent 30%;
+    }
+    MessageList > .message-list--text {
+        text-style: bold;
+    }
+    MessageList > .message-list--params {
+        color: gray;
+        text-style: italic;
+    }
+    MessageList > .message-list--delete {
+        color: red;
+        text-style: bold;
+    }
+    """
+
+    class Selected(Message):
+        """Posted when a preset is chosen with a click or Enter."""
+
+        def __init__(self, message_list: "MessageList", index: int, preset: MessagePreset) -> None:
+            super().__init__()
+            self.message_list = message_list
+            self.index = index
+            self.preset = preset
+
+        @property
+        def control(self) -> "MessageList":
+            return self.message_list
+
+    class Deleted(Message):
+        """Posted after a preset has been removed from the list."""
+
+        def __init__(self, message_list: "MessageList", index: int, preset: MessagePreset) -> None:
+            super().__init__()
+            self.message_list = message_list
+            self.index = index
+            self.preset = preset
+
+        @property
+        def control(self) -> "MessageList":
+            return self.message_list
+
+    class Unreadable(Message):
+        """Posted the first time a preset of the list cannot be read."""
+
+        def __init__(self, message_list: "MessageList", index: int, error: Exception) -> None:
+            super().__init__()
+            self.message_list = message_list
+            self.index = index
+            self.error = error
+
+        @property
+        def control(self) -> "MessageList":
+            return self.message_list
+
+    cursor: reactive[int | None] = reactive(None, always_update=True)
+
+    def __init__(self, *, id: str | None = None, classes: str | None = None) -> None:
+        super().__init__(id=id, classes=classes)
+        self._presets: MutableSequence[MessagePreset] = []
+        self._unreadable_reported = False
+
+    @property
+    def presets(self) -> MutableSequence[MessagePreset]:
+        """The presets shown in the list, in order.
+
+        Any mutable sequence works, including lazily loaded stores: only the
+        presets of the visible rows are ever accessed while drawing.
+        """
+        return self._presets
+
+    def __len__(self) -> int:
+        return len(self._presets)
+
+    def set_presets(self, presets: MutableSequence[MessagePreset]) -> None:
+        """Replace the content of the list."""
+        self._presets = presets
+        self._unreadable_reported = False
+        self.cursor = None
+        self.scroll_to(0, 0, animate=False)
+        self._update_size()
+
+    def clear(self) -> None:
+        self.set_presets([])
+
+    def refresh_presets(self) -> None:
+        """Update the list after presets were added to :attr:`presets` directly."""
+        self._update_size()
+
+    def update_presets(
+        self,
+        presets: MutableSequence[MessagePreset],
+        moved: Callable[[int], int | None],
+    ) -> None:
+        """Show ``presets`` in place of the current rows without losing the place.
+
+        ``moved`` maps the index of a row before the update to its index
+        after it, or returns ``None`` for a row that was replaced or removed.
+        The cursor and the first visible row follow their presets; the other
+        rows keep their index.
+        """
+        top, line = divmod(round(self.scroll_offset.y), self.ROW_HEIGHT)
+        cursor = self.cursor
+        self._presets = presets
+        self._unreadable_reported = False
+        self._update_size()
+        new_top = moved(top)
+        self.scroll_to(
+            y=(top if new_top is None else new_top) * self.ROW_HEIGHT + line,
+            animate=False,
+            immediate=True,
+        )
+        if cursor is not None:
+            new_cursor = moved(cursor)
+            # set without the watcher, which would scroll to the cursor
+            self.set_reactive(
+                MessageList.cursor,
+                self.validate_cursor(cursor if new_cursor is None else new_cursor),
+            )
+            self.refresh()
+
+    def append(self, preset: MessagePreset) -> None:
+        self._presets.append(preset)
+        self._update_size()
+
+    def remove_at(self, index: int) -> MessagePreset | None:
+        """Remove and return the preset at ``index``, ``None`` if it cannot be read."""
+        preset = self._preset_at(index)
+        if preset is None:
+            return None
+        del self._presets[index]
+        if self.cursor is not None and self.cursor >= len(self._presets):
+            self.cursor = len(self._presets) - 1 if self._presets else None
+        self._update_size()
+        self.post_message(self.Deleted(self, index, preset))
+        return preset
+
+    def _preset_at(self, row: int) -> MessagePreset | None:
+        """Return the preset of ``row``, or ``None`` if reading it failed.
+
+        A lazily loaded store can fail when its file changed underneath;
+        the first failure is posted as :class:`Unreadable`.
+        """
+        try:
+            return self._presets[row]
+        except (OSError, ValueError) as error:
+            if not self._unreadable_reported:
+                self._unreadable_reported = True
+                self.post_message(self.Unreadable(self, row, error))
+            return None
+
+    def _update_size(self) -> None:
+        self.virtual_size = Size(self.scrollable_content_region.width, len(self._presets) * self.ROW_HEIGHT)
+        self.refresh()
+
+    def on_resize(self, event: events.Resize) -> None:
+        self._update_size()
+
+    def validate_cursor(self, cursor: int | None) -> int | None:
+        if cursor is None or not self._presets:
+            return None
+        return max(0, min(cursor, len(self._presets) - 1))
+
+    def watch_cursor(self, cursor: int | None) -> None:
+        if cursor is not None:
+            width = self.scrollable_content_region.width
+            self.scroll_to_region(
+                Region(0, cursor * self.ROW_HEIGHT, width, self.ROW_HEIGHT),
+                animate=False,
+                force=True,
+            )
+        self.refresh()
+
+    def render_line(self, y: int) -> Strip:
+        width = self.scrollable_content_region.width
+        row, line = divmod(self.scroll_offset.y + y, self.ROW_HEIGHT)
+        base = self.rich_style
+        if row >= len(self._presets):
+            return Strip.blank(width, base)
+        if row == self.cursor:
+            base = base + self.get_component_rich_style("message-list--cursor")
+        meta = Style.from_meta({"row": row})
+        preset = self._preset_at(row)
+        if line == 0:
+            label_width = max(0, width - len(self.DELETE_LABEL))
+            label = self.UNREADABLE_LABEL if preset is None else preset.text
+            text = Text(label, no_wrap=True, overflow="ellipsis")
+            text.truncate(label_width, overflow="ellipsis", pad=True)
+            segments = [
+                Segment(
+                    text.plain,
+                    base + self.get_component_rich_style("message-list--text") + meta,
+                ),
+                Segment(
+                    self.DELETE_LABEL,
+                    base
+                    + self.get_component_rich_style("message-list--delete")
+                    + Style.from_meta({"row": row, "delete": True}),
+                ),
+            ]
+        elif line == 1 and preset is not None:
+            params = (
+                f" Voice: {preset.voice}  Speed: {preset.speed}  Pitch: {preset.pitch}"
+                f"  Volume: {preset.volume}  Gap: {preset.word_gap}"
+            )
+            segments = [
+                Segment(params, base + self.get_component_rich_style("message-list--params") + meta)
+            ]
+        elif line == 1:
+            segments = [Segment("", base + meta)]
+        else:
+            segments = [Segment("", self.rich_style)]
+        return Strip(segments).adjust_cell_length(width, base if line < 2 else self.rich_style)
+
+    def on_click(self, event: events.Click) -> None:
+        row = event.style.meta.get("row")
+        if row is None or row >= len(self._presets):
+            return
+        self.cursor = row
+        if event.style.meta.get("delete"):
+            self.remove_at(row)
+        else:
+            self.action_select()
+
+    def action_cursor_up(self) -> None:
+        self.cursor = len(self._presets) - 1 if self.cursor is None else self.cursor - 1
+
+    def action_cursor_down(self) -> None:
+        self.cursor = 0 if self.cursor is None else self.cursor + 1
+
+    def action_page_up(self) -> None:
+        page = max(1, self.scrollable_content_region.height // self.ROW_HEIGHT)
+        self.cursor = (self.cursor or 0) - page
+
+    def action_page_down(self) -> None:
+        page = max(1, self.scrollable_content_region.height // self.ROW_HEIGHT)
+        self.cursor = (self.cursor or 0) + page
+
+    def action_first(self) -> None:
+        self.cursor = 0
+
+    def action_last(self) -> None:
+        self.cursor = len(self._presets) - 1
+
+    def action_select(self) -> None:
+        if self.cursor is None:
+            return
+        preset = self._preset_at(self.cursor)
+        if preset is not None:
+            self.post_message(self.Selected(self, self.cursor, preset))
+
+    def action_delete(self) -> None:
+        if self.cursor is not None:
+            self.remove_at(self.cursor)
@@ -0,0 +1,305 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# metrics.py                                #
+# ######################################### #
+
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterator
+import asyncio
+import json
+import math
+import time
+
+from app.atomic_file import write_atomic
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+PHASES = ("command_build", "spawn", "first_byte", "synthesis_end", "playback_end")
+QUANTILES = (50, 95, 99)
+DEFAULT_HISTORY = 1000
+PROMETHEUS_SUFFIX = ".prom"
+EXPORT_INTERVAL = 5.0
+
+
+@dataclass
+class UtteranceTiming:
+    """Timings of one synthesis, in seconds from the moment it started.
+
+    ``kind`` is ``"speak"`` for utterances played to the user and
+    ``"render"`` for audio rendered ahead into the cache. ``cache`` tells
+    whether the audio was a cache ``hit``, a ``miss``, ``prepared`` by a
+    render still running or ``off`` when there is no cache.
+    """
+
+    kind: str
+    engine: str
+    chars: int = 0
+    cache: str = "off"
+    timestamp: float = field(default_factory=time.time)
+    command_build: float | None = None
+    spawn: float | None = None
+    first_byte: float | None = None
+    synthesis_end: float | None = None
+    playback_end: float | None = None
+    error: str | None = None
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    def mark(self, phase: str, overwrite: bool = False) -> None:
+        """Record that ``phase`` was reached now, keeping the first time unless ``overwrite``."""
+        if overwrite or getattr(self, phase) is None:
+            setattr(self, phase, time.perf_counter() - self._start)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        del data["_start"]
+        return data
+
+
+_current: ContextVar[UtteranceTiming | None] = ContextVar("utterance_timing", default=None)
+
+
+@contextmanager
+def measuring(timing: UtteranceTiming | None) -> Iterator[UtteranceTiming | None]:
+    """Make :func:`mark` record into ``timing`` for the enclosed code and its tasks."""
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+
+
+def mark(phase: str, overwrite: bool = False) -> None:
+    """Record ``phase`` in the utterance being measured, if any."""
+    timing = _current.get()
+    if timing is not None:
+        timing.mark(phase, overwrite)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the nearest-rank ``q``-th percentile of sorted ``values``."""
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+class Metrics:
+    """Collect :class:`UtteranceTiming` records and summarize them.
+
+    The latest ``history`` records are kept for percentiles and export; the
+    counters cover the whole session. With ``export_path`` every record is
+    appended to a JSON Lines file, or the Prometheus text is rewritten when
+    the path ends with ``.prom``. On an event loop the file is written in a
+    thread, at most once every ``export_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        history: int = DEFAULT_HISTORY,
+        export_path: str | None = None,
+        export_interval: float = EXPORT_INTERVAL,
+    ) -> None:
+        self.records: deque[UtteranceTiming] = deque(maxlen=history)
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.listeners: list[Callable[[UtteranceTiming], None]] = []
+        self.last_error: OSError | None = None
+        self._unexported: list[UtteranceTiming] = []
+        self._exported_at = -math.inf
+        self._export_timer: asyncio.TimerHandle | None = None
+        self._export_task: asyncio.Task | None = None
+        self._counts: Counter[tuple[str, str, str]] = Counter()
+        self._errors: Counter[tuple[str, str]] = Counter()
+        self._sums: Counter[str] = Counter()
+        self._sample_counts: Counter[str] = Counter()
+
+    def record(self, timing: UtteranceTiming) -> None:
+        self.records.append(timing)
+        self._counts[(timing.kind, timing.engine, timing.cache)] += 1
+        if timing.error is not None:
+            self._errors[(timing.kind, timing.engine)] += 1
+        for phase in PHASES:
+            value = getattr(timing, phase)
+            if value is not None and timing.kind == "speak":
+                self._sums[phase] += value
+                self._sample_counts[phase] += 1
+        if self.export_path:
+            self._unexported.append(timing)
+            self._schedule_export()
+        for listener in self.listeners:
+            listener(timing)
+
+    def flush(self) -> None:
+        """Write the records not exported yet, right away."""
+        if self._export_timer is not None:
+            self._export_timer.cancel()
+            self._export_timer = None
+        if self._unexported:
+            self._write(*self._take_export())
+
+    async def close(self) -> None:
+        """Wait for the export in progress and write the records left."""
+        if self._export_timer is not None:
+            self._export_timer.cancel()
+            self._export_timer = None
+        if self._export_task is not None:
+            await asyncio.gather(self._export_task, return_exceptions=True)
+        if self._unexported:
+            await asyncio.to_thread(self._write, *self._take_export())
+
+    def _schedule_export(self) -> None:
+        if self._export_timer is not None or self._export_task is not None:
+            return  # the records are picked up by the export already planned
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()  # no event loop to wait on, e.g. a batch run
+            return
+        delay = max(0.0, self._exported_at + self.export_interval - time.monotonic())
+        self._export_timer = loop.call_later(delay, self._start_export)
+
+    def _start_export(self) -> None:
+        self._export_timer = None
+        self._export_task = asyncio.create_task(self._export())
+
+    async def _export(self) -> None:
+        try:
+            await asyncio.to_thread(self._write, *self._take_export())
+        except OSError as exc:
+            self.last_error = exc
+        finally:
+            self._export_task = None
+        if self._unexported:
+            self._schedule_export()
+
+    def _take_export(self) -> tuple[list[UtteranceTiming], str | None]:
+        """Return the records to append, or the Prometheus text to write, and forget them."""
+        records, self._unexported = self._unexported, []
+        self._exported_at = time.monotonic()
+        if self.export_path.endswith(PROMETHEUS_SUFFIX):
+            return [], self.prometheus_text()
+        return records, None
+
+    def _write(self, records: list[UtteranceTiming], text: str | None) -> None:
+        if text is not None:
+            write_atomic(self.export_path, text.encode("utf-8"))
+        else:
+            with open(self.export_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(timing.to_dict()) + "\n" for timing in records))
+
+    def _values(self, phase: str, kind: str) -> list[float]:
+        return sorted(
+            value
+            for timing in self.records
+            if timing.kind == kind and timing.error is None
+            and (value := getattr(timing, phase)) is not None
+        )
+
+    def percentiles(self, phase: str, kind: str = "speak") -> dict[int, float] | None:
+        """Return the p50/p95/p99 of ``phase`` over the recent records, ``None`` if empty."""
+        values = self._values(phase, kind)
+        if not values:
+            return None
+        return {q: percentile(values, q) for q in QUANTILES}
+
+    def per_minute(self, kind: str = "speak", now: float | None = None) -> int:
+        """Return how many utterances of ``kind`` completed in the last minute."""
+        since = (now or time.time()) - 60
+        return sum(1 for timing in self.records if timing.kind == kind and timing.timestamp >= since)
+
+    def cache_hits(self, kind: str = "speak") -> tuple[int, int]:
+        """Return the number of cache hits and of utterances of ``kind``."""
+        hits = sum(n for (k, _, cache), n in self._counts.items() if k == kind and cache == "hit")
+        total = sum(n for (k, _, _), n in self._counts.items() if k == kind)
+        return hits, total
+
+    def jsonl_text(self) -> str:
+        return "".join(json.dumps(timing.to_dict()) + "\n" for timing in self.records)
+
+    def prometheus_text(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP estui_utterances_total Syntheses completed, by kind, engine and cache result.",
+            "# TYPE estui_utterances_total counter",
+        ]
+        for (kind, engine, cache), count in sorted(self._counts.items()):
+            lines.append(f'estui_utterances_total{{kind="{kind}",engine="{engine}",cache="{cache}"}} {count}')
+        lines += [
+            "# HELP estui_utterance_errors_total Syntheses that failed or were cancelled.",
+            "# TYPE estui_utterance_errors_total counter",
+        ]
+        for (kind, engine), count in sorted(self._errors.items()):
+            lines.append(f'estui_utterance_errors_total{{kind="{kind}",engine="{engine}"}} {count}')
+        lines += [
+            "# HELP estui_utterance_seconds Seconds from the start of a spoken utterance to each phase.",
+            "# TYPE estui_utterance_seconds summary",
+        ]
+        for phase in PHASES:
+            quantiles = self.percentiles(phase)
+            if quantiles is not None:
+                for q, value in quantiles.items():
+                    lines.append(f'estui_utterance_seconds{{phase="{phase}",quantile="{q / 100}"}} {value:.6f}')
+            if self._sample_counts[phase]:
+                lines.append(f'estui_utterance_seconds_sum{{phase="{phase}"}} {self._sums[phase]:.6f}')
+                lines.append(f'estui_utterance_seconds_count{{phase="{phase}"}} {self._sample_counts[phase]}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve :class:`Metrics` over HTTP on a local port.
+
+    ``/metrics`` returns the Prometheus text and ``/metrics.jsonl`` the
+    recent records as JSON lines. aiohttp is imported on :meth:`start`, so
+    it is only needed when the metrics are served.
+    """
+
+    def __init__(self, metrics: Metrics, port: int, host: str = "127.0.0.1") -> None:
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._runner: "web.AppRunner | None" = None
+
+    def make_app(self) -> "web.Application":
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_prometheus)
+        app.router.add_get("/metrics.jsonl", self.handle_jsonl)
+        return app
+
+    async def start(self) -> None:
+        from aiohttp import web
+
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def handle_prometheus(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.Response(
+            body=self.metrics.prometheus_text().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def handle_jsonl(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.Response(text=self.metrics.jsonl_text(), content_type="application/jsonl")
@@ -0,0 +1,48 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# phonemes.py                               #
+# ######################################### #
+
+from collections import OrderedDict
+
+from app.engines import SynthesisEngine
+
+PHONEME_CACHE_SIZE = 512
+
+
+class PhonemeCache:
+    """Phoneme transcriptions made by an engine, keyed by voice and text.
+
+    The ``size`` most recently used transcriptions are kept in memory, so
+    retyping a text or selecting a preset again never transcribes it twice.
+    """
+
+    def __init__(self, engine: SynthesisEngine, size: int = PHONEME_CACHE_SIZE) -> None:
+        self.engine = engine
+        self.size = size
+        self._entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, voice: str, text: str) -> str | None:
+        """Return the cached transcription of ``text`` by ``voice``, if any."""
+        key = (voice, text)
+        phonemes = self._entries.get(key)
+        if phonemes is not None:
+            self._entries.move_to_end(key)
+        return phonemes
+
+    async def transcribe(self, voice: str, text: str) -> str:
+        """Return the transcription of ``text`` by ``voice``, from the cache if possible."""
+        phonemes = self.get(voice, text)
+        if phonemes is None:
+            phonemes = await self.engine.phonemes(voice, text)
+            self._entries[(voice, text)] = phonemes
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return phonemes
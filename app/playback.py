@@ -0,0 +1,231 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# playback.py                               #
+# ######################################### #
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Iterator
+import asyncio
+
+from app.audio_cache import AudioCache
+from app.chunked_synthesis import ChunkedSynthesizer
+from app.command_builder import EspeakParameters
+from app.engines import SynthesisEngine
+from app.metrics import Metrics, UtteranceTiming, mark, measuring
+
+
+class PlaybackScheduler:
+    """FIFO queue of utterances spoken one after the other.
+
+    While an utterance plays, the next one in the queue is already rendered
+    into the audio cache so that speech continues without gaps. When
+    :attr:`interrupt` is set, queuing a new utterance stops the current one.
+    Texts made of several sentences go through ``chunker`` when given, and
+    the timings of every synthesis are recorded into ``metrics``.
+    """
+
+    def __init__(
+        self,
+        engine: SynthesisEngine,
+        audio_cache: AudioCache | None = None,
+        chunker: ChunkedSynthesizer | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.engine = engine
+        self.audio_cache = audio_cache
+        self.chunker = chunker
+        self.metrics = metrics
+        self.interrupt = False
+        self.listeners: list[Callable[[int], None]] = []
+        self.last_error: Exception | None = None
+        self._queue: deque[EspeakParameters] = deque()
+        self._wakeup = asyncio.Event()
+        self._worker: asyncio.Task | None = None
+        self._current: asyncio.Task | None = None
+        self._prepared: dict[str, asyncio.Task] = {}
+        self._prefetch: asyncio.Task | None = None
+        self._speculative: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        """Number of utterances playing or waiting to be played."""
+        return len(self._queue) + (self._current is not None)
+
+    def start(self) -> None:
+        """Start the worker task on the running event loop."""
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop playback and the worker task."""
+        self.stop()
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def enqueue(self, params: EspeakParameters) -> None:
+        """Queue ``params`` to be spoken after the utterances already queued."""
+        if self.interrupt:
+            self.stop()
+        self._queue.append(params)
+        if self._current is not None and len(self._queue) == 1:
+            # the next utterance renders while the current one is spoken
+            self._prefetch = self.prepare(params)
+        self._wakeup.set()
+        self._notify()
+
+    def stop(self) -> None:
+        """Drop the queued utterances and kill the one being spoken."""
+        self._queue.clear()
+        for task in self._prepared.values():
+            task.cancel()
+        self._prepared.clear()
+        if self._current is not None:
+            self._current.cancel()
+        self._notify()
+
+    def prepare(self, params: EspeakParameters) -> asyncio.Task | None:
+        """Render ``params`` into the audio cache in the background."""
+        if self.audio_cache is None:
+            return None
+        key = self.audio_cache.key_for(params)
+        if key in self._prepared:
+            return self._prepared[key]
+        if key in self.audio_cache:
+            return None
+        task = asyncio.create_task(self._render(key, params))
+        self._prepared[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    async def render(self, params: EspeakParameters) -> None:
+        """Render ``params`` into the audio cache unless it is there already.
+
+        Unlike :meth:`prepare`, the render belongs to the caller and
+        :meth:`stop` does not cancel it.
+        """
+        if self.audio_cache is None:
+            raise RuntimeError("Rendering ahead requires the audio cache")
+        key = self.audio_cache.key_for(params)
+        if key not in self.audio_cache:
+            await self._render(key, params)
+
+    def speculate(self, params: EspeakParameters) -> asyncio.Task | None:
+        """Render ``params`` ahead of a Play that may never come.
+
+        The previous speculative render is cancelled, see
+        :meth:`cancel_speculation`.
+        """
+        self.cancel_speculation()
+        self._speculative = self.prepare(params)
+        return self._speculative
+
+    def cancel_speculation(self) -> None:
+        """Cancel the speculative render.
+
+        It is kept if an utterance being spoken or queued is waiting for it.
+        """
+        previous, self._speculative = self._speculative, None
+        if (
+            previous is not None
+            and previous is not self._prefetch
+            and any(previous is task for task in self._prepared.values())
+        ):
+            previous.cancel()
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._prepared.get(key) is task:
+            del self._prepared[key]
+        if not task.cancelled():
+            task.exception()  # failures resurface when the utterance is spoken
+
+    @contextmanager
+    def _measure(self, kind: str, params: EspeakParameters) -> Iterator[UtteranceTiming | None]:
+        """Record the timings of the enclosed synthesis into :attr:`metrics`."""
+        if self.metrics is None:
+            yield None
+            return
+        timing = UtteranceTiming(kind, self.engine.name, len(params.text))
+        try:
+            with measuring(timing):
+                yield timing
+        except asyncio.CancelledError:
+            timing.error = "cancelled"
+            raise
+        except Exception as exc:
+            timing.error = str(exc) or type(exc).__name__
+            raise
+        finally:
+            if kind == "speak":
+                timing.mark("playback_end")
+            self.metrics.record(timing)
+
+    async def _render(self, key: str, params: EspeakParameters) -> None:
+        assert self.audio_cache is not None
+        with self._measure("render", params) as timing:
+            if timing is not None:
+                timing.cache = "miss"
+            if self.chunker is not None and self.chunker.applies(params):
+                data = await self.chunker.synthesize(params)
+            else:
+                data = await self.engine.synthesize(params)
+            await asyncio.to_thread(self.audio_cache.put, key, data)
+
+    async def _speak_and_capture(self, params: EspeakParameters) -> bytes:
+        if self.chunker is not None and self.chunker.applies(params):
+            return await self.chunker.speak_and_capture(params)
+        return await self.engine.speak_and_capture(params)
+
+    async def speak(self, params: EspeakParameters) -> None:
+        """Speak ``params`` right away, through the audio cache if enabled."""
+        with self._measure("speak", params) as timing:
+            await self._speak(params, timing)
+
+    async def _speak(self, params: EspeakParameters, timing: UtteranceTiming | None) -> None:
+        if self.audio_cache is None:
+            if self.chunker is not None and self.chunker.applies(params):
+                await self.chunker.speak_and_capture(params)
+            else:
+                await self.engine.speak(params)
+            return
+        key = self.audio_cache.key_for(params)
+        # taking the render over protects it from speculate() cancelling it
+        pending = self._prepared.pop(key, None)
+        if pending is not None:
+            await pending
+        path = await asyncio.to_thread(self.audio_cache.get, key)
+        if timing is not None:
+            timing.cache = "prepared" if pending is not None else "miss" if path is None else "hit"
+        if path is None:
+            data = await self._speak_and_capture(params)
+            await asyncio.to_thread(self.audio_cache.put, key, data)
+        else:
+            mark("first_byte")
+            await self.engine.play_file(path)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            params = self._queue.popleft()
+            self._prefetch = self.prepare(self._queue[0]) if self._queue else None
+            self._current = asyncio.create_task(self.speak(params))
+            self._notify()
+            # wait() does not raise when only the utterance was cancelled
+            await asyncio.wait([self._current])
+            if not self._current.cancelled() and self._current.exception():
+                self.last_error = self._current.exception()
+            self._current = None
+            self._notify()
+
+    def _notify(self) -> None:
+        for listener in self.listeners:
+            listener(self.depth)
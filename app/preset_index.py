@@ -0,0 +1,257 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# preset_index.py                           #
+# ######################################### #
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable
+import re
+
+from app.presets import MessagePreset, parameter_number
+
+_WORD = re.compile(r"\w+")
+_RANGE = re.compile(r"^(\d*)(?:-(\d*))?$")
+
+
+@dataclass
+class PresetQuery:
+    """Filter over presets; empty fields do not restrict the result."""
+
+    text: str = ""
+    prefix: bool = False
+    voice: str = ""
+    speed: tuple[int | None, int | None] | None = None
+    pitch: tuple[int | None, int | None] | None = None
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.text or self.voice or self.speed or self.pitch)
+
+    def matches(self, preset: MessagePreset) -> bool:
+        """Return ``True`` if ``preset`` passes the filter."""
+        text = preset.text.lower()
+        if self.text and not (text.startswith(self.text) if self.prefix else self.text in text):
+            return False
+        if self.voice and preset.voice != self.voice:
+            return False
+        for bounds, value in ((self.speed, preset.speed), (self.pitch, preset.pitch)):
+            if bounds and not _in_bounds(parameter_number(value), bounds):
+                return False
+        return True
+
+
+def _parse_range(value: str) -> tuple[int | None, int | None] | None:
+    if not value:
+        return None
+    match = _RANGE.match(value)
+    if match is None:
+        raise ValueError(f"Invalid range: {value}")
+    low, high = match.group(1), match.group(2)
+    if "-" not in value:
+        high = low
+    return (int(low) if low else None, int(high) if high else None)
+
+
+def parse_query(query: str) -> PresetQuery:
+    """Parse the text typed in the search box.
+
+    ``voice:it``, ``speed:140-200`` and ``pitch:40-`` restrict parameters,
+    the remaining words are searched in the message text, as a prefix when
+    they start with ``^``.
+    """
+    result = PresetQuery()
+    words = []
+    for word in query.split():
+        name, sep, value = word.partition(":")
+        if sep and name in ("voice", "speed", "pitch"):
+            if name == "voice":
+                result.voice = value
+            else:
+                setattr(result, name, _parse_range(value))
+        else:
+            words.append(word)
+    text = " ".join(words)
+    if text.startswith("^"):
+        result.prefix = True
+        text = text[1:].lstrip()
+    result.text = text.lower()
+    return result
+
+
+def _in_bounds(value: int | None, bounds: tuple[int | None, int | None]) -> bool:
+    low, high = bounds
+    return value is not None and (low is None or value >= low) and (high is None or value <= high)
+
+
+class PresetIndex:
+    """Inverted indexes over a collection of presets.
+
+    Texts are indexed by word: a text query is looked up in the vocabulary
+    of distinct words and only the presets containing a matching word are
+    checked against the whole query. Voices and numeric values map to the
+    presets using them. Presets are added and removed one at a time, so the
+    index follows edits without rescanning the document.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, tuple[MessagePreset, float, str]] = {}
+        self._words: dict[str, set[int]] = {}
+        self._voices: dict[str, set[int]] = {}
+        self._speeds: dict[int, set[int]] = {}
+        self._pitches: dict[int, set[int]] = {}
+        self._next_order = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, preset: MessagePreset) -> bool:
+        return id(preset) in self._entries
+
+    def clear(self) -> None:
+        self.__init__()
+
+    def extend(self, presets: Iterable[MessagePreset]) -> None:
+        for preset in presets:
+            self.add(preset)
+
+    def add(self, preset: MessagePreset, order: float | None = None) -> None:
+        """Index ``preset``; ``order`` sorts results, by default after all others."""
+        key = id(preset)
+        if key in self._entries:
+            return
+        if order is None:
+            order = self._next_order
+        self._next_order = max(self._next_order, order) + 1
+        text = preset.text.lower()
+        self._entries[key] = (preset, order, text)
+        for word in set(_WORD.findall(text)):
+            self._words.setdefault(word, set()).add(key)
+        self._voices.setdefault(preset.voice, set()).add(key)
+        for table, value in ((self._speeds, preset.speed), (self._pitches, preset.pitch)):
+            number = parameter_number(value)
+            if number is not None:
+                table.setdefault(number, set()).add(key)
+
+    def order_of(self, preset: MessagePreset) -> float | None:
+        """Return the order ``preset`` was indexed with, ``None`` if not indexed."""
+        entry = self._entries.get(id(preset))
+        return entry[1] if entry is not None else None
+
+    def remove(self, preset: MessagePreset) -> None:
+        key = id(preset)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for word in set(_WORD.findall(entry[2])):
+            self._discard(self._words, word, key)
+        self._discard(self._voices, preset.voice, key)
+        for table, value in ((self._speeds, preset.speed), (self._pitches, preset.pitch)):
+            number = parameter_number(value)
+            if number is not None:
+                self._discard(table, number, key)
+
+    @staticmethod
+    def _discard(table: dict, value, key: int) -> None:
+        keys = table.get(value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del table[value]
+
+    @staticmethod
+    def _in_range(table: dict[int, set[int]], bounds: tuple[int | None, int | None]) -> set[int]:
+        result: set[int] = set()
+        for value, keys in table.items():
+            if _in_bounds(value, bounds):
+                result |= keys
+        return result
+
+    def _text_candidates(self, query: PresetQuery) -> set[int]:
+        words = _WORD.findall(query.text)
+        if not words:
+            return set(self._entries)
+        candidates: set[int] | None = None
+        for position, word in enumerate(words):
+            if query.prefix and position == 0:
+                matching = [w for w in self._words if w.startswith(word)]
+            else:
+                matching = [w for w in self._words if word in w]
+            keys: set[int] = set().union(*(self._words[w] for w in matching))
+            candidates = keys if candidates is None else candidates & keys
+            if not candidates:
+                break
+        return candidates or set()
+
+    def search(self, query: PresetQuery) -> list[MessagePreset]:
+        """Return the presets matching ``query`` in document order."""
+        filters: list[set[int]] = []
+        if query.voice:
+            filters.append(self._voices.get(query.voice, set()))
+        if query.speed:
+            filters.append(self._in_range(self._speeds, query.speed))
+        if query.pitch:
+            filters.append(self._in_range(self._pitches, query.pitch))
+        if query.text:
+            filters.append(self._text_candidates(query))
+        if not filters:
+            keys: set[int] = set(self._entries)
+        else:
+            filters.sort(key=len)
+            keys = filters[0].intersection(*filters[1:])
+        entries = [self._entries[key] for key in keys]
+        if query.text:
+            if query.prefix:
+                entries = [e for e in entries if e[2].startswith(query.text)]
+            else:
+                entries = [e for e in entries if query.text in e[2]]
+        entries.sort(key=lambda entry: entry[1])
+        return [entry[0] for entry in entries]
+
+
+class ContentIndex:
+    """Count of the presets spoken the same, by content digest.
+
+    Unlike :class:`PresetIndex` it keeps no preset, so it can be built from
+    a snapshot of the document in another thread, then follow the edits.
+    """
+
+    def __init__(self, presets: Iterable[MessagePreset] = ()) -> None:
+        self._counts: Counter[str] = Counter(preset.content_digest() for preset in presets)
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def count(self, preset: MessagePreset) -> int:
+        """Return how many indexed presets are spoken like ``preset``."""
+        return self._counts[preset.content_digest()]
+
+    def add(self, preset: MessagePreset) -> None:
+        self._counts[preset.content_digest()] += 1
+
+    def remove(self, preset: MessagePreset) -> None:
+        digest = preset.content_digest()
+        self._counts[digest] -= 1
+        if self._counts[digest] <= 0:
+            del self._counts[digest]
+
+
+def unique_positions(presets: Iterable[MessagePreset]) -> tuple[list[int], ContentIndex]:
+    """Return the positions of the presets not spoken like an earlier one.
+
+    The index of the presets kept is returned too.
+    """
+    seen: set[str] = set()
+    positions = []
+    for position, preset in enumerate(presets):
+        digest = preset.content_digest()
+        if digest not in seen:
+            seen.add(digest)
+            positions.append(position)
+    index = ContentIndex()
+    index._counts.update(seen)
+    return positions, index
@@ -0,0 +1,563 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# preset_store.py                           #
+# ######################################### #
+
+from collections.abc import MutableSequence
+from typing import Iterable, Iterator
+import codecs
+import copy
+import json
+import os
+import re
+import threading
+
+from app.atomic_file import atomic_write
+from app.presets import MessageDocument, MessagePreset
+
+JSONL_SUFFIX = ".jsonl"
+COPY_CHUNK = 1024 * 1024
+LOAD_BATCH = 2000
+
+
+def _encode(preset: MessagePreset) -> bytes:
+    return (json.dumps(preset.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _decode(line: bytes) -> MessagePreset:
+    return MessagePreset.from_dict(json.loads(line))
+
+
+class StaleDocumentError(OSError):
+    """Raised when a line read lazily is not the one that was indexed."""
+
+
+class JsonlPresetStore(MutableSequence):
+    """Presets kept in a JSON Lines file, one preset per line.
+
+    Opening the file only records where every line starts; a preset is
+    parsed the first time it is accessed. :meth:`save` serializes only the
+    presets added or replaced since the last save and copies the bytes of
+    all other lines unchanged, then atomically replaces the file.
+
+    To save from another thread, save a :meth:`snapshot` there and hand it
+    back to :meth:`adopt` once written. Every snapshot reads through its own
+    handle on the file, so closing one never affects the others.
+    """
+
+    def __init__(self, path: str, _scan: bool = True) -> None:
+        self.path = str(path)
+        # ``_spans[i]`` is the (offset, length) of an unchanged line on disk,
+        # or ``None`` for presets that must be serialized on save.
+        self._spans: list[tuple[int, int] | None] = []
+        self._items: list[MessagePreset | None] = []
+        # hash of the line of every preset on disk, ``None`` when changed
+        self._hashes: list[int | None] = []
+        self._modified = False
+        self._version = 0
+        self._file = None
+        self._file_lock = threading.Lock()
+        # set once a lazy read found different bytes: the offsets are void
+        self._stale = False
+        if _scan:
+            self._scan()
+
+    @classmethod
+    def create(cls, path: str, presets: Iterable[MessagePreset] = ()) -> "JsonlPresetStore":
+        """Return a store for ``path`` holding ``presets``, without reading it."""
+        store = cls(path, _scan=False)
+        store.extend(presets)
+        store._modified = True
+        return store
+
+    def _scan(self) -> None:
+        for batch, _ in self.scan_batches():
+            self.add_scanned(batch)
+
+    def scan_batches(self, batch_size: int = LOAD_BATCH) -> Iterator[tuple[list, float]]:
+        """Scan the file, yielding batches of lines and the fraction read so far.
+
+        The store is left untouched, so the scan can run in another thread;
+        pass every batch to :meth:`add_scanned` in order.
+        """
+        size = os.path.getsize(self.path)
+        offset = 0
+        batch: list[tuple[tuple[int, int] | None, MessagePreset | None, int]] = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                length = len(line)
+                if line.strip():
+                    if line.endswith(b"\n"):
+                        batch.append(((offset, length), None, hash(line)))
+                    else:
+                        # the last line lacks its newline: parse it now so
+                        # that save() re-serializes it instead of copying it
+                        batch.append((None, _decode(line), hash(line)))
+                offset += length
+                if len(batch) >= batch_size:
+                    yield batch, offset / size
+                    batch = []
+        if batch or not size:
+            yield batch, 1.0
+
+    def add_scanned(self, batch: list) -> None:
+        """Append the lines of a batch produced by :meth:`scan_batches`."""
+        for span, item, line_hash in batch:
+            self._spans.append(span)
+            self._items.append(item)
+            self._hashes.append(line_hash)
+            if span is None:
+                self._modified = True
+                self._version += 1
+
+    def _read(self, span: tuple[int, int]) -> bytes:
+        with self._file_lock:
+            if self._file is None:
+                # unbuffered, so that every read sees the file as it is now
+                self._file = open(self.path, "rb", buffering=0)
+            self._file.seek(span[0])
+            return self._file.read(span[1])
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int | slice) -> MessagePreset | list[MessagePreset]:
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        item = self._items[index]
+        if item is None:
+            span = self._spans[index]
+            assert span is not None
+            if self._stale:
+                raise StaleDocumentError(f"{self.path} changed since it was read")
+            line = self._read(span)
+            if hash(line) != self._hashes[index]:
+                # rewritten in place: no offset can be trusted until rebased
+                self._stale = True
+                raise StaleDocumentError(f"{self.path} changed since it was read")
+            item = _decode(line)
+            self._items[index] = item
+        return item
+
+    def __setitem__(self, index: int | slice, preset: MessagePreset | Iterable[MessagePreset]) -> None:
+        if isinstance(index, slice):
+            presets = list(preset)
+            self._items[index] = presets
+            self._spans[index] = [None] * len(presets)
+            self._hashes[index] = [None] * len(presets)
+        else:
+            self._items[index] = preset
+            self._spans[index] = None
+            self._hashes[index] = None
+        self._modified = True
+        self._version += 1
+
+    def __delitem__(self, index: int | slice) -> None:
+        del self._items[index]
+        del self._spans[index]
+        del self._hashes[index]
+        self._modified = True
+        self._version += 1
+
+    def insert(self, index: int, preset: MessagePreset) -> None:
+        self._items.insert(index, preset)
+        self._spans.insert(index, None)
+        self._hashes.insert(index, None)
+        self._modified = True
+        self._version += 1
+
+    def retain(self, positions: list[int]) -> None:
+        """Keep only the presets at ``positions``, in that order, without parsing them."""
+        self._spans = [self._spans[index] for index in positions]
+        self._items = [self._items[index] for index in positions]
+        self._hashes = [self._hashes[index] for index in positions]
+        self._modified = True
+        self._version += 1
+
+    @property
+    def modified(self) -> bool:
+        """``True`` if there are changes not saved yet."""
+        return self._modified
+
+    @property
+    def stale(self) -> bool:
+        """``True`` once a lazy read found the file changed; see :meth:`rebase`."""
+        return self._stale
+
+    def snapshot(self) -> "JsonlPresetStore":
+        """Return a copy of the current presets that can be saved from another thread.
+
+        Only the bookkeeping is copied: unchanged lines are still read from
+        the file this store was loaded from, through a duplicate of its
+        handle that the snapshot closes once saved, or on :meth:`close`.
+        """
+        snapshot = copy.copy(self)
+        snapshot._spans = list(self._spans)
+        snapshot._items = list(self._items)
+        snapshot._hashes = list(self._hashes)
+        snapshot._file = None
+        snapshot._file_lock = threading.Lock()
+        with self._file_lock:
+            if self._file is None and any(span is not None for span in self._spans):
+                self._file = open(self.path, "rb")
+            if self._file is not None:
+                snapshot._file = os.fdopen(os.dup(self._file.fileno()), "rb")
+        return snapshot
+
+    def share_parsed(self, snapshot: "JsonlPresetStore") -> bool:
+        """Take the presets ``snapshot`` parsed, if nothing changed since it was taken.
+
+        Both then hold the same objects, e.g. for an index built from the
+        snapshot in another thread. Return ``False`` when the store was edited.
+        """
+        if snapshot._version != self._version:
+            return False
+        # a line may have been parsed by both: keep the one of the snapshot
+        for index, item in enumerate(snapshot._items):
+            if item is not None:
+                self._items[index] = item
+        return True
+
+    def adopt(self, snapshot: "JsonlPresetStore") -> bool:
+        """Take over the saved state of ``snapshot`` if nothing changed since.
+
+        Return ``False`` when the store was edited meanwhile; it then keeps
+        its changes, and reading the old file, until the next save.
+        """
+        if snapshot._version != self._version or snapshot._modified:
+            return False
+        self.close()
+        self._spans = snapshot._spans
+        self._hashes = snapshot._hashes
+        self._modified = False
+        self._stale = False
+        return True
+
+    def rebase(self, other: "JsonlPresetStore") -> None:
+        """Read the presets from the file of ``other`` from now on.
+
+        ``other`` is a store read from :attr:`path` after the file changed on
+        disk, and this store must have been edited to hold the same presets.
+        """
+        self.close()
+        self._spans = list(other._spans)
+        self._hashes = list(other._hashes)
+        self._modified = other._modified
+        self._stale = False
+        self._version += 1
+
+    def line_hashes(self) -> list[int | None]:
+        """Return the hash of the line of every preset as last read or saved.
+
+        Presets changed since are ``None``.
+        """
+        return list(self._hashes)
+
+    def save(self) -> None:
+        """Persist the changes made since the last save."""
+        if not self._modified:
+            return
+        if self._stale:
+            # the unchanged lines would be copied from the wrong offsets
+            raise StaleDocumentError(f"{self.path} changed since it was read")
+        source = self._file or (open(self.path, "rb") if os.path.exists(self.path) else None)
+        try:
+            self._save(source)
+        finally:
+            with self._file_lock:
+                if source is not None:
+                    source.close()
+                self._file = None
+
+    def _save(self, source) -> None:
+        spans: list[tuple[int, int] | None] = []
+        hashes: list[int | None] = []
+        position = 0
+        run_start = run_end = 0
+
+        def flush(out) -> None:
+            cursor = run_start
+            while cursor < run_end:
+                with self._file_lock:
+                    source.seek(cursor)
+                    chunk = source.read(min(COPY_CHUNK, run_end - cursor))
+                out.write(chunk)
+                cursor += len(chunk)
+
+        with atomic_write(self.path) as out:
+            for span, item, line_hash in zip(self._spans, self._items, self._hashes):
+                if span is None:
+                    if run_end > run_start:
+                        flush(out)
+                        run_start = run_end = 0
+                    line = _encode(item)
+                    out.write(line)
+                    spans.append((position, len(line)))
+                    hashes.append(hash(line))
+                    position += len(line)
+                    continue
+                hashes.append(line_hash)
+                offset, length = span
+                if offset != run_end or run_end == run_start:
+                    if run_end > run_start:
+                        flush(out)
+                    run_start = run_end = offset
+                run_end += length
+                spans.append((position, length))
+                position += length
+            if run_end > run_start:
+                flush(out)
+        self._spans = spans
+        self._hashes = hashes
+        self._modified = False
+
+    def close(self) -> None:
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+
+
+def is_jsonl(path: str) -> bool:
+    return str(path).lower().endswith(JSONL_SUFFIX)
+
+
+def load_presets(path: str) -> MutableSequence:
+    """Return the presets stored in ``path``, lazily for JSON Lines files."""
+    if is_jsonl(path):
+        return JsonlPresetStore(path)
+    return MessageDocument.load(path).messages
+
+
+_JSON_SPACE = re.compile(r"[ \t\r\n]*")
+# characters that may still extend a number decoded at the end of the text
+_JSON_NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+
+
+class _JsonScanner:
+    """Values of a JSON text decoded one at a time, reading only what they need."""
+
+    def __init__(self, f, size: int, chunk_size: int) -> None:
+        self.f = f
+        self.size = size or 1
+        self.chunk_size = chunk_size
+        self.read = 0
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        self._decode = codecs.getincrementaldecoder("utf-8")().decode
+        self._decoder = json.JSONDecoder()
+
+    def _more(self) -> None:
+        if self.eof:
+            raise ValueError(f"Unexpected end of JSON at character {len(self.text)}")
+        data = self.f.read(self.chunk_size)
+        self.read += len(data)
+        self.eof = not data
+        self.text = self.text[self.pos:] + self._decode(data, final=self.eof)
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Return the next character that is not white space."""
+        while True:
+            self.pos = _JSON_SPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            self._more()
+
+    def expect(self, characters: str) -> str:
+        character = self.peek()
+        if character not in characters:
+            raise ValueError(f"Expected one of {characters!r} in JSON, found {character!r}")
+        self.pos += 1
+        return character
+
+    def value(self):
+        """Decode the next value; a value is only complete once followed by another character.
+
+        A number is complete once followed by a character that cannot
+        continue it: ``1.`` or ``1e`` at the end of the text may be ``1.5``
+        or ``1e3`` once more is read.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                if self.eof or (
+                    end < len(self.text)
+                    and not (
+                        isinstance(value, (int, float))
+                        and _JSON_NUMBER_TAIL.match(self.text, end).end() == len(self.text)
+                    )
+                ):
+                    self.pos = end
+                    return value
+            self._more()
+
+    def finish(self) -> None:
+        """Check that nothing but white space follows the last value."""
+        while True:
+            self.pos = _JSON_SPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                raise ValueError(f"Extra data after JSON at character {self.pos}")
+            if self.eof:
+                return
+            self._more()
+
+
+def _json_messages(path: str, chunk_size: int = COPY_CHUNK) -> Iterator[tuple[dict, float]]:
+    """Yield the messages of a JSON document with the fraction of the file read.
+
+    The file is parsed as it is read, so the first messages come before the
+    whole document is in memory.
+    """
+    with open(path, "rb") as f:
+        scanner = _JsonScanner(f, os.fstat(f.fileno()).st_size, chunk_size)
+        scanner.expect("{")
+        if scanner.peek() == "}":
+            scanner.pos += 1
+            scanner.finish()
+            return
+        while True:
+            key = scanner.value()
+            if not isinstance(key, str):
+                raise ValueError(f"Invalid JSON object key: {key!r}")
+            scanner.expect(":")
+            if key == "messages":
+                scanner.expect("[")
+                if scanner.peek() == "]":
+                    scanner.pos += 1
+                else:
+                    while True:
+                        yield scanner.value(), min(scanner.read / scanner.size, 1.0)
+                        if scanner.expect(",]") == "]":
+                            break
+            else:
+                scanner.value()
+            if scanner.expect(",}") == "}":
+                break
+        scanner.finish()
+
+
+class PresetReader:
+    """Read the presets of ``path`` in batches, for loading in the background.
+
+    :meth:`batches` does the reading and parsing and leaves :attr:`presets`
+    untouched, so it can run in a worker thread; :meth:`add` appends one of
+    its batches to :attr:`presets` from the thread that shows them. Invalid
+    presets of JSON documents are left out and described in :attr:`errors`.
+    """
+
+    def __init__(self, path: str, batch_size: int = LOAD_BATCH) -> None:
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.presets: MutableSequence = (
+            JsonlPresetStore(self.path, _scan=False) if is_jsonl(self.path) else []
+        )
+        self.errors: list[str] = []
+
+    def batches(self) -> Iterator[tuple[list, float]]:
+        """Yield batches of presets with the fraction of the document read so far."""
+        if isinstance(self.presets, JsonlPresetStore):
+            yield from self.presets.scan_batches(self.batch_size)
+            return
+        batch: list[MessagePreset] = []
+        empty = True
+        for position, (message, progress) in enumerate(_json_messages(self.path)):
+            empty = False
+            try:
+                batch.append(MessagePreset.from_dict(message))
+            except ValueError as exc:
+                self.errors.append(f"message {position + 1}: {exc}")
+                continue
+            if len(batch) >= self.batch_size:
+                yield batch, progress
+                batch = []
+        if batch or empty:
+            yield batch, 1.0
+
+    def hashes(self, batch: list) -> list[int]:
+        """Return the hashes :func:`document_hashes` gives the presets of ``batch``."""
+        if isinstance(self.presets, JsonlPresetStore):
+            return [line_hash for _, _, line_hash in batch]
+        return [preset.content_hash() for preset in batch]
+
+    def add(self, batch: list) -> range:
+        """Append ``batch`` and return the indexes it now occupies."""
+        start = len(self.presets)
+        if isinstance(self.presets, JsonlPresetStore):
+            self.presets.add_scanned(batch)
+        else:
+            self.presets.extend(batch)
+        return range(start, len(self.presets))
+
+
+def document_hashes(presets: MutableSequence) -> list[int | None]:
+    """Return a hash of every preset, to find what changed in a new version.
+
+    Lines of JSON Lines stores are hashed as bytes, so comparing versions
+    does not parse them; other presets are hashed by content.
+    """
+    if isinstance(presets, JsonlPresetStore):
+        return presets.line_hashes()
+    return [preset.content_hash() for preset in presets]
+
+
+def snapshot_presets(presets: MutableSequence) -> MutableSequence:
+    """Return a copy of ``presets`` to save while the original is edited.
+
+    Pass it to :func:`close_snapshot` once done with it.
+    """
+    if isinstance(presets, JsonlPresetStore):
+        return presets.snapshot()
+    return list(presets)
+
+
+def share_parsed(presets: MutableSequence, snapshot: MutableSequence) -> bool:
+    """Make ``presets`` hold the very objects of ``snapshot``, see :meth:`JsonlPresetStore.share_parsed`."""
+    if isinstance(presets, JsonlPresetStore):
+        return presets.share_parsed(snapshot)
+    # a list snapshot holds the same objects already
+    return True
+
+
+def close_snapshot(snapshot: MutableSequence) -> None:
+    """Release the file a snapshot of a JSON Lines store reads from."""
+    if isinstance(snapshot, JsonlPresetStore):
+        snapshot.close()
+
+
+def retain_presets(presets: MutableSequence, positions: list[int]) -> None:
+    """Keep only the presets at ``positions`` in ``presets``, in one pass."""
+    if isinstance(presets, JsonlPresetStore):
+        presets.retain(positions)
+    else:
+        presets[:] = [presets[index] for index in positions]
+
+
+def save_presets(path: str, presets: MutableSequence) -> None:
+    """Save ``presets`` to ``path`` in the format given by its extension."""
+    if isinstance(presets, JsonlPresetStore) and presets.path == str(path):
+        presets.save()
+    elif is_jsonl(path):
+        JsonlPresetStore.create(path, presets).save()
+    else:
+        MessageDocument(list(presets)).save(path)
+
+
+def convert(source: str, target: str) -> int:
+    """Copy the presets of ``source`` to ``target``, converting the format.
+
+    Return the number of presets written.
+    """
+    presets = load_presets(source)
+    save_presets(target, list(presets))
+    return len(presets)
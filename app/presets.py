@@ -7,14 +7,44 @@
 # presets.py                                #
 # ######################################### #
 
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
+from functools import lru_cache
+import hashlib
 import json
+import sys
 from typing import List
 
+from app.atomic_file import atomic_write
+from app.command_builder import EspeakParameters, normalize_parameters
 
-@dataclass
+NUMERIC_FIELDS = ("speed", "pitch", "volume", "word_gap")
+# documents use few distinct values, parsed once each
+NUMBER_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=NUMBER_CACHE_SIZE)
+def parameter_number(value: str) -> int | None:
+    """Return the integer value of a parameter string, ``None`` if not a non-negative integer."""
+    value = value.strip()
+    if value.isascii() and value.isdigit():
+        return int(value)
+    return None
+
+
+def is_parameter_number(value: str) -> bool:
+    """Return ``True`` for a non-negative integer, or a blank value keeping the default."""
+    return not value.strip() or parameter_number(value) is not None
+
+
+@dataclass(slots=True)
 class MessagePreset:
-    """Parameters for a stored TTS message."""
+    """Parameters for a stored TTS message.
+
+    Presets are slotted and their voice and numeric parameters are interned,
+    so large libraries only pay for the text of each message. Values are kept
+    as the strings found in the document, which makes the JSON round trip
+    lossless, e.g. for numbers written with leading zeros.
+    """
 
     text: str
     voice: str
@@ -23,6 +53,57 @@ class MessagePreset:
     volume: str
     word_gap: str
 
+    def __post_init__(self) -> None:
+        self.voice = sys.intern(self.voice)
+        self.speed = sys.intern(self.speed)
+        self.pitch = sys.intern(self.pitch)
+        self.volume = sys.intern(self.volume)
+        self.word_gap = sys.intern(self.word_gap)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MessagePreset":
+        """Build a preset from its JSON representation, validating it.
+
+        Numeric parameters are non-negative integers, or empty for the default.
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Invalid preset: {data!r}")
+        if set(data) != set(PRESET_FIELDS):
+            raise ValueError(f"Invalid preset fields: {sorted(data)}")
+        values = [data[name] for name in PRESET_FIELDS]
+        for name, value in zip(PRESET_FIELDS, values):
+            if not isinstance(value, str):
+                raise ValueError(f"Invalid value for {name}: {value!r}")
+            if name in NUMERIC_FIELDS and not is_parameter_number(value):
+                raise ValueError(f"Invalid value for {name}: {value!r}")
+        return cls(*values)
+
+    def to_dict(self) -> dict:
+        """Return the JSON representation of the preset."""
+        return {name: getattr(self, name) for name in PRESET_FIELDS}
+
+    def content_hash(self) -> int:
+        """Return a hash of the preset values, stable within the process."""
+        return hash((self.text, self.voice, self.speed, self.pitch, self.volume, self.word_gap))
+
+    def content_digest(self) -> str:
+        """Return a hash of the normalized preset values, stable across processes.
+
+        Presets with the same digest are spoken the same way even if they are
+        written differently, see :func:`normalize_parameters`.
+        """
+        params = normalize_parameters(
+            EspeakParameters(self.text, self.voice, self.speed, self.pitch, self.volume, self.word_gap)
+        )
+        # the separator is a control character, which sanitized texts never contain
+        payload = "\x1f".join(
+            (params.text, params.voice, params.speed, params.pitch, params.volume, params.word_gap)
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+PRESET_FIELDS = tuple(field.name for field in fields(MessagePreset))
+
 
 @dataclass
 class MessageDocument:
@@ -32,11 +113,11 @@ class MessageDocument:
 
     def to_dict(self) -> dict:
         """Return a serializable representation."""
-        return {"messages": [asdict(msg) for msg in self.messages]}
+        return {"messages": [msg.to_dict() for msg in self.messages]}
 
     def save(self, path: str) -> None:
         """Save document to ``path`` in JSON format."""
-        with open(path, "w", encoding="utf-8") as f:
+        with atomic_write(path, "w") as f:
             json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
 
     @classmethod
@@ -44,6 +125,6 @@ class MessageDocument:
         """Load document from ``path``."""
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
-        messages = [MessagePreset(**m) for m in data.get("messages", [])]
+        messages = [MessagePreset.from_dict(m) for m in data.get("messages", [])]
         return cls(messages)
 
@@ -0,0 +1,47 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# startup_profile.py                        #
+# ######################################### #
+
+import time
+
+
+class StartupProfile:
+    """Time spent in each phase of the start-up, for ``--startup-profile``.
+
+    :meth:`mark` ends the phase running since the previous mark. Work done
+    after the first frame runs concurrently, so :meth:`done` records when it
+    finished instead.
+    """
+
+    def __init__(self, start: float | None = None) -> None:
+        self.start = time.perf_counter() if start is None else start
+        self.phases: list[tuple[str, float]] = []
+        self.background: list[tuple[str, float]] = []
+        self._last = self.start
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def done(self, task: str) -> None:
+        """Record that ``task``, started after the first frame, is complete."""
+        if all(name != task for name, _ in self.background):
+            self.background.append((task, time.perf_counter() - self.start))
+
+    def report(self) -> str:
+        width = max((len(name) for name, _ in self.phases + self.background), default=0)
+        lines = ["Start-up phases:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<{width}}  {seconds * 1000:8.1f} ms")
+        lines.append(f"  {'total':<{width}}  {(self._last - self.start) * 1000:8.1f} ms")
+        if self.background:
+            lines.append("After the first frame (done at):")
+            for name, at in self.background:
+                lines.append(f"  {name:<{width}}  {at * 1000:8.1f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,231 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# synthesis_service.py                      #
+# ######################################### #
+
+from dataclasses import fields
+import asyncio
+
+from aiohttp import web
+
+from app.audio_cache import AudioCache, content_key
+from app.chunked_synthesis import ChunkedSynthesizer
+from app.command_builder import EspeakParameters, sanitize_text
+from app.defaults import Defaults
+from app.engines import SynthesisEngine
+from app.metrics import Metrics, UtteranceTiming, measuring
+
+DEFAULT_SERVE_HOST = Defaults.SERVE_HOST
+DEFAULT_SERVE_WORKERS = Defaults.SERVE_WORKERS
+DEFAULT_SERVE_BACKLOG = Defaults.SERVE_BACKLOG
+PARAMETER_NAMES = tuple(field.name for field in fields(EspeakParameters))
+NUMERIC_PARAMETERS = ("speed", "pitch", "volume", "word_gap")
+
+
+class Overloaded(Exception):
+    """Raised when a request would exceed the synthesis backlog."""
+
+
+def _parameter_number(name: str, value: int | str) -> int:
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.isascii() or not value.isdigit():
+            raise ValueError(f"Invalid value for {name}: expected a non-negative integer")
+        value = int(value)
+    if value < 0:
+        raise ValueError(f"Invalid value for {name}: expected a non-negative integer")
+    return value
+
+
+def parse_parameters(data: object) -> EspeakParameters:
+    """Return the :class:`EspeakParameters` described by a JSON object.
+
+    Missing fields take their default value. The numeric parameters must be
+    non-negative integers, given as numbers or strings. The text is sanitized
+    like in the editor.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    unknown = set(data) - set(PARAMETER_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {', '.join(sorted(unknown))}")
+    values = {}
+    for name, value in data.items():
+        if isinstance(value, bool) or not isinstance(value, (str, int)):
+            raise ValueError(f"Invalid value for {name}")
+        if name in NUMERIC_PARAMETERS:
+            value = _parameter_number(name, value)
+        values[name] = str(value)
+    params = EspeakParameters(**values)
+    params.text = sanitize_text(params.text)
+    if not params.text:
+        raise ValueError("Missing text")
+    return params
+
+
+class SynthesisService:
+    """Synthesize WAV audio for concurrent clients.
+
+    Requests for the same parameters made while one is being rendered wait
+    for that render instead of starting their own. At most ``workers``
+    renders run at once and at most ``backlog`` more wait for a worker;
+    further requests raise :class:`Overloaded`. Audio goes through
+    ``audio_cache`` when given, so the TUI and the clients share it.
+    """
+
+    def __init__(
+        self,
+        engine: SynthesisEngine,
+        audio_cache: AudioCache | None = None,
+        workers: int = DEFAULT_SERVE_WORKERS,
+        backlog: int = DEFAULT_SERVE_BACKLOG,
+        chunker: ChunkedSynthesizer | None = None,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self.engine = engine
+        self.audio_cache = audio_cache
+        self.workers = workers
+        self.backlog = backlog
+        self.chunker = chunker
+        self.metrics = metrics
+        self.coalesced = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(workers)
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @property
+    def inflight(self) -> int:
+        """Number of distinct renders running or waiting for a worker."""
+        return len(self._inflight)
+
+    def key_for(self, params: EspeakParameters) -> str:
+        if self.audio_cache is not None:
+            return self.audio_cache.key_for(params)
+        return content_key(params)
+
+    async def synthesize(self, params: EspeakParameters) -> tuple[bytes, str]:
+        """Return the WAV for ``params`` and how it was obtained.
+
+        The second value is ``"hit"`` for cached audio, ``"coalesced"`` when
+        another request rendered it and ``"miss"`` otherwise.
+        """
+        key = self.key_for(params)
+        if self.audio_cache is not None:
+            path = await asyncio.to_thread(self.audio_cache.get, key)
+            if path is not None:
+                try:
+                    return await asyncio.to_thread(path.read_bytes), "hit"
+                except OSError:
+                    pass  # evicted meanwhile, render it again
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            # a client going away must not cancel the render others wait for
+            return await asyncio.shield(task), "coalesced"
+        if len(self._inflight) >= self.workers + self.backlog:
+            self.rejected += 1
+            raise Overloaded(f"{len(self._inflight)} syntheses in progress")
+        task = asyncio.create_task(self._render(key, params))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task), "miss"
+
+    async def _render(self, key: str, params: EspeakParameters) -> bytes:
+        async with self._semaphore:
+            timing = None
+            if self.metrics is not None:
+                timing = UtteranceTiming("serve", self.engine.name, len(params.text), "miss")
+            try:
+                with measuring(timing):
+                    if self.chunker is not None and self.chunker.applies(params):
+                        data = await self.chunker.synthesize(params)
+                    else:
+                        data = await self.engine.synthesize(params)
+            except Exception as exc:
+                if timing is not None:
+                    timing.error = str(exc) or type(exc).__name__
+                raise
+            finally:
+                if timing is not None:
+                    self.metrics.record(timing)
+        if self.audio_cache is not None:
+            await asyncio.to_thread(self.audio_cache.put, key, data)
+        return data
+
+    async def close(self) -> None:
+        """Cancel the renders still in progress."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "engine": self.engine.name,
+            "workers": self.workers,
+            "backlog": self.backlog,
+            "inflight": self.inflight,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "cached": len(self.audio_cache) if self.audio_cache is not None else None,
+        }
+
+
+class SynthesisServer:
+    """HTTP front end of a :class:`SynthesisService`.
+
+    ``POST /synthesize`` takes the parameters as a JSON object and answers
+    with ``audio/wav``; ``GET /health`` returns the service counters.
+    Overload is answered with ``503`` and a ``Retry-After`` header.
+    """
+
+    def __init__(self, service: SynthesisService, port: int, host: str = DEFAULT_SERVE_HOST) -> None:
+        self.service = service
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/synthesize", self.handle_synthesize)
+        app.router.add_get("/health", self.handle_health)
+        return app
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.make_app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+        if self.port == 0:
+            self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        await self.service.close()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def handle_synthesize(self, request: web.Request) -> web.Response:
+        try:
+            params = parse_parameters(await request.json())
+        except ValueError as exc:
+            return web.json_response({"error": str(exc)}, status=400)
+        try:
+            data, source = await self.service.synthesize(params)
+        except Overloaded as exc:
+            return web.json_response(
+                {"error": f"Overloaded: {exc}"}, status=503, headers={"Retry-After": "1"}
+            )
+        except Exception as exc:
+            return web.json_response({"error": f"Synthesis failed: {exc}"}, status=500)
+        return web.Response(body=data, content_type="audio/wav", headers={"X-Cache": source})
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.service.stats())
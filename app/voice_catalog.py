@@ -0,0 +1,195 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# voice_catalog.py                          #
+# ######################################### #
+
+from bisect import bisect_left
+from dataclasses import asdict, dataclass, field
+import json
+import os
+import re
+import subprocess
+
+from textual.suggester import Suggester
+from textual.validation import ValidationResult, Validator
+
+from app.atomic_file import write_atomic
+from app.defaults import Defaults
+
+DEFAULT_VOICES_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "estui", "voices.json"
+)
+
+
+@dataclass(slots=True)
+class Voice:
+    """One line of ``espeak-ng --voices``."""
+
+    language: str
+    name: str
+    file: str
+    gender: str = ""
+    priority: int = 5
+    other_languages: list[str] = field(default_factory=list)
+
+
+_OTHER_LANGUAGE = re.compile(r"\((\S+)\s+\d+\)")
+
+
+def parse_voices(output: str) -> list[Voice]:
+    """Parse the table printed by ``espeak-ng --voices``.
+
+    Columns are ``Pty Language Age/Gender VoiceName File Other Languages``;
+    voice names never contain spaces in that listing.
+    """
+    voices = []
+    for line in output.splitlines()[1:]:
+        fields = line.split()
+        if len(fields) < 5:
+            continue
+        priority, language, age_gender, name, file = fields[:5]
+        voices.append(
+            Voice(
+                language=language,
+                name=name,
+                file=file,
+                gender=age_gender.partition("/")[2],
+                priority=int(priority) if priority.isdigit() else 5,
+                other_languages=_OTHER_LANGUAGE.findall(" ".join(fields[5:])),
+            )
+        )
+    return voices
+
+
+class VoiceCatalog:
+    """Voices and variants known to espeak-ng, indexed for lookups by prefix.
+
+    A voice can be selected by language (``it``), name (``Italian``) or file
+    (``roa/it``), optionally followed by ``+variant`` (``it+f1``). All keys
+    are compared case-insensitively.
+    """
+
+    def __init__(self, voices: list[Voice], variants: list[str]) -> None:
+        self.voices = voices
+        self.variants = variants
+        # key -> the spelling to suggest for it
+        self._keys: dict[str, str] = {}
+        self._by_language: dict[str, list[Voice]] = {}
+        for voice in voices:
+            self._by_language.setdefault(voice.language.casefold(), []).append(voice)
+            for language in voice.other_languages:
+                self._by_language.setdefault(language.casefold(), []).append(voice)
+            for key in (
+                voice.language,
+                voice.name,
+                voice.file,
+                voice.file.rpartition("/")[2],
+                *voice.other_languages,
+            ):
+                self._keys.setdefault(key.casefold(), key)
+        self._sorted_keys = sorted(self._keys)
+        self._variants = {variant.casefold(): variant for variant in variants}
+        self._sorted_variants = sorted(self._variants)
+
+    def __len__(self) -> int:
+        return len(self.voices)
+
+    def by_language(self, language: str) -> list[Voice]:
+        return self._by_language.get(language.casefold(), [])
+
+    def is_valid(self, spec: str) -> bool:
+        """Return ``True`` if espeak-ng accepts ``spec`` as its ``-v`` argument."""
+        voice, plus, variant = spec.casefold().partition("+")
+        if voice not in self._keys:
+            return False
+        return not plus or variant in self._variants
+
+    @staticmethod
+    def _complete(prefix: str, keys: list[str], spellings: dict[str, str]) -> str | None:
+        index = bisect_left(keys, prefix)
+        if index < len(keys) and keys[index].startswith(prefix):
+            return spellings[keys[index]]
+        return None
+
+    def suggest(self, prefix: str) -> str | None:
+        """Return the first voice spec completing ``prefix``, if any."""
+        if not prefix:
+            return None
+        voice, plus, variant = prefix.partition("+")
+        if plus:
+            if voice.casefold() not in self._keys:
+                return None
+            completion = self._complete(variant.casefold(), self._sorted_variants, self._variants)
+            return f"{voice}+{completion}" if completion is not None else None
+        completion = self._complete(prefix.casefold(), self._sorted_keys, self._keys)
+        if completion is None:
+            return None
+        return prefix + completion[len(prefix):]
+
+    def to_dict(self) -> dict:
+        return {"voices": [asdict(voice) for voice in self.voices], "variants": self.variants}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "VoiceCatalog":
+        return cls([Voice(**voice) for voice in data["voices"]], list(data["variants"]))
+
+    @classmethod
+    def build(cls, executable: str = Defaults.ESPEAK) -> "VoiceCatalog":
+        """Query ``executable`` for its voices and variants."""
+        voices = subprocess.run(
+            [executable, "--voices"], capture_output=True, text=True, timeout=30, check=True
+        ).stdout
+        variants = subprocess.run(
+            [executable, "--voices=variant"], capture_output=True, text=True, timeout=30, check=True
+        ).stdout
+        return cls(
+            parse_voices(voices),
+            [voice.file.rpartition("/")[2] for voice in parse_voices(variants)],
+        )
+
+    def save(self, path: str, fingerprint: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        data = {"fingerprint": fingerprint, **self.to_dict()}
+        write_atomic(path, json.dumps(data, ensure_ascii=False).encode("utf-8"))
+
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> "VoiceCatalog | None":
+        """Return the catalog saved in ``path``, ``None`` if missing or outdated."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("fingerprint") != fingerprint:
+                return None
+            return cls.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+
+class VoiceSuggester(Suggester):
+    """Complete voice specs from a catalog that may arrive later."""
+
+    def __init__(self) -> None:
+        super().__init__(use_cache=False, case_sensitive=True)
+        self.catalog: VoiceCatalog | None = None
+
+    async def get_suggestion(self, value: str) -> str | None:
+        if self.catalog is None:
+            return None
+        return self.catalog.suggest(value)
+
+
+class VoiceValidator(Validator):
+    """Reject voices missing from the catalog; accept anything until it is loaded."""
+
+    def __init__(self) -> None:
+        super().__init__(failure_description="Unknown voice")
+        self.catalog: VoiceCatalog | None = None
+
+    def validate(self, value: str) -> ValidationResult:
+        if not value or self.catalog is None or self.catalog.is_valid(value):
+            return self.success()
+        return self.failure()
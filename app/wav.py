@@ -0,0 +1,63 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# wav.py                                    #
+# ######################################### #
+
+import io
+import struct
+import wave
+
+# espeak-ng writes this size when the length is unknown (e.g. with --stdout)
+STREAM_DATA_SIZE = 0x7FFFF000
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap 16 bit mono ``pcm`` samples in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def wav_header(sample_rate: int, data_size: int = STREAM_DATA_SIZE) -> bytes:
+    """Return a 16 bit mono WAV header announcing ``data_size`` bytes."""
+    return (
+        b"RIFF"
+        + struct.pack("<I", data_size + 36)
+        + b"WAVEfmt "
+        + struct.pack("<IHHIIHH", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+        + b"data"
+        + struct.pack("<I", data_size)
+    )
+
+
+def split_wav(data: bytes) -> tuple[int, bytes]:
+    """Return the sample rate and the PCM samples of a 16 bit mono WAV.
+
+    The chunks are walked by hand because streamed files announce a bogus
+    data size that :mod:`wave` would trust.
+    """
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+    offset = 12
+    sample_rate = 0
+    while offset + 8 <= len(data):
+        chunk_id = data[offset:offset + 4]
+        (size,) = struct.unpack_from("<I", data, offset + 4)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            channels, sample_rate = struct.unpack_from("<HI", data, body + 2)
+            (bits,) = struct.unpack_from("<H", data, body + 14)
+            if channels != 1 or bits != 16:
+                raise ValueError("Only 16 bit mono WAV is supported")
+        elif chunk_id == b"data":
+            return sample_rate, data[body:body + size]
+        offset = body + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
@@ -0,0 +1,189 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# benchmarks.py                             #
+# ######################################### #
+
+from typing import Callable
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.bulk_compose import compose_presets
+from app.command_builder import EspeakParameters, compose_command, sanitize_text
+from app.presets import MessageDocument, MessagePreset
+from app.preset_store import JsonlPresetStore
+
+# name -> (function returning seconds per operation, run in quick mode)
+BENCHMARKS: dict[str, tuple[Callable[[], float], bool]] = {}
+
+DOCUMENT_SIZES = (1_000, 10_000, 100_000)
+QUICK_MAX_SIZE = 10_000
+
+
+def benchmark(name: str, quick: bool = True):
+    def register(function: Callable[[], float]) -> Callable[[], float]:
+        BENCHMARKS[name] = (function, quick)
+        return function
+
+    return register
+
+
+def best_of(function: Callable[[], object], number: int = 1, repeat: int = 5) -> float:
+    """Return the best time per call of ``function`` over ``repeat`` rounds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def make_presets(count: int) -> list[MessagePreset]:
+    voices = ("it", "en", "de+f1", "fr")
+    return [
+        MessagePreset(
+            f"Message number {i}, spoken with voice {voices[i % 4]}.",
+            voices[i % 4],
+            str(80 + i % 420),
+            str(i % 100),
+            "100",
+            str(i % 10),
+        )
+        for i in range(count)
+    ]
+
+
+@benchmark("compose_command")
+def bench_compose_command() -> float:
+    params = EspeakParameters("Hello, how are you today?", "en+f2", "175", "50", "100", "2")
+    return best_of(lambda: compose_command(params), number=20_000)
+
+
+def _sanitize(text: str) -> Callable[[], str]:
+    return lambda: sanitize_text(text)
+
+
+@benchmark("sanitize_text.short")
+def bench_sanitize_short() -> float:
+    return best_of(_sanitize("Ciao,\tcome\x07 stai?\n"), number=50_000)
+
+
+@benchmark("sanitize_text.long")
+def bench_sanitize_long() -> float:
+    text = "Lorem ipsum dolor sit amet,\x00 consectetur  adipiscing elit.\n" * 20_000
+    return best_of(_sanitize(text), number=5)
+
+
+def _document_benchmarks(size: int) -> None:
+    quick = size <= QUICK_MAX_SIZE
+
+    @benchmark(f"document.save.{size}", quick)
+    def bench_save() -> float:
+        document = MessageDocument(make_presets(size))
+        with tempfile.TemporaryDirectory() as tmp:
+            return best_of(lambda: document.save(os.path.join(tmp, "doc.json")), repeat=3)
+
+    @benchmark(f"document.load.{size}", quick)
+    def bench_load() -> float:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.json")
+            MessageDocument(make_presets(size)).save(path)
+            return best_of(lambda: MessageDocument.load(path), repeat=3)
+
+    @benchmark(f"document.compose.{size}", quick)
+    def bench_compose() -> float:
+        presets = make_presets(size)
+        return best_of(lambda: sum(1 for _ in compose_presets(presets)), repeat=3)
+
+    @benchmark(f"jsonl.open.{size}", quick)
+    def bench_jsonl_open() -> float:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "doc.jsonl")
+            JsonlPresetStore.create(path, make_presets(size)).save()
+            return best_of(lambda: JsonlPresetStore(path), repeat=3)
+
+
+for _size in DOCUMENT_SIZES:
+    _document_benchmarks(_size)
+
+
+def _message_list_benchmark(size: int) -> None:
+    @benchmark(f"message_list.populate.{size}", size <= QUICK_MAX_SIZE)
+    def bench_populate() -> float:
+        from textual.app import App, ComposeResult
+
+        from app.message_list import MessageList
+
+        class ListApp(App):
+            def compose(self) -> ComposeResult:
+                yield MessageList()
+
+        presets = make_presets(size)
+
+        async def main() -> float:
+            app = ListApp()
+            async with app.run_test(size=(100, 40)) as pilot:
+                messages = app.query_one(MessageList)
+                best = float("inf")
+                for _ in range(3):
+                    messages.clear()
+                    await pilot.pause()
+                    start = time.perf_counter()
+                    messages.set_presets(list(presets))
+                    await pilot.pause()
+                    best = min(best, time.perf_counter() - start)
+                return best
+
+        return asyncio.run(main())
+
+
+for _size in DOCUMENT_SIZES:
+    _message_list_benchmark(_size)
+
+
+STARTUP_SCRIPT = textwrap.dedent(
+    """
+    import sys, time
+    sys.path.insert(0, {root!r})
+    import estui
+    from app.espeak_ng_tui_app import EspeakNgTuiApp
+
+    ready = []
+
+    async def auto_pilot(pilot):
+        ready.append(time.time())
+        pilot.app.exit()
+
+    EspeakNgTuiApp({document!r}).run(headless=True, auto_pilot=auto_pilot)
+    print(ready[0])
+    """
+)
+
+
+@benchmark("startup.first_frame")
+def bench_startup() -> float:
+    """Time from spawning the interpreter to the first frame of the app."""
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as tmp:
+        document = os.path.join(tmp, "messages.json")
+        MessageDocument(make_presets(100)).save(document)
+        script = STARTUP_SCRIPT.format(root=ROOT, document=document)
+        for _ in range(3):
+            start = time.time()
+            result = subprocess.run(
+                [sys.executable, "-c", script], capture_output=True, text=True, check=True, cwd=tmp
+            )
+            best = min(best, float(result.stdout.split()[-1]) - start)
+    return best
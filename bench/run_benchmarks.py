@@ -0,0 +1,115 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# run_benchmarks.py                         #
+# ######################################### #
+
+"""Run the benchmarks and compare them with a stored baseline.
+
+Usage::
+
+    python bench/run_benchmarks.py [--quick] [-k PATTERN] [--output FILE]
+                                   [--baseline FILE] [--save-baseline]
+                                   [--threshold RATIO]
+
+Results are written as JSON. The process exits with status 1 when a
+benchmark is slower than the baseline by more than ``--threshold``.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmarks import BENCHMARKS
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+
+
+def run(quick: bool = False, pattern: str = "") -> dict[str, float]:
+    results = {}
+    for name, (function, in_quick) in BENCHMARKS.items():
+        if (quick and not in_quick) or pattern not in name:
+            continue
+        results[name] = function()
+        print(f"{name:<32} {format_seconds(results[name]):>12}", flush=True)
+    return results
+
+
+def format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3f} {unit}"
+    return f"{seconds / 1e-9:.1f} ns"
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """Return the names of the benchmarks slower than ``baseline`` by more than ``threshold``."""
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference and seconds > reference * (1 + threshold):
+            regressions.append(name)
+    return regressions
+
+
+def write_json(path: str, results: dict[str, float]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    data = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of the application")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k preset benchmarks")
+    parser.add_argument("-k", dest="pattern", default="", help="run only benchmarks whose name contains PATTERN")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="results to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed slowdown before flagging a regression (default 0.25 = 25%%)",
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.quick, args.pattern)
+    write_json(args.output, results)
+    print(f"Results written to {args.output}")
+    if args.save_baseline:
+        write_json(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with, use --save-baseline to store one")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+    for name in regressions:
+        print(
+            f"REGRESSION {name}: {format_seconds(results[name])}"
+            f" (baseline {format_seconds(baseline[name])})"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
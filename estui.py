@@ -7,22 +7,83 @@
 # estui.py                                  #
 # ######################################### #
 
+import time
+
+STARTED = time.perf_counter()
+
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 import argparse
+import asyncio
+import contextlib
+import os
 
+from app.audio_cache import AudioCache, DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE_MB
+from app.audio_sinks import SINKS, create_sink
+from app.defaults import Defaults
+from app.engines import ENGINES, SynthesisEngine, create_engine
 from app.espeak_checker import EspeakNgChecker
 
+if TYPE_CHECKING:
+    # aiohttp is only imported when the synthesis service is requested
+    from app.synthesis_service import SynthesisServer
+
 DEFAULT_PRESET_FILE = "messages_preset.json"
 
 
 def _json_file(value: str) -> str:
-    """Validate that ``value`` is a path to a JSON file."""
+    """Validate that ``value`` is a path to a JSON or JSON Lines file."""
     path = Path(value)
-    if path.is_dir() or path.suffix.lower() != ".json":
-        raise argparse.ArgumentTypeError("Document path must be a JSON file")
+    if path.is_dir() or path.suffix.lower() not in (".json", ".jsonl"):
+        raise argparse.ArgumentTypeError("Document path must be a JSON or JSON Lines file")
     return value
 
 
+def _non_negative_int(value: str) -> int:
+    """Validate that ``value`` is an integer greater than or equal to 0."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Value must be an integer") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError("Value must not be negative")
+    return number
+
+
+def _positive_int(value: str) -> int:
+    """Validate that ``value`` is a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Value must be an integer") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError("Value must be at least 1")
+    return number
+
+
+def _non_negative_float(value: str) -> float:
+    """Validate that ``value`` is a number greater than or equal to 0."""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Value must be a number") from None
+    if number < 0:
+        raise argparse.ArgumentTypeError("Value must not be negative")
+    return number
+
+
+def _port(value: str) -> int:
+    """Validate that ``value`` is a TCP port number."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Port must be an integer") from None
+    if not 0 < number < 65536:
+        raise argparse.ArgumentTypeError("Port must be between 1 and 65535")
+    return number
+
+
 def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     """Return parsed command line arguments."""
     parser = argparse.ArgumentParser(
@@ -33,14 +94,278 @@ def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
         nargs="?",
         default=DEFAULT_PRESET_FILE,
         type=_json_file,
-        help="JSON file used to load and save message presets",
+        help="JSON (.json) or JSON Lines (.jsonl) file used to load and save message presets",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="directory where synthesized audio is cached",
+    )
+    parser.add_argument(
+        "--cache-size",
+        default=DEFAULT_CACHE_SIZE_MB,
+        type=_non_negative_int,
+        metavar="MB",
+        help="maximum size of the audio cache in megabytes (0 disables it)",
+    )
+    parser.add_argument(
+        "--engine",
+        default="subprocess",
+        choices=sorted(ENGINES),
+        help="synthesis backend: one espeak-ng process per utterance, "
+        "the same streamed chunk by chunk, or a persistent in-process libespeak-ng",
+    )
+    parser.add_argument(
+        "--espeak",
+        default=Defaults.ESPEAK,
+        metavar="PATH",
+        help="espeak-ng executable used by the subprocess and stream engines, "
+        "e.g. tools/fake_espeak_ng.py for testing without audio",
+    )
+    parser.add_argument(
+        "--sink",
+        default="player",
+        choices=SINKS,
+        help="where the stream engine sends audio (default: player)",
+    )
+    parser.add_argument(
+        "--sink-file",
+        metavar="PATH",
+        help="file or named pipe receiving raw PCM with --sink file",
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=_non_negative_int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="split texts into sentences rendered by N concurrent workers "
+        "(default: CPU count, 0 disables splitting)",
+    )
+    parser.add_argument(
+        "--prerender-delay",
+        type=_non_negative_float,
+        default=Defaults.PRERENDER_DELAY,
+        metavar="SECONDS",
+        help="render the edited message into the audio cache after the inputs "
+        "have been idle this long (0 disables pre-rendering)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help="export utterance timings as JSON lines, or as Prometheus text "
+        "when PATH ends with .prom",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=_port,
+        metavar="PORT",
+        help="serve /metrics (Prometheus) and /metrics.jsonl on 127.0.0.1:PORT",
+    )
+    parser.add_argument(
+        "--serve",
+        type=_port,
+        metavar="PORT",
+        help="serve POST /synthesize (JSON parameters in, WAV out) on PORT, "
+        "sharing the engine and audio cache with the interface",
+    )
+    parser.add_argument(
+        "--serve-host",
+        default=Defaults.SERVE_HOST,
+        metavar="HOST",
+        help=f"address the synthesis service listens on (default: {Defaults.SERVE_HOST})",
+    )
+    parser.add_argument(
+        "--serve-workers",
+        type=_positive_int,
+        default=Defaults.SERVE_WORKERS,
+        metavar="N",
+        help=f"syntheses the service runs at once (default: {Defaults.SERVE_WORKERS})",
+    )
+    parser.add_argument(
+        "--serve-backlog",
+        type=_non_negative_int,
+        default=Defaults.SERVE_BACKLOG,
+        metavar="N",
+        help="syntheses that may wait for a worker before requests are refused "
+        f"with 503 (default: {Defaults.SERVE_BACKLOG})",
+    )
+    parser.add_argument(
+        "--no-ui",
+        action="store_true",
+        help="run only the synthesis service, without the interface",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print the time spent in each start-up phase when the application exits",
+    )
+    parser.add_argument(
+        "--convert",
+        nargs=2,
+        metavar=("SRC", "DST"),
+        type=_json_file,
+        help="convert a preset document between .json and .jsonl and exit",
     )
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--render",
+        metavar="DOC",
+        type=_json_file,
+        help="render every preset of DOC to a WAV file without starting the UI",
+    )
+    parser.add_argument(
+        "--out",
+        metavar="DIR",
+        help="output directory used by --render",
+    )
+    parser.add_argument(
+        "--bundle",
+        metavar="FILE",
+        help="with --render, pack the rendered audio of every preset into FILE, "
+        "a single file that can be played without espeak-ng",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="number of worker processes used by --render (default: CPU count)",
+    )
+    args = parser.parse_args(argv)
+    if args.render and not (args.out or args.bundle):
+        parser.error("--render requires --out or --bundle")
+    if args.bundle and not args.render:
+        parser.error("--bundle requires --render")
+    if args.sink == "file" and not args.sink_file:
+        parser.error("--sink file requires --sink-file")
+    if args.no_ui and args.serve is None:
+        parser.error("--no-ui requires --serve")
+    return args
+
+
+def engine_options(args: argparse.Namespace) -> dict:
+    """Return the options of the engine selected by ``args``, except the sink."""
+    if args.engine == "lib":
+        return {}
+    return {"executable": args.espeak}
+
+
+def build_engine(args: argparse.Namespace) -> SynthesisEngine:
+    """Return the synthesis engine selected by ``args``."""
+    if args.engine == "stream":
+        return create_engine(
+            args.engine,
+            sink=create_sink(args.sink, path=args.sink_file),
+            **engine_options(args),
+        )
+    return create_engine(args.engine, **engine_options(args))
+
+
+def build_audio_cache(args: argparse.Namespace, engine: SynthesisEngine) -> AudioCache | None:
+    """Return the audio cache configured by ``args`` or ``None`` if disabled.
+
+    The engine fingerprint runs ``espeak-ng --version``: it is computed in
+    the background and only waited for by the first cache access.
+    """
+    if args.cache_size == 0:
+        return None
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fingerprint")
+    fingerprint = executor.submit(engine.fingerprint)
+    executor.shutdown(wait=False)
+    return AudioCache(
+        args.cache_dir,
+        args.cache_size * 1024 * 1024,
+        fingerprint=fingerprint,
+    )
+
+
+def build_server(
+    args: argparse.Namespace,
+    engine: SynthesisEngine,
+    audio_cache: AudioCache | None,
+    metrics=None,
+) -> "SynthesisServer | None":
+    """Return the synthesis service requested by ``args``, if any."""
+    if args.serve is None:
+        return None
+    from app.chunked_synthesis import ChunkedSynthesizer
+    from app.synthesis_service import SynthesisServer, SynthesisService
+
+    chunker = ChunkedSynthesizer(engine, args.chunk_workers) if args.chunk_workers else None
+    service = SynthesisService(
+        engine, audio_cache, args.serve_workers, args.serve_backlog, chunker, metrics
+    )
+    return SynthesisServer(service, args.serve, args.serve_host)
+
+
+async def serve_forever(server: "SynthesisServer", engine: SynthesisEngine) -> None:
+    """Run ``server`` without the interface until interrupted."""
+    await server.start()
+    print(f"Serving speech synthesis on {server.url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+        if server.metrics is not None:
+            await server.metrics.close()
+        engine.close()
+
 
 if __name__ == "__main__":
+    from app.startup_profile import StartupProfile
+
+    profile = StartupProfile(STARTED)
+    profile.mark("imports")
     args = parse_args()
-    EspeakNgChecker().validate_or_raise()
+    profile.mark("arguments")
+    if args.convert:
+        from app.preset_store import convert
+
+        count = convert(*args.convert)
+        print(f"Converted {count} presets to {args.convert[1]}")
+        raise SystemExit(0)
+    if args.engine != "lib":
+        EspeakNgChecker(args.espeak).validate_or_raise()
+    if args.render:
+        from app.batch_render import export_bundle, render_document
+
+        if args.bundle:
+            report = export_bundle(
+                args.render,
+                args.bundle,
+                args.jobs,
+                args.engine,
+                engine_options=engine_options(args),
+                render_dir=args.out,
+            )
+        else:
+            report = render_document(
+                args.render, args.out, args.jobs, args.engine, engine_options=engine_options(args)
+            )
+        raise SystemExit(1 if report.failed else 0)
+    engine = build_engine(args)
+    audio_cache = build_audio_cache(args, engine)
+    from app.metrics import Metrics
+
+    metrics = Metrics(export_path=args.metrics_file)
+    server = build_server(args, engine, audio_cache, metrics)
+    if args.no_ui:
+        with contextlib.suppress(KeyboardInterrupt):
+            asyncio.run(serve_forever(server, engine))
+        raise SystemExit(0)
+    profile.mark("engine and cache")
     from app.espeak_ng_tui_app import EspeakNgTuiApp
 
-    EspeakNgTuiApp(args.document).run()
+    profile.mark("interface imports")
+    EspeakNgTuiApp(
+        args.document,
+        audio_cache,
+        engine,
+        args.chunk_workers,
+        args.prerender_delay,
+        metrics,
+        args.metrics_port,
+        server=server,
+        profile=profile,
+    ).run()
+    if args.startup_profile:
+        print(profile.report())
 
@@ -0,0 +1,92 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_audio_bundle.py                      #
+# ######################################### #
+
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_bundle import ALIGNMENT, AudioBundle, write_bundle
+from app.batch_render import export_bundle
+from app.presets import MessageDocument, MessagePreset
+from app.wav import split_wav
+
+FAKE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_espeak_ng.py")
+KEY_A = "aa" * 32
+KEY_B = "bb" * 32
+
+
+def test_write_and_read(tmp_path):
+    path = tmp_path / "doc.estb"
+    with open(path, "wb") as f:
+        write_bundle(f, [(0, 22050, b"\x01\x00\x02\x00\x03\x00", KEY_A), (7, 16000, b"\xff\xff", KEY_B)])
+
+    with AudioBundle(path) as bundle:
+        assert len(bundle) == 2 and list(bundle) == [0, 7] and 3 not in bundle
+        entry = bundle.entry(0)
+        assert (entry.sample_rate, entry.length, entry.key) == (22050, 6, KEY_A)
+        assert entry.offset % ALIGNMENT == 0 and bundle.entry(7).offset % ALIGNMENT == 0
+        assert bundle.find(KEY_B) == 7 and bundle.find("00" * 32) is None
+        view = bundle.pcm(0)
+        assert isinstance(view, memoryview) and bytes(view) == b"\x01\x00\x02\x00\x03\x00"
+        samples = bundle.samples(7)
+        assert samples.tolist() == [-1]
+        view.release()
+        samples.release()
+
+
+def test_identical_utterances_share_samples(tmp_path):
+    pcm = b"\x01\x00" * 100
+    path = tmp_path / "doc.estb"
+    with open(path, "wb") as f:
+        write_bundle(f, [(0, 22050, pcm, KEY_A), (1, 22050, b"\x02\x00", KEY_B), (2, 22050, pcm, KEY_A)])
+    single = tmp_path / "single.estb"
+    with open(single, "wb") as f:
+        write_bundle(f, [(0, 22050, pcm, KEY_A), (1, 22050, b"\x02\x00", KEY_B)])
+
+    with AudioBundle(path) as bundle:
+        assert bundle.entry(2).offset == bundle.entry(0).offset
+        assert bytes(bundle.pcm(2)) == pcm
+    # only the index grows
+    assert path.stat().st_size - single.stat().st_size <= 64
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"RIFF" + bytes(60))
+    with pytest.raises(ValueError):
+        AudioBundle(path)
+
+
+def test_export_bundle(tmp_path):
+    doc_path = tmp_path / "doc.json"
+    presets = [
+        MessagePreset(text=text, voice="it", speed="175", pitch="50", volume="100", word_gap="0")
+        for text in ("hello", "a longer sentence")
+    ]
+    MessageDocument(presets).save(doc_path)
+    render_dir = tmp_path / "wavs"
+    bundle_path = tmp_path / "doc.estb"
+    report = export_bundle(
+        doc_path, bundle_path, jobs=1, out=io.StringIO(),
+        engine_options={"executable": FAKE}, render_dir=str(render_dir),
+    )
+    assert report.rendered == 2
+
+    with AudioBundle(bundle_path) as bundle:
+        assert list(bundle) == [0, 1]
+        for preset_id in bundle:
+            sample_rate, pcm = split_wav((render_dir / f"{preset_id:05d}.wav").read_bytes())
+            assert bundle.entry(preset_id).sample_rate == sample_rate
+            with bundle.pcm(preset_id) as view:
+                assert view == pcm
+        assert bundle.entry(1).duration > bundle.entry(0).duration
@@ -0,0 +1,79 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_audio_cache.py                       #
+# ######################################### #
+
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_cache import AudioCache
+from app.command_builder import EspeakParameters
+
+
+def test_hit_and_miss(tmp_path):
+    cache = AudioCache(tmp_path, 1024)
+    key = cache.key_for(EspeakParameters(text="hello"))
+    assert cache.get(key) is None
+    path = cache.put(key, b"RIFF0000")
+    assert cache.get(key) == path
+    assert path.read_bytes() == b"RIFF0000"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_params_and_fingerprint(tmp_path):
+    params = EspeakParameters(text="hello", voice="it")
+    a = AudioCache(tmp_path, 1024, fingerprint="1.51")
+    b = AudioCache(tmp_path, 1024, fingerprint="1.52")
+    assert a.key_for(params) == a.key_for(EspeakParameters(text="hello", voice="it"))
+    assert a.key_for(params) != a.key_for(EspeakParameters(text="hello", voice="en"))
+    assert a.key_for(params) != b.key_for(params)
+
+
+def test_lru_eviction(tmp_path):
+    cache = AudioCache(tmp_path, 20)
+    cache.put("a", b"x" * 8)
+    cache.put("b", b"x" * 8)
+    cache.get("a")  # "b" becomes least recently used
+    cache.put("c", b"x" * 8)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert not cache.path_for("b").exists()
+    assert cache.size_bytes == 16
+
+
+def test_entries_survive_restart(tmp_path):
+    AudioCache(tmp_path, 1024).put("a", b"data")
+    cache = AudioCache(tmp_path, 1024)
+    assert cache.get("a") is not None
+
+
+def test_entries_are_not_synced_and_empty_ones_are_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(os, "fsync", lambda fd: pytest.fail("cache entries need no fsync"))
+    cache = AudioCache(tmp_path, 1024)
+    cache.put("a", b"data")
+    cache.path_for("b").write_bytes(b"")  # left by a crash
+    cache = AudioCache(tmp_path, 1024)
+    assert "a" in cache and "b" not in cache
+    assert not cache.path_for("b").exists()
+
+
+def test_concurrent_puts_keep_the_size(tmp_path):
+    cache = AudioCache(tmp_path, 100)
+    threads = [threading.Thread(target=cache.put, args=(str(i), b"x" * 10)) for i in range(40)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache) == 10
+    assert cache.size_bytes == 100
+    assert len(list(tmp_path.glob("*.wav"))) == 10
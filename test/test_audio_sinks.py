@@ -0,0 +1,80 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_audio_sinks.py                       #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+import threading
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_sinks import FileSink, NullSink, create_sink
+
+
+async def _stream(sink, chunks):
+    await sink.open()
+    for chunk in chunks:
+        await sink.write(chunk)
+    await sink.close()
+
+
+def test_file_sink_appends_raw_pcm(tmp_path):
+    path = tmp_path / "out.pcm"
+    sink = FileSink(str(path))
+    header = b"H" * 44
+    asyncio.run(_stream(sink, [header[:30], header[30:] + b"ab", b"cd"]))
+    asyncio.run(_stream(sink, [header + b"ef"]))
+    assert path.read_bytes() == b"abcdef"
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="named pipes are POSIX only")
+def test_file_sink_waiting_for_a_reader_does_not_block_the_loop(tmp_path):
+    path = tmp_path / "out.fifo"
+    os.mkfifo(path)
+    received = []
+
+    def read():
+        with open(path, "rb") as pipe:
+            received.append(pipe.read())
+
+    async def main():
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker = asyncio.create_task(tick())
+        reader = threading.Timer(0.2, read)
+        reader.start()
+        # until the reader comes, opening the pipe waits
+        await _stream(FileSink(str(path)), [b"H" * 44 + b"pcm"])
+        ticker.cancel()
+        await asyncio.to_thread(reader.join)
+        return ticks
+
+    assert asyncio.run(main()) >= 5
+    assert received == [b"pcm"]
+
+
+def test_null_sink_counts():
+    sink = NullSink()
+    asyncio.run(_stream(sink, [b"abc", b"de"]))
+    assert (sink.chunks, sink.bytes) == (2, 5)
+
+
+def test_create_sink():
+    assert isinstance(create_sink("null"), NullSink)
+    with pytest.raises(ValueError):
+        create_sink("file")
+    with pytest.raises(ValueError):
+        create_sink("speaker")
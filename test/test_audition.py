@@ -0,0 +1,133 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_audition.py                          #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_cache import AudioCache
+from app.audition import AuditionScreen, audition_parameters, parse_sweep, parse_voices, render_all
+from app.command_builder import EspeakParameters
+from app.engines import SynthesisEngine
+from app.espeak_ng_tui_app import EspeakNgTuiApp
+from app.playback import PlaybackScheduler
+from app.wav import pcm_to_wav
+
+
+class CountingEngine(SynthesisEngine):
+    name = "counting"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.running = 0
+        self.peak = 0
+        self.played: list[str] = []
+
+    async def synthesize(self, params):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if params.voice == "bad":
+            raise RuntimeError("no such voice")
+        return pcm_to_wav(b"\0\0", 22050)
+
+    async def play_file(self, path):
+        self.played.append(path.name)
+
+
+def test_parse_sweep():
+    assert parse_sweep("140-220:20") == ["140", "160", "180", "200", "220"]
+    assert parse_sweep("50, 60-80:10, 70") == ["50", "60", "70", "80"]
+    assert parse_sweep("0-20") == ["0", "10", "20"]
+    assert parse_sweep("") == []
+    for spec in ("fast", "200-100", "1-5:0", "5:2"):
+        with pytest.raises(ValueError):
+            parse_sweep(spec)
+    assert parse_voices("it, en+f1,,it") == ["it", "en+f1"]
+
+
+def test_audition_parameters():
+    base = EspeakParameters(text="ciao", voice="it", speed="175", pitch="50")
+    cells = audition_parameters(base, ["it", "en"], ["140", "180"], [])
+    assert [(p.voice, p.pitch, p.speed) for p in cells] == [
+        ("it", "50", "140"), ("it", "50", "180"), ("en", "50", "140"), ("en", "50", "180"),
+    ]
+    assert {p.text for p in cells} == {"ciao"}
+
+
+def test_render_all_bounds_workers(tmp_path):
+    engine = CountingEngine()
+    cache = AudioCache(tmp_path, 10**6)
+    cells = audition_parameters(EspeakParameters(text="hi"), ["it", "bad"], [str(s) for s in range(100, 200, 10)], [])
+    results = {}
+
+    async def main():
+        await render_all(PlaybackScheduler(engine, cache), cells, 3, lambda i, exc: results.setdefault(i, exc))
+
+    asyncio.run(main())
+    assert engine.peak == 3
+    assert sorted(results) == list(range(20))
+    assert [i for i, exc in results.items() if exc is not None] == list(range(10, 20))
+    assert all(cache.key_for(p) in cache for p in cells[:10])
+
+
+def test_grid_plays_rendered_cells(tmp_path):
+    engine = CountingEngine()
+
+    async def main():
+        app = EspeakNgTuiApp(str(tmp_path / "p.json"), AudioCache(tmp_path, 10**6), engine, voices_path=None)
+        async with app.run_test(size=(120, 40)) as pilot:
+            screen = AuditionScreen(EspeakParameters(text="hello", voice="it"), workers=4)
+            await app.push_screen(screen)
+            screen.query_one("#audition-voices").value = "it,en"
+            screen.query_one("#audition-speeds").value = "140-200:20"
+            screen.query_one("#audition-render").press()
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            cells = list(screen.query(".audition-cell"))
+            enabled = [not cell.disabled for cell in cells]
+            cells[5].press()
+            await pilot.pause(0.1)
+            return enabled, screen.cells[5], engine.peak
+
+    enabled, played, peak = asyncio.run(main())
+    assert enabled == [True] * 8
+    assert (played.voice, played.speed) == ("en", "160")
+    assert peak == 4
+    assert len(engine.played) == 1  # played from the cache, no new synthesis
+
+
+def test_rendering_again_ignores_the_previous_grid(tmp_path):
+    engine = CountingEngine()
+
+    async def main():
+        app = EspeakNgTuiApp(str(tmp_path / "p.json"), AudioCache(tmp_path, 10**6), engine, voices_path=None)
+        async with app.run_test(size=(120, 40)) as pilot:
+            screen = AuditionScreen(EspeakParameters(text="hello", voice="it"), workers=1)
+            await app.push_screen(screen)
+            screen.query_one("#audition-speeds").value = "100-190"
+            screen.query_one("#audition-render").press()
+            await pilot.pause(0.03)
+            # a smaller grid replaces the one still rendering
+            screen.query_one("#audition-speeds").value = "300"
+            screen.query_one("#audition-render").press()
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return [not cell.disabled for cell in screen.query(".audition-cell")], screen.ready
+
+    enabled, ready = asyncio.run(main())
+    assert enabled == [True]
+    assert ready == 1
@@ -0,0 +1,102 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_batch_render.py                      #
+# ######################################### #
+
+import io
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.batch_render import render_document
+from app.preset_store import save_presets
+from app.presets import MessageDocument, MessagePreset
+
+
+def _preset(text: str) -> MessagePreset:
+    return MessagePreset(text=text, voice="it", speed="175", pitch="50", volume="100", word_gap="0")
+
+
+@pytest.fixture
+def fake_espeak(tmp_path, monkeypatch):
+    """Put an ``espeak-ng`` in ``PATH`` that echoes the text and logs calls."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "calls.log"
+    script = bin_dir / "espeak-ng"
+    script.write_text(
+        "#!/bin/sh\n"
+        '[ "$1" = "--version" ] && exit 0\n'
+        f'echo x >> "{log}"\n'
+        'for a; do last=$a; done\n'
+        'printf "%s" "$last"\n'
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return log
+
+
+def _calls(log) -> int:
+    return len(log.read_text().splitlines()) if log.exists() else 0
+
+
+def test_render_and_skip(tmp_path, fake_espeak):
+    doc_path = tmp_path / "doc.json"
+    out_dir = tmp_path / "out"
+    MessageDocument([_preset("a"), _preset("b")]).save(doc_path)
+
+    report = render_document(doc_path, out_dir, jobs=2, out=io.StringIO())
+    assert (report.rendered, report.skipped, report.failed) == (2, 0, 0)
+    assert (out_dir / "00000.wav").read_bytes() == b"a"
+    assert (out_dir / "00001.wav").read_bytes() == b"b"
+
+    report = render_document(doc_path, out_dir, jobs=2, out=io.StringIO())
+    assert (report.rendered, report.skipped) == (0, 2)
+    assert _calls(fake_espeak) == 2
+
+
+def test_render_jsonl_documents(tmp_path, fake_espeak):
+    doc_path = tmp_path / "doc.jsonl"
+    out_dir = tmp_path / "out"
+    save_presets(str(doc_path), [_preset("a"), _preset("b")])
+
+    report = render_document(str(doc_path), out_dir, jobs=1, out=io.StringIO())
+    assert (report.rendered, report.failed) == (2, 0)
+    assert (out_dir / "00000.wav").read_bytes() == b"a"
+    assert (out_dir / "00001.wav").read_bytes() == b"b"
+
+
+def test_reordered_presets_reuse_audio(tmp_path, fake_espeak):
+    doc_path = tmp_path / "doc.json"
+    out_dir = tmp_path / "out"
+    MessageDocument([_preset("a"), _preset("b"), _preset("c")]).save(doc_path)
+    render_document(doc_path, out_dir, jobs=1, out=io.StringIO())
+
+    MessageDocument([_preset("b"), _preset("a")]).save(doc_path)
+    report = render_document(doc_path, out_dir, jobs=1, out=io.StringIO())
+    assert (report.rendered, report.skipped) == (0, 2)
+    assert (out_dir / "00000.wav").read_bytes() == b"b"
+    assert (out_dir / "00001.wav").read_bytes() == b"a"
+    assert not (out_dir / "00002.wav").exists()
+    assert _calls(fake_espeak) == 3
+
+
+def test_identical_presets_share_one_render(tmp_path, fake_espeak):
+    doc_path = tmp_path / "doc.json"
+    out_dir = tmp_path / "out"
+    spaced = MessagePreset(text="  a ", voice="it", speed="0175", pitch="50", volume="100", word_gap="0")
+    MessageDocument([_preset("a"), _preset("b"), spaced, _preset("a")]).save(doc_path)
+
+    out = io.StringIO()
+    report = render_document(doc_path, out_dir, jobs=2, out=out)
+    assert (report.rendered, report.skipped, report.failed) == (4, 0, 0)
+    assert _calls(fake_espeak) == 2
+    assert "2 to render, 2 identical to another" in out.getvalue()
+    first = (out_dir / "00000.wav").stat()
+    assert all((out_dir / name).stat().st_ino == first.st_ino for name in ("00002.wav", "00003.wav"))
@@ -0,0 +1,53 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_bulk_compose.py                      #
+# ######################################### #
+
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.bulk_compose import SanitizeReport, compose_presets, sanitize_presets
+from app.command_builder import EspeakParameters, compose_args, sanitize_text
+from app.presets import MessagePreset
+
+
+def test_sanitize_text_removes_the_same_characters_as_before():
+    text = "".join(chr(code) for code in range(0x2100)) + "café \U0001F603"
+    expected = re.sub(r"[\x00-\x1F\x7F\x9B\x80-\x9F\u2028\u2029]", "", text)
+    assert sanitize_text(text) == expected
+
+
+def test_sanitize_presets_is_lazy_and_reports_changes():
+    read = []
+
+    def presets():
+        for text in ("Ciao", "Riga\nnuova", "Tab\tbed", "Fine"):
+            read.append(text)
+            yield MessagePreset(text, "it", "175", "50", "100", "0")
+
+    report = SanitizeReport()
+    results = sanitize_presets(presets(), report)
+    first = next(results)
+    assert read == ["Ciao"]
+    assert first == EspeakParameters("Ciao", "it", "175", "50", "100", "0")
+    assert [params.text for params in results] == ["Riganuova", "Tabbed", "Fine"]
+    assert report.total == 4
+    assert report.changed == [1, 2]
+
+
+def test_compose_presets_builds_argument_lists():
+    presets = [
+        MessagePreset("Hello\x07", "en+f1", "180", "50", "100", "0"),
+        MessagePreset("Ciao", "", "", "", "", ""),
+    ]
+    assert list(compose_presets(presets, "espeak")) == [
+        compose_args(EspeakParameters("Hello", "en+f1", "180", "50", "100", "0"), "espeak"),
+        ["espeak", "--", "Ciao"],
+    ]
@@ -0,0 +1,81 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_chunked_synthesis.py                 #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_sinks import NullSink
+from app.chunked_synthesis import ChunkedSynthesizer, fade_edges, split_sentences
+from app.command_builder import EspeakParameters
+from app.engines import StreamingEngine
+from app.wav import pcm_to_wav, split_wav
+
+
+class FakeEngine(StreamingEngine):
+    """Render every chunk as 400 samples whose value is the text length."""
+
+    def __init__(self) -> None:
+        super().__init__(sink=NullSink())
+        self.running = 0
+        self.peak = 0
+
+    async def synthesize(self, params):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        # later chunks finish first to check ordering
+        await asyncio.sleep(0.05 / len(params.text))
+        self.running -= 1
+        value = len(params.text).to_bytes(2, "little")
+        return pcm_to_wav(value * 400, 16000)
+
+
+TEXT = "The first sentence is here. A second one follows! Is there a third one? Yes."
+
+
+def test_split_sentences():
+    assert split_sentences(TEXT) == [
+        "The first sentence is here.",
+        "A second one follows!",
+        "Is there a third one? Yes.",
+    ]
+    assert split_sentences("Hello.") == ["Hello."]
+
+
+def test_split_long_sentence_at_clauses():
+    sentence = ", ".join(["a clause of some length"] * 20) + "."
+    chunks = split_sentences(sentence, max_chars=100)
+    assert len(chunks) == 20
+    assert " ".join(chunks) == sentence
+
+
+def test_fade_edges():
+    pcm = (1000).to_bytes(2, "little") * 256
+    faded = fade_edges(pcm, True, True)
+    assert len(faded) == len(pcm)
+    assert faded[:2] == b"\x00\x00" and faded[-2:] == b"\x00\x00"
+    assert faded[256:258] == pcm[256:258]
+    assert fade_edges(pcm, False, False) == pcm
+
+
+def test_chunks_rendered_concurrently_in_order():
+    engine = FakeEngine()
+    chunker = ChunkedSynthesizer(engine, workers=3)
+    params = EspeakParameters(text=TEXT)
+    assert chunker.applies(params)
+    data = asyncio.run(chunker.speak_and_capture(params))
+    rate, pcm = split_wav(data)
+    assert rate == 16000
+    assert len(pcm) == 3 * 800
+    lengths = [int.from_bytes(pcm[i * 800 + 400:i * 800 + 402], "little") for i in range(3)]
+    assert lengths == [len(t) for t in split_sentences(TEXT)]
+    assert engine.peak == 3
+    assert engine.sink.bytes == 44 + len(pcm)
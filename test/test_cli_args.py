@@ -9,11 +9,15 @@
 
 import os
 import sys
+import threading
 import pytest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from estui import parse_args, DEFAULT_PRESET_FILE
+from app.audio_cache import content_key
+from app.command_builder import EspeakParameters
+from app.engines import SynthesisEngine
+from estui import build_audio_cache, parse_args, engine_options, DEFAULT_PRESET_FILE
 
 
 def test_default_file():
@@ -29,3 +33,93 @@ def test_custom_file():
 def test_invalid_extension():
     with pytest.raises(SystemExit):
         parse_args(["not_json.txt"])
+
+
+def test_cache_options():
+    args = parse_args(["--cache-dir", "/tmp/estui", "--cache-size", "8"])
+    assert args.cache_dir == "/tmp/estui"
+    assert args.cache_size == 8
+
+
+def test_negative_cache_size():
+    with pytest.raises(SystemExit):
+        parse_args(["--cache-size", "-1"])
+
+
+def test_engine_option():
+    assert parse_args([]).engine == "subprocess"
+    assert parse_args(["--engine", "lib"]).engine == "lib"
+    with pytest.raises(SystemExit):
+        parse_args(["--engine", "other"])
+
+
+def test_render_options():
+    args = parse_args(["--render", "doc.json", "--out", "wavs", "--jobs", "4"])
+    assert (args.render, args.out, args.jobs) == ("doc.json", "wavs", 4)
+
+
+def test_render_requires_out():
+    with pytest.raises(SystemExit):
+        parse_args(["--render", "doc.json"])
+
+
+def test_startup_profile_option():
+    assert not parse_args([]).startup_profile
+    assert parse_args(["--startup-profile"]).startup_profile
+
+
+def test_bundle_option():
+    args = parse_args(["--render", "doc.json", "--bundle", "doc.estb"])
+    assert (args.bundle, args.out) == ("doc.estb", None)
+    with pytest.raises(SystemExit):
+        parse_args(["--bundle", "doc.estb"])
+
+
+def test_sink_options():
+    args = parse_args(["--engine", "stream", "--sink", "file", "--sink-file", "out.pcm"])
+    assert (args.engine, args.sink, args.sink_file) == ("stream", "file", "out.pcm")
+    with pytest.raises(SystemExit):
+        parse_args(["--sink", "file"])
+
+
+def test_jsonl_document_and_convert():
+    assert parse_args(["custom.jsonl"]).document == "custom.jsonl"
+    args = parse_args(["--convert", "a.json", "b.jsonl"])
+    assert args.convert == ["a.json", "b.jsonl"]
+
+
+def test_espeak_executable():
+    assert engine_options(parse_args([])) == {"executable": "espeak-ng"}
+    args = parse_args(["--espeak", "tools/fake_espeak_ng.py"])
+    assert engine_options(args) == {"executable": "tools/fake_espeak_ng.py"}
+    assert engine_options(parse_args(["--engine", "lib"])) == {}
+
+
+def test_metrics_options():
+    args = parse_args(["--metrics-file", "timings.prom", "--metrics-port", "9100"])
+    assert (args.metrics_file, args.metrics_port) == ("timings.prom", 9100)
+    with pytest.raises(SystemExit):
+        parse_args(["--metrics-port", "70000"])
+
+
+def test_serve_options():
+    args = parse_args(["--serve", "8080", "--serve-workers", "4", "--serve-backlog", "0", "--no-ui"])
+    assert (args.serve, args.serve_workers, args.serve_backlog, args.no_ui) == (8080, 4, 0, True)
+    assert parse_args([]).serve is None
+    with pytest.raises(SystemExit):
+        parse_args(["--no-ui"])
+
+
+def test_engine_fingerprint_is_computed_in_the_background(tmp_path):
+    release = threading.Event()
+
+    class SlowFingerprint(SynthesisEngine):
+        def fingerprint(self):
+            return "1.51" if release.wait(2) else "not released"
+
+    args = parse_args(["--cache-dir", str(tmp_path), "--cache-size", "1"])
+    cache = build_audio_cache(args, SlowFingerprint())
+    # built without waiting for the fingerprint; the first key waits for it
+    release.set()
+    assert cache.key_for(EspeakParameters("hi")) == content_key(EspeakParameters("hi"), "1.51")
+    assert cache.fingerprint == "1.51"
@@ -11,7 +11,8 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from app.command_builder import EspeakParameters, compose_command
+from app import command_builder
+from app.command_builder import EspeakParameters, compose_args, compose_command, normalize_parameters, phoneme_args
 
 
 def test_compose_basic():
@@ -31,5 +32,23 @@ def test_compose_all_params():
         word_gap="10",
     )
     cmd = compose_command(params)
-    expected = "espeak-ng -v it+f1 -s 180 -p 70 -a 120 -g 10 hello"
+    expected = "espeak-ng -v it+f1 -s 180 -p 70 -a 120 -g 10 -- hello"
     assert cmd == expected
+
+
+def test_normalize_parameters():
+    params = EspeakParameters(" Ciao\t  mondo \n", "it ", "0180", " 50", "100", "")
+    assert normalize_parameters(params) == EspeakParameters("Ciao mondo", "it", "180", "50", "100", "")
+    odd = EspeakParameters("x", "en", "fast ", "50", "100", "0")
+    assert normalize_parameters(odd).speed == "fast"
+    for speed in range(3 * command_builder.CANONICAL_CACHE_SIZE):
+        normalize_parameters(EspeakParameters("x", speed=f"0{speed}"))
+    assert command_builder._canonical_number.cache_info().currsize <= command_builder.CANONICAL_CACHE_SIZE
+
+
+def test_text_starting_with_a_dash_is_never_an_option():
+    params = EspeakParameters(text="-5 gradi", voice="it", speed="180")
+    args = compose_args(params, "espeak-ng", stdout=True)
+    assert args == ["espeak-ng", "-v", "it", "-s", "180", "-p", "50", "-a", "100", "-g", "0", "--stdout", "--", "-5 gradi"]
+    assert compose_command(params).endswith(" -- '-5 gradi'")
+    assert phoneme_args("it", "--help") == ["espeak-ng", "-q", "-x", "-v", "it", "--", "--help"]
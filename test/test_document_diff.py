@@ -0,0 +1,64 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_document_diff.py                     #
+# ######################################### #
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app import document_diff
+from app.document_diff import IndexMap, apply_changes, diff_hashes
+
+
+def test_diff_finds_only_the_changes():
+    old = list(range(1000))
+    new = old[:10] + [-1] + old[10:500] + old[501:900] + [-2] + old[901:]
+    changes = diff_hashes(old, new)
+    assert changes == [
+        ("insert", 10, 10, 10, 11),
+        ("delete", 500, 501, 501, 501),
+        ("replace", 900, 901, 900, 901),
+    ]
+    assert diff_hashes(old, old) == []
+    assert diff_hashes([], [1, 2]) == [("insert", 0, 0, 0, 2)]
+
+
+def test_apply_changes_reproduces_the_new_list():
+    rng = random.Random(1)
+    for _ in range(50):
+        old = [rng.randrange(20) for _ in range(rng.randrange(30))]
+        new = [rng.randrange(20) for _ in range(rng.randrange(30))]
+        edited = list(old)
+        apply_changes(edited, new, diff_hashes(old, new))
+        assert edited == new
+
+
+def test_repeated_hashes_cost_in_proportion_to_the_edits(monkeypatch):
+    rng = random.Random(2)
+    old = [rng.randrange(50) for _ in range(100_000)]
+    new = [-1] + old[1:50_000] + old[50_001:-1] + [-2]
+    start = time.perf_counter()
+    changes = diff_hashes(old, new)
+    assert time.perf_counter() - start < 2
+    edited = list(old)
+    apply_changes(edited, new, changes)
+    assert edited == new
+    assert sum(max(i2 - i1, j2 - j1) for _, i1, i2, j1, j2 in changes) <= 3
+
+    monkeypatch.setattr(document_diff, "MAX_EDITS", 1)
+    assert diff_hashes([0, 1, 2, 3, 4], [0, 5, 2, 6, 4]) == [("replace", 1, 4, 1, 4)]
+
+
+def test_index_map():
+    old = list("abcdefgh")
+    new = list("xabdeYgh")
+    moved = IndexMap(diff_hashes(old, new))
+    assert [moved(i) for i in range(len(old))] == [1, 2, None, 3, 4, None, 6, 7]
@@ -0,0 +1,162 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_engines.py                           #
+# ######################################### #
+
+import asyncio
+import ctypes.util
+import io
+import os
+import sys
+import threading
+import time
+import wave
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_sinks import NullSink
+from app.command_builder import EspeakParameters
+from app.engines import (
+    LibEspeakEngine,
+    StreamingEngine,
+    SubprocessEngine,
+    create_engine,
+    pcm_to_wav,
+)
+
+
+def test_pcm_to_wav():
+    data = pcm_to_wav(b"\x00\x00" * 100, 22050)
+    with wave.open(io.BytesIO(data)) as w:
+        assert w.getframerate() == 22050
+        assert w.getnframes() == 100
+
+
+def test_subprocess_synthesize(tmp_path, monkeypatch):
+    fake = tmp_path / "espeak-ng"
+    fake.write_text('#!/bin/sh\necho "$@"\n')
+    fake.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    params = EspeakParameters(text="hello world", voice="it")
+    out = asyncio.run(SubprocessEngine().synthesize(params))
+    assert out == b"-v it -s 175 -p 50 -a 100 -g 0 --stdout -- hello world\n"
+
+
+def test_subprocess_failure(tmp_path, monkeypatch):
+    fake = tmp_path / "espeak-ng"
+    fake.write_text("#!/bin/sh\nexit 1\n")
+    fake.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    with pytest.raises(RuntimeError):
+        asyncio.run(SubprocessEngine().synthesize(EspeakParameters(text="x")))
+
+
+def test_streaming_engine(tmp_path, monkeypatch):
+    fake = tmp_path / "espeak-ng"
+    fake.write_text("#!/bin/sh\nhead -c 10000 /dev/zero\n")
+    fake.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    sink = NullSink()
+    engine = StreamingEngine(sink=sink)
+    data = asyncio.run(engine.speak_and_capture(EspeakParameters(text="x")))
+    assert len(data) == sink.bytes == 10000
+    assert sink.chunks >= 3
+    assert 0 <= engine.last_timing.first_byte <= engine.last_timing.total
+
+
+def test_missing_library(monkeypatch):
+    monkeypatch.setattr(ctypes.util, "find_library", lambda name: None)
+    with pytest.raises(RuntimeError):
+        LibEspeakEngine()
+
+
+def test_create_engine():
+    assert isinstance(create_engine("subprocess"), SubprocessEngine)
+    with pytest.raises(ValueError):
+        create_engine("unknown")
+
+
+def test_cancel_kills_process(tmp_path, monkeypatch):
+    fake = tmp_path / "espeak-ng"
+    fake.write_text("#!/bin/sh\nexec sleep 30\n")
+    fake.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+    async def main():
+        task = asyncio.create_task(SubprocessEngine().speak(EspeakParameters(text="x")))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 5)
+
+    asyncio.run(main())
+
+
+class FakeLibrary:
+    """Stand-in for libespeak-ng producing 10 chunks of 100 samples per text."""
+
+    def __init__(self, name) -> None:
+        self.callback = None
+        library = self
+
+        def function(result=0):
+            def call(*args):
+                return result
+            return call
+
+        def set_callback(callback):
+            library.callback = callback
+
+        def synth(text, *args):
+            samples = (ctypes.c_short * 100)(*[1] * 100)
+            for _ in range(10):
+                time.sleep(0.01)
+                if library.callback(samples, 100, None):
+                    break
+            return 0
+
+        self.espeak_Initialize = function(22050)
+        self.espeak_SetSynthCallback = set_callback
+        self.espeak_Info = function(b"fake")
+        self.espeak_SetVoiceByName = function()
+        self.espeak_SetParameter = function()
+        self.espeak_TextToPhonemes = function()
+        self.espeak_Synth = synth
+        self.espeak_Synchronize = function()
+        self.espeak_Terminate = function()
+
+
+def test_cancelling_a_queued_request_does_not_cut_the_running_one(monkeypatch):
+    monkeypatch.setattr(ctypes.util, "find_library", lambda name: "fake")
+    monkeypatch.setattr(ctypes, "CDLL", FakeLibrary)
+    engine = LibEspeakEngine()
+
+    async def main():
+        running = asyncio.create_task(engine.synthesize(EspeakParameters(text="a")))
+        await asyncio.sleep(0.02)
+        queued = asyncio.create_task(engine.synthesize(EspeakParameters(text="b")))
+        await asyncio.sleep(0.01)
+        queued.cancel()
+        data = await running
+
+        cancelled = asyncio.create_task(engine.synthesize(EspeakParameters(text="c")))
+        await asyncio.sleep(0.03)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        return data
+
+    data = asyncio.run(main())
+    engine.close()
+    with wave.open(io.BytesIO(data)) as w:
+        assert w.getnframes() == 1000  # the whole utterance
+    with pytest.raises(RuntimeError):
+        # an aborted request raises instead of returning the partial audio
+        abort = threading.Event()
+        abort.set()
+        engine._synthesize(EspeakParameters(text="d"), abort)
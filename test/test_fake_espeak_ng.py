@@ -0,0 +1,103 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_fake_espeak_ng.py                    #
+# ######################################### #
+
+import asyncio
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.batch_render import render_document
+from app.command_builder import EspeakParameters, compose_args
+from app.engines import StreamingEngine, SubprocessEngine
+from app.espeak_checker import EspeakNgChecker
+from app.presets import MessageDocument, MessagePreset
+from app.wav import split_wav
+
+FAKE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_espeak_ng.py")
+
+
+def _run(params: EspeakParameters, env: dict | None = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        compose_args(params, FAKE, stdout=True),
+        capture_output=True,
+        env={**os.environ, **(env or {})},
+    )
+
+
+def test_wav_duration_follows_text_and_speed():
+    slow = _run(EspeakParameters("ten chars!", "en", "60", "50", "100", "0"))
+    fast = _run(EspeakParameters("ten chars!", "en", "120", "50", "100", "0"))
+    rate, pcm = split_wav(slow.stdout)
+    assert rate == 22050
+    assert len(pcm) == 2 * 22050 * 2  # 10 chars = 2 words, at 60 words/min
+    assert len(split_wav(fast.stdout)[1]) == len(pcm) // 2
+    # the output is deterministic
+    assert _run(EspeakParameters("ten chars!", "en", "60", "50", "100", "0")).stdout == slow.stdout
+
+
+def test_failure_injection(tmp_path):
+    result = _run(EspeakParameters(text="please fail"), {"FAKE_ESPEAK_FAIL_TEXT": "fail", "FAKE_ESPEAK_EXIT_CODE": "3"})
+    assert result.returncode == 3
+    assert result.stdout == b""
+    log = tmp_path / "calls.jsonl"
+    env = {"FAKE_ESPEAK_FAIL_RATE": "0.5", "FAKE_ESPEAK_LOG": str(log)}
+    first = [_run(EspeakParameters(text=f"t{i}"), env).returncode for i in range(12)]
+    second = [_run(EspeakParameters(text=f"t{i}"), env).returncode for i in range(12)]
+    assert first == second
+    assert 0 < first.count(1) < 12
+    calls = [json.loads(line) for line in log.read_text().splitlines()]
+    assert len(calls) == 24
+    assert calls[0]["args"][-3:] == ["--stdout", "--", "t0"]
+
+
+def test_checker_and_engines_use_executable():
+    checker = EspeakNgChecker(FAKE)
+    checker.validate_or_raise()
+    assert "1.51-fake" in checker.fingerprint()
+    with pytest.raises(RuntimeError):
+        EspeakNgChecker("/nonexistent/espeak-ng").validate_or_raise()
+
+    params = EspeakParameters("hello there", "en", "175", "50", "100", "0")
+    engine = SubprocessEngine(executable=FAKE)
+    assert split_wav(engine.synthesize_blocking(params))[1]
+    assert asyncio.run(engine.synthesize(params)) == engine.synthesize_blocking(params)
+    assert StreamingEngine(executable=FAKE).executable == FAKE
+
+
+def test_phonemes_are_printed_per_clause(monkeypatch):
+    engine = SubprocessEngine(executable=FAKE)
+    assert asyncio.run(engine.phonemes("it", "Ciao mondo. Come stai?")) == "'kiaO 'mOndO\n'kOmE 'stai"
+    monkeypatch.setenv("FAKE_ESPEAK_FAIL_TEXT", "fail")
+    with pytest.raises(RuntimeError):
+        asyncio.run(engine.phonemes("it", "fail"))
+
+
+def test_texts_starting_with_a_dash_are_spoken():
+    engine = SubprocessEngine(executable=FAKE)
+    params = EspeakParameters("-5 gradi", "it", "175", "50", "100", "0")
+    assert split_wav(engine.synthesize_blocking(params))[1]
+    assert asyncio.run(engine.synthesize(params)) == engine.synthesize_blocking(params)
+    assert asyncio.run(engine.phonemes("it", "--version")) == "'--vErsiOn"
+    # without "--" the fake refuses the text, as espeak-ng does
+    assert subprocess.run([sys.executable, FAKE, "--stdout", "-ciao"], capture_output=True).returncode != 0
+
+
+def test_batch_render_with_fake(tmp_path):
+    doc = tmp_path / "doc.json"
+    MessageDocument([MessagePreset(f"message {i}", "en", "175", "50", "100", "0") for i in range(4)]).save(doc)
+    report = render_document(
+        str(doc), str(tmp_path / "out"), jobs=2, out=io.StringIO(), engine_options={"executable": FAKE}
+    )
+    assert (report.rendered, report.failed) == (4, 0)
@@ -0,0 +1,457 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_main_screen.py                       #
+# ######################################### #
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_cache import AudioCache
+from app.engines import SynthesisEngine
+from app.espeak_ng_tui_app import EspeakNgTuiApp
+from app.main_screen import MainScreen
+from app.message_list import MessageList
+from app.preset_index import PresetIndex
+from app.preset_store import PresetReader, load_presets, save_presets
+from app.presets import MessagePreset
+from app.wav import pcm_to_wav
+
+
+def _presets(count: int) -> list[MessagePreset]:
+    return [
+        MessagePreset(text=f"message {i}", voice="it", speed="175", pitch="50", volume="100", word_gap="0")
+        for i in range(count)
+    ]
+
+
+def test_open_streams_presets_and_save_uses_a_snapshot(tmp_path):
+    path = tmp_path / "presets.json"
+    save_presets(str(path), _presets(5000))
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await pilot.press("ctrl+o")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            assert len(screen.query_one(MessageList)) == 5000
+            assert not screen.query_one("#load-progress").display
+
+            await pilot.press("ctrl+s")
+            del screen.document[0]  # editing goes on while the snapshot is saved
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return len(screen.document)
+
+    assert asyncio.run(main()) == 4999
+    assert len(load_presets(str(path))) == 5000
+
+
+def test_cancel_restores_previous_document(tmp_path, monkeypatch):
+    path = tmp_path / "presets.jsonl"
+    save_presets(str(path), _presets(10))
+    release = threading.Event()
+    batches = PresetReader.batches
+
+    def slow_batches(reader):
+        reader.batch_size = 4
+        for batch, progress in batches(reader):
+            yield batch, progress
+            release.wait(5)
+
+    monkeypatch.setattr(PresetReader, "batches", slow_batches)
+
+    async def cancel(pilot, screen):
+        await pilot.pause(0.2)
+        loading = len(screen.document)
+        await pilot.press("escape")
+        release.set()
+        await pilot.app.workers.wait_for_complete()
+        await pilot.pause()
+        release.clear()
+        return loading, len(screen.query_one(MessageList)), screen.query_one("#load-progress").display
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            # the document is opened after the first frame
+            initial = await cancel(pilot, screen)
+            screen.set_document(_presets(3))
+            await pilot.press("ctrl+o")
+            reopened = await cancel(pilot, screen)
+            return initial, reopened
+
+    initial, reopened = asyncio.run(main())
+    # the first batch was shown while loading
+    assert initial == (4, 0, False)
+    assert reopened == (4, 3, False)
+
+
+def test_changes_on_disk_are_reloaded_in_place(tmp_path):
+    path = tmp_path / "presets.jsonl"
+    presets = _presets(1000)
+    save_presets(str(path), presets)
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await pilot.press("ctrl+o")
+            await app.workers.wait_for_complete()
+            messages = screen.query_one(MessageList)
+            messages.scroll_to(y=500, animate=False, immediate=True)
+            messages.set_reactive(MessageList.cursor, 520)
+            store = screen.document
+
+            # another program inserts one message near the top and edits one below
+            edited = _presets(1000)
+            edited.insert(3, MessagePreset("new", "en", "175", "50", "100", "0"))
+            edited[700] = MessagePreset("changed", "en", "175", "50", "100", "0")
+            save_presets(str(path), edited)
+            screen.check_document_file()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+
+            parsed = [i for i, item in enumerate(store._items) if item is not None]
+            return (
+                screen.document is store,
+                list(store) == edited,
+                parsed,
+                messages.cursor,
+                messages.presets[messages.cursor].text,
+                messages.scroll_offset.y,
+            )
+
+    same, equal, parsed, cursor, text, scroll = asyncio.run(main())
+    assert same and equal
+    # besides the rows drawn, at the top and after scrolling, only the changed
+    # lines were read
+    assert [i for i in parsed if 10 <= i < 160 or 180 <= i != 700] == []
+    assert 3 in parsed and 700 in parsed
+    assert (cursor, text) == (521, "message 520")
+    assert scroll == 500 + MessageList.ROW_HEIGHT
+
+
+def test_changes_on_disk_do_not_replace_unsaved_edits(tmp_path):
+    path = tmp_path / "presets.json"
+    save_presets(str(path), _presets(3))
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await pilot.press("ctrl+o")
+            await app.workers.wait_for_complete()
+            screen.query_one("#add").press()
+            await pilot.pause()
+            save_presets(str(path), _presets(5))
+            screen.check_document_file()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return len(screen.document), [n.message for n in app._notifications]
+
+    count, notifications = asyncio.run(main())
+    assert count == 4
+    assert any("changed on disk" in message for message in notifications)
+
+
+def test_selecting_a_preset_recomputes_the_editor_once(tmp_path, monkeypatch):
+    path = tmp_path / "presets.json"
+    presets = [
+        MessagePreset(text=f"message {i}", voice="en", speed=str(100 + i), pitch="40", volume="90", word_gap="2")
+        for i in range(20)
+    ]
+    save_presets(str(path), presets)
+    counts = {"changed": 0, "preview": 0, "phonemes": 0, "prerender": 0}
+
+    def counting(name, method):
+        def wrapper(self, *args):
+            counts[name] += 1
+            return method(self, *args)
+        return wrapper
+
+    monkeypatch.setattr(MainScreen, "on_input_changed", counting("changed", MainScreen.on_input_changed))
+    monkeypatch.setattr(MainScreen, "update_preview", counting("preview", MainScreen.update_preview))
+    monkeypatch.setattr(MainScreen, "schedule_phonemes", counting("phonemes", MainScreen.schedule_phonemes))
+    monkeypatch.setattr(MainScreen, "schedule_prerender", counting("prerender", MainScreen.schedule_prerender))
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            messages = screen.query_one(MessageList)
+            messages.focus()
+            counts.update(dict.fromkeys(counts, 0))
+            for _ in range(5):
+                await pilot.press("down", "enter")
+            await pilot.pause()
+            return dict(counts), screen.current_parameters(), screen.query_one("#speed").value, screen.current_command
+
+    counted, params, speed, command = asyncio.run(main())
+    assert counted == {"changed": 0, "preview": 5, "phonemes": 5, "prerender": 5}
+    assert (params.text, params.voice, params.speed, params.word_gap) == ("message 4", "en", "104", "2")
+    assert speed == "104"
+    assert "-s 104" in command
+
+
+def test_add_warns_about_duplicates_and_ctrl_r_removes_them(tmp_path):
+    path = tmp_path / "presets.json"
+    presets = _presets(3)
+    presets.append(MessagePreset(text="message 1 ", voice="it", speed="175", pitch="50", volume="100", word_gap="0"))
+    save_presets(str(path), presets)
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            screen.apply_preset(MessagePreset("message 2", "it", "175", "50", "100", "0"))
+            screen.query_one("#add").press()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            # counted in a worker, then checked once ready
+            screen.query_one("#add").press()
+            await pilot.pause()
+            warnings = [n.message for n in app._notifications if n.severity == "warning"]
+            index_built = screen._index_ready
+            await pilot.press("ctrl+r")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            texts = [preset.text for preset in screen.document]
+            return warnings, index_built, texts, len(screen.query_one(MessageList)), screen.content_index
+
+    warnings, index_built, texts, shown, contents = asyncio.run(main())
+    assert warnings == [
+        "1 identical message(s) already stored, ctrl+r removes duplicates.",
+        "2 identical message(s) already stored, ctrl+r removes duplicates.",
+    ]
+    assert not index_built  # the search index is not needed
+    assert texts == ["message 0", "message 1", "message 2"]
+    assert shown == 3
+    assert contents.count(MessagePreset("message 2", "it", "175", "50", "100", "0")) == 1
+
+
+def test_removing_duplicates_keeps_jsonl_lines_unparsed(tmp_path):
+    path = tmp_path / "presets.jsonl"
+    save_presets(str(path), _presets(1000) + _presets(1000))
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            await pilot.press("ctrl+r")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            await pilot.press("ctrl+s")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            store = screen.document
+            return len(store), sum(item is not None for item in store._items)
+
+    count, parsed = asyncio.run(main())
+    assert count == 1000
+    assert parsed < 100  # only the rows shown
+    assert [preset.text for preset in load_presets(str(path))] == [f"message {i}" for i in range(1000)]
+
+
+class SlowEngine(SynthesisEngine):
+    name = "slow"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.rendered: list[str] = []
+        self.cancelled: list[str] = []
+
+    async def synthesize(self, params):
+        try:
+            await asyncio.sleep(0.3)
+        except asyncio.CancelledError:
+            self.cancelled.append(params.text)
+            raise
+        self.rendered.append(params.text)
+        return pcm_to_wav(b"\0\0", 22050)
+
+
+def test_editing_cancels_the_stale_prerender(tmp_path):
+    engine = SlowEngine()
+
+    async def main():
+        app = EspeakNgTuiApp(
+            str(tmp_path / "p.json"), AudioCache(tmp_path / "cache", 10**6), engine,
+            voices_path=None, prerender_delay=0.05,
+        )
+        async with app.run_test(size=(100, 40)) as pilot:
+            text = app.screen.query_one("#text")
+            text.value = "hello"
+            await pilot.pause(0.15)  # "hello" is being rendered
+            text.value = "hello world"
+            await pilot.pause(0.01)
+            # cancelled by the edit, before the idle timer of the new text fires
+            cancelled = list(engine.cancelled)
+            await pilot.pause(0.5)
+            return cancelled
+
+    assert asyncio.run(main()) == ["hello"]
+    assert engine.cancelled == ["hello"]
+    assert engine.rendered == ["hello world"]
+
+
+def test_invalid_numbers_are_reported_and_never_stored(tmp_path):
+    path = tmp_path / "presets.json"
+    save_presets(str(path), _presets(50))
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["messages"][7]["speed"] = "175.5"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    original = path.read_text(encoding="utf-8")
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            loaded = len(screen.document)
+            speed = screen.query_one("#speed")
+            speed.value = "175.5"
+            await pilot.pause()
+            valid = speed.is_valid
+            screen.query_one("#add").press()
+            screen.query_one("#play").press()
+            await pilot.pause()
+            added = len(screen.document)
+            speed.value = "180"
+            screen.query_one("#add").press()
+            await pilot.pause()
+            await pilot.press("ctrl+s")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return loaded, valid, added, len(screen.document), app.playback.depth, [n.message for n in app._notifications]
+
+    loaded, valid, added, count, depth, messages = asyncio.run(main())
+    assert loaded == 49
+    assert any("message 8" in message and "175.5" in message for message in messages)
+    assert not valid
+    assert (added, count, depth) == (49, 50, 0)
+    assert any("Speed must be a whole number" in message for message in messages)
+    assert any("not fully opened" in message for message in messages)
+    assert path.read_text(encoding="utf-8") == original
+
+
+def test_a_file_that_failed_to_open_is_not_overwritten(tmp_path):
+    path = tmp_path / "presets.json"
+    path.write_text('{"messages": [', encoding="utf-8")
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            screen.query_one("#add").press()
+            await pilot.pause()
+            await pilot.press("ctrl+s")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return len(screen.document), [n.message for n in app._notifications]
+
+    count, messages = asyncio.run(main())
+    assert count == 1
+    assert any(message.startswith("Cannot open") for message in messages)
+    assert any("not fully opened" in message for message in messages)
+    assert path.read_text(encoding="utf-8") == '{"messages": ['
+
+
+def test_a_file_rewritten_in_place_is_reloaded_instead_of_misread(tmp_path):
+    path = tmp_path / "presets.jsonl"
+    save_presets(str(path), _presets(1000))
+    original = path.read_bytes()
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await pilot.press("ctrl+o")
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            messages = screen.query_one(MessageList)
+            # same lines, one byte further: only the offsets are wrong
+            path.write_bytes(b"\n" + original)
+            messages.focus()
+            await pilot.press("end")
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return screen.document.stale, messages.presets[999].text, screen.document[998].text
+
+    assert asyncio.run(main()) == (False, "message 999", "message 998")
+
+
+def test_stop_works_while_typing(tmp_path, monkeypatch):
+    stops = []
+
+    async def main():
+        app = EspeakNgTuiApp(str(tmp_path / "p.json"), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            monkeypatch.setattr(app.playback, "stop", lambda: stops.append(True))
+            text = app.screen.query_one("#text")
+            text.focus()
+            await pilot.press("h", "i", "ctrl+t")
+            await pilot.pause()
+            return text.value, len(stops)
+
+    assert asyncio.run(main()) == ("hi", 1)
+
+
+def test_search_is_debounced_and_indexed_in_a_worker(tmp_path, monkeypatch):
+    path = tmp_path / "presets.jsonl"
+    save_presets(str(path), _presets(1000))
+    threads = []
+    extend = PresetIndex.extend
+
+    def recording_extend(index, presets):
+        threads.append(threading.current_thread())
+        extend(index, presets)
+
+    monkeypatch.setattr(PresetIndex, "extend", recording_extend)
+
+    async def main():
+        app = EspeakNgTuiApp(str(path), voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            search = screen.query_one("#search")
+            search.focus()
+            await pilot.press(*"message 99")
+            typed = screen.filtering
+            await pilot.pause(0.3)
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            messages = screen.query_one(MessageList)
+            found = [preset.text for preset in messages.presets]
+            # the results are the presets of the document: deleting one deletes it there
+            messages.remove_at(0)
+            await pilot.pause()
+            return typed, found, len(screen.document), "message 99" in [p.text for p in screen.document]
+
+    typed, found, count, kept = asyncio.run(main())
+    assert not typed  # nothing searched while typing
+    assert found == ["message 99", *(f"message {i}" for i in range(990, 1000))]
+    assert (count, kept) == (999, False)
+    assert threads and threading.main_thread() not in threads
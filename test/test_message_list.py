@@ -0,0 +1,75 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_message_list.py                      #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from textual.app import App, ComposeResult
+
+from app.message_list import MessageList
+from app.presets import MessagePreset
+
+
+def _presets(count: int) -> list[MessagePreset]:
+    return [MessagePreset(f"message {i}", "it", "175", "50", "100", "0") for i in range(count)]
+
+
+class ListApp(App):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events = []
+
+    def compose(self) -> ComposeResult:
+        yield MessageList(id="messages")
+
+    def on_message_list_selected(self, event: MessageList.Selected) -> None:
+        self.events.append(("selected", event.index, event.preset.text))
+
+    def on_message_list_deleted(self, event: MessageList.Deleted) -> None:
+        self.events.append(("deleted", event.index, event.preset.text))
+
+
+def test_large_document_mounts_no_row_widgets():
+    async def main():
+        app = ListApp()
+        async with app.run_test(size=(80, 30)) as pilot:
+            messages = app.query_one(MessageList)
+            messages.set_presets(_presets(100_000))
+            await pilot.pause()
+            assert len(messages) == 100_000
+            assert len(messages.children) == 0
+            assert messages.virtual_size.height == 100_000 * MessageList.ROW_HEIGHT
+
+    asyncio.run(main())
+
+
+def test_select_and_delete():
+    async def main():
+        app = ListApp()
+        async with app.run_test(size=(80, 30)) as pilot:
+            messages = app.query_one(MessageList)
+            messages.set_presets(_presets(10))
+            messages.focus()
+            await pilot.click(MessageList, offset=(2, 3))
+            await pilot.press("down", "enter", "delete")
+            await pilot.press("end", "delete")
+            await pilot.pause()
+            assert len(messages) == 8
+            assert messages.cursor == 7
+            return app.events
+
+    assert asyncio.run(main()) == [
+        ("selected", 1, "message 1"),
+        ("selected", 2, "message 2"),
+        ("deleted", 2, "message 2"),
+        ("deleted", 8, "message 9"),
+    ]
@@ -0,0 +1,160 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_metrics.py                           #
+# ######################################### #
+
+import asyncio
+import json
+import os
+import sys
+import threading
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_cache import AudioCache
+from app.command_builder import EspeakParameters
+from app.engines import SynthesisEngine
+from app.metrics import Metrics, MetricsServer, UtteranceTiming, mark, percentile
+from app.playback import PlaybackScheduler
+
+
+class MarkingEngine(SynthesisEngine):
+    name = "marking"
+
+    async def synthesize(self, params):
+        mark("command_build")
+        mark("spawn")
+        await asyncio.sleep(0.01)
+        mark("first_byte")
+        mark("synthesis_end", overwrite=True)
+        if params.text == "fail":
+            raise RuntimeError("boom")
+        return params.text.encode()
+
+    async def play_file(self, path):
+        await asyncio.sleep(0.001)
+
+    async def play_bytes(self, data):
+        await asyncio.sleep(0.001)
+
+
+def _timing(first_byte: float, **kwargs) -> UtteranceTiming:
+    timing = UtteranceTiming("speak", "subprocess", **kwargs)
+    timing.first_byte = first_byte
+    return timing
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert [percentile(values, q) for q in (50, 95, 99)] == [50, 95, 99]
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_summary_and_exports(tmp_path):
+    export = tmp_path / "metrics.jsonl"
+    metrics = Metrics(export_path=str(export))
+    for i in range(1, 101):
+        metrics.record(_timing(i / 1000, cache="hit" if i % 4 == 0 else "miss"))
+    metrics.record(_timing(5.0, error="boom"))
+    assert metrics.percentiles("first_byte") == {50: 0.05, 95: 0.095, 99: 0.099}
+    assert metrics.percentiles("spawn") is None
+    assert metrics.cache_hits() == (25, 101)
+    assert metrics.per_minute() == 101
+    assert len(export.read_text().splitlines()) == 101
+    assert json.loads(export.read_text().splitlines()[0])["cache"] == "miss"
+
+    text = metrics.prometheus_text()
+    assert 'estui_utterances_total{kind="speak",engine="subprocess",cache="hit"} 25' in text
+    assert 'estui_utterance_errors_total{kind="speak",engine="subprocess"} 1' in text
+    assert 'estui_utterance_seconds{phase="first_byte",quantile="0.5"} 0.050000' in text
+
+    prom = tmp_path / "metrics.prom"
+    Metrics(export_path=str(prom)).record(_timing(0.1))
+    assert "estui_utterance_seconds_count" in prom.read_text()
+
+
+def test_export_is_throttled_and_written_in_a_thread(tmp_path):
+    export = tmp_path / "metrics.jsonl"
+    metrics = Metrics(export_path=str(export), export_interval=0.2)
+    write = metrics._write
+    threads = []
+
+    def recording_write(*args):
+        threads.append(threading.get_ident())
+        write(*args)
+
+    metrics._write = recording_write
+
+    def lines():
+        return len(export.read_text().splitlines()) if export.exists() else 0
+
+    async def main():
+        seen = []
+        metrics.record(_timing(0.1))
+        await asyncio.sleep(0.05)
+        seen.append(lines())
+        for _ in range(10):
+            metrics.record(_timing(0.1))
+        await asyncio.sleep(0.05)
+        seen.append(lines())  # still waiting for the interval
+        await asyncio.sleep(0.2)
+        seen.append(lines())
+        metrics.record(_timing(0.1))
+        await metrics.close()
+        seen.append(lines())
+        return seen
+
+    assert asyncio.run(main()) == [1, 1, 11, 12]
+    assert len(threads) == 3
+    assert threading.get_ident() not in threads
+
+
+def test_scheduler_records_phases_and_cache_results(tmp_path):
+    async def main():
+        metrics = Metrics()
+        scheduler = PlaybackScheduler(MarkingEngine(), AudioCache(tmp_path, 10**6), metrics=metrics)
+        params = EspeakParameters(text="hello")
+        await scheduler.speak(params)
+        await scheduler.speak(params)
+        try:
+            await scheduler.speak(EspeakParameters(text="fail"))
+        except RuntimeError:
+            pass
+        return metrics
+
+    metrics = asyncio.run(main())
+    miss, hit, failed = metrics.records
+    assert (miss.kind, miss.engine, miss.cache, miss.chars) == ("speak", "marking", "miss", 5)
+    assert 0 <= miss.command_build <= miss.first_byte <= miss.synthesis_end <= miss.playback_end
+    assert hit.cache == "hit" and hit.spawn is None and hit.first_byte is not None
+    assert failed.error == "boom"
+
+
+def test_metrics_server():
+    async def main():
+        metrics = Metrics()
+        metrics.record(_timing(0.2))
+        server = MetricsServer(metrics, 0)
+        await server.start()
+        try:
+            responses = []
+            async with aiohttp.ClientSession() as session:
+                for path in ("/metrics", "/metrics.jsonl", "/other"):
+                    async with session.get(f"{server.url}{path}") as response:
+                        responses.append((response.status, response.content_type, await response.text()))
+            return responses
+        finally:
+            await server.close()
+
+    prometheus, jsonl, missing = asyncio.run(main())
+    assert prometheus[:2] == (200, "text/plain")
+    assert "estui_utterances_total" in prometheus[2]
+    assert jsonl[:2] == (200, "application/jsonl")
+    assert '"first_byte": 0.2' in jsonl[2]
+    assert missing[0] == 404
@@ -0,0 +1,94 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_phonemes.py                          #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.defaults import Defaults
+from app.engines import SynthesisEngine
+from app.espeak_ng_tui_app import EspeakNgTuiApp
+from app.phonemes import PhonemeCache
+from app.presets import MessagePreset
+
+
+class PhonemeEngine(SynthesisEngine):
+    name = "phonemes"
+
+    def __init__(self, delay: float = 0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls: list[tuple[str, str]] = []
+        self.cancelled = 0
+
+    async def phonemes(self, voice, text):
+        self.calls.append((voice, text))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"{voice}: {text.upper()}"
+
+
+def test_cache_keeps_the_most_recently_used_transcriptions():
+    engine = PhonemeEngine()
+    cache = PhonemeCache(engine, size=2)
+
+    async def main():
+        assert await cache.transcribe("it", "ciao") == "it: CIAO"
+        await cache.transcribe("en", "ciao")  # the voice is part of the key
+        await cache.transcribe("it", "ciao")
+        await cache.transcribe("it", "mondo")  # evicts en/ciao, the least recently used
+
+    asyncio.run(main())
+    assert engine.calls == [("it", "ciao"), ("en", "ciao"), ("it", "mondo")]
+    assert len(cache) == 2
+    assert cache.get("en", "ciao") is None
+    assert cache.get("it", "ciao") == "it: CIAO"
+
+
+def _phonemes(screen) -> str:
+    return str(screen.query_one("#phonemes").renderable)
+
+
+def test_pane_is_debounced_cancellable_and_cached(tmp_path):
+    engine = PhonemeEngine(delay=0.2)
+
+    async def main():
+        app = EspeakNgTuiApp(str(tmp_path / "p.json"), engine=engine, voices_path=None)
+        async with app.run_test(size=(100, 40)) as pilot:
+            screen = app.screen
+            text = screen.query_one("#text")
+            for typed in ("h", "he", "hel", "hello"):
+                text.value = typed
+                await pilot.pause(0.05)
+            await pilot.pause(Defaults.PHONEME_DELAY + 0.3)
+            text.value = "hello world"
+            await pilot.pause(Defaults.PHONEME_DELAY + 0.1)
+            # a new text cancels the transcription still running for the previous one
+            text.value = "hello there"
+            await pilot.pause(Defaults.PHONEME_DELAY + 0.3)
+            shown = _phonemes(screen)
+
+            screen.document.append(MessagePreset("hello", "it", "175", "50", "100", "0"))
+            screen.show_presets()
+            messages = screen.query_one("#messages")
+            messages.cursor = 0
+            messages.action_select()
+            await pilot.pause()
+            return shown, _phonemes(screen)
+
+    shown, selected = asyncio.run(main())
+    assert shown == "it: HELLO THERE"
+    assert selected == "it: HELLO"  # shown at once, without a new transcription
+    assert engine.calls == [("it", "hello"), ("it", "hello world"), ("it", "hello there")]
+    assert engine.cancelled == 1
@@ -0,0 +1,199 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_playback.py                          #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_cache import AudioCache
+from app.command_builder import EspeakParameters
+from app.engines import SynthesisEngine
+from app.playback import PlaybackScheduler
+
+
+class FakeEngine(SynthesisEngine):
+    """Engine recording what it is asked to do instead of making sound."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.events: list[tuple[str, str]] = []
+
+    async def speak(self, params):
+        self.events.append(("speak", params.text))
+        await asyncio.sleep(self.delay)
+        self.events.append(("done", params.text))
+
+    async def synthesize(self, params):
+        self.events.append(("synth", params.text))
+        await asyncio.sleep(self.delay)
+        return params.text.encode()
+
+    async def play_file(self, path):
+        await self.play_bytes(path.read_bytes())
+
+    async def play_bytes(self, data):
+        self.events.append(("play", data.decode()))
+        await asyncio.sleep(self.delay)
+
+
+async def _drain(scheduler: PlaybackScheduler) -> None:
+    while scheduler.depth:
+        await asyncio.sleep(0.001)
+
+
+def test_fifo_order():
+    async def main():
+        engine = FakeEngine()
+        scheduler = PlaybackScheduler(engine)
+        depths = []
+        scheduler.listeners.append(depths.append)
+        scheduler.start()
+        for text in "abc":
+            scheduler.enqueue(EspeakParameters(text=text))
+        assert scheduler.depth == 3
+        await _drain(scheduler)
+        await scheduler.close()
+        return engine.events, depths
+
+    events, depths = asyncio.run(main())
+    assert [e for e in events if e[0] == "speak"] == [("speak", "a"), ("speak", "b"), ("speak", "c")]
+    assert depths[-1] == 0
+
+
+def test_interrupt_and_stop():
+    async def main():
+        engine = FakeEngine(delay=10)
+        scheduler = PlaybackScheduler(engine)
+        scheduler.start()
+        scheduler.enqueue(EspeakParameters(text="long"))
+        await asyncio.sleep(0.01)
+        scheduler.interrupt = True
+        scheduler.enqueue(EspeakParameters(text="next"))
+        await asyncio.sleep(0.01)
+        assert scheduler.depth == 1
+        scheduler.stop()
+        await asyncio.sleep(0.01)
+        assert scheduler.depth == 0
+        await scheduler.close()
+        return engine.events
+
+    assert asyncio.run(main()) == [("speak", "long"), ("speak", "next")]
+
+
+def test_next_utterance_rendered_while_playing(tmp_path):
+    async def main():
+        engine = FakeEngine(delay=0.01)
+        scheduler = PlaybackScheduler(engine, AudioCache(tmp_path, 1024))
+        scheduler.start()
+        scheduler.enqueue(EspeakParameters(text="a"))
+        scheduler.enqueue(EspeakParameters(text="b"))
+        await _drain(scheduler)
+        await scheduler.close()
+        return engine.events
+
+    events = asyncio.run(main())
+    assert events.index(("synth", "b")) < events.index(("play", "a"))
+    assert events.count(("synth", "b")) == 1
+    assert events[-1] == ("play", "b")
+
+
+def test_cache_is_written_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    put = AudioCache.put
+
+    def recording_put(cache, key, data):
+        threads.append(threading.current_thread())
+        return put(cache, key, data)
+
+    monkeypatch.setattr(AudioCache, "put", recording_put)
+
+    async def main():
+        scheduler = PlaybackScheduler(FakeEngine(), AudioCache(tmp_path, 1024))
+        await scheduler.render(EspeakParameters(text="a"))
+        await scheduler.speak(EspeakParameters(text="b"))
+
+    asyncio.run(main())
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_utterance_queued_while_speaking_is_rendered_at_once(tmp_path):
+    async def main():
+        engine = FakeEngine(delay=0.05)
+        scheduler = PlaybackScheduler(engine, AudioCache(tmp_path, 1024))
+        scheduler.start()
+        scheduler.enqueue(EspeakParameters(text="a"))
+        await asyncio.sleep(0.07)  # "a" is being played, nothing is queued
+        scheduler.enqueue(EspeakParameters(text="b"))
+        await asyncio.sleep(0.01)
+        rendering = ("synth", "b") in engine.events
+        await _drain(scheduler)
+        await scheduler.close()
+        return rendering, engine.events
+
+    rendering, events = asyncio.run(main())
+    assert rendering  # while "a" is still playing
+    assert events == [("synth", "a"), ("play", "a"), ("synth", "b"), ("play", "b")]
+
+
+def test_speculate_cancels_stale_render(tmp_path):
+    async def main():
+        engine = FakeEngine(delay=0.05)
+        cache = AudioCache(tmp_path, 1024)
+        scheduler = PlaybackScheduler(engine, cache)
+        stale = scheduler.speculate(EspeakParameters(text="a"))
+        await asyncio.sleep(0)
+        fresh = scheduler.speculate(EspeakParameters(text="ab"))
+        await asyncio.gather(stale, fresh, return_exceptions=True)
+        return stale, fresh, cache
+
+    stale, fresh, cache = asyncio.run(main())
+    assert stale.cancelled()
+    assert not fresh.cancelled()
+    assert len(cache) == 1
+
+
+def test_cancel_speculation(tmp_path):
+    async def main():
+        engine = FakeEngine(delay=0.05)
+        cache = AudioCache(tmp_path, 1024)
+        scheduler = PlaybackScheduler(engine, cache)
+        stale = scheduler.speculate(EspeakParameters(text="a"))
+        await asyncio.sleep(0)
+        scheduler.cancel_speculation()
+        scheduler.cancel_speculation()  # nothing left to cancel
+        await asyncio.gather(stale, return_exceptions=True)
+        return stale, cache
+
+    stale, cache = asyncio.run(main())
+    assert stale.cancelled()
+    assert len(cache) == 0
+
+
+def test_speculation_in_use_is_not_cancelled(tmp_path):
+    async def main():
+        engine = FakeEngine(delay=0.05)
+        scheduler = PlaybackScheduler(engine, AudioCache(tmp_path, 1024))
+        scheduler.start()
+        render = scheduler.speculate(EspeakParameters(text="a"))
+        scheduler.enqueue(EspeakParameters(text="a"))
+        await asyncio.sleep(0.01)
+        scheduler.speculate(EspeakParameters(text="b"))
+        await _drain(scheduler)
+        await scheduler.close()
+        return render, engine.events
+
+    render, events = asyncio.run(main())
+    assert not render.cancelled()
+    assert events.count(("synth", "a")) == 1
+    assert ("play", "a") in events
@@ -0,0 +1,105 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_preset_index.py                      #
+# ######################################### #
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.preset_index import ContentIndex, PresetIndex, PresetQuery, parse_query, unique_positions
+from app.presets import MessagePreset
+
+
+def _presets() -> list[MessagePreset]:
+    return [
+        MessagePreset("Hello world", "en", "175", "50", "100", "0"),
+        MessagePreset("Ciao mondo", "it", "150", "40", "100", "0"),
+        MessagePreset("Buongiorno a tutti", "it", "200", "60", "100", "0"),
+        MessagePreset("Say hello again", "en", "300", "99", "100", "0"),
+        MessagePreset("Odd speed", "en", "fast", "50", "100", "0"),
+    ]
+
+
+def _texts(presets) -> list[str]:
+    return [preset.text for preset in presets]
+
+
+def test_parse_query():
+    query = parse_query("voice:it speed:140-200 pitch:40- ^Ciao  mondo")
+    assert query == PresetQuery("ciao mondo", True, "it", (140, 200), (40, None))
+    assert parse_query("speed:175").speed == (175, 175)
+    assert parse_query("").is_empty
+    with pytest.raises(ValueError):
+        parse_query("speed:abc")
+
+
+def test_text_search_is_substring_across_words():
+    index = PresetIndex()
+    index.extend(_presets())
+    assert _texts(index.search(parse_query("hello"))) == ["Hello world", "Say hello again"]
+    assert _texts(index.search(parse_query("lo wor"))) == ["Hello world"]
+    assert _texts(index.search(parse_query("^hello"))) == ["Hello world"]
+    assert index.search(parse_query("world again")) == []
+
+
+def test_parameter_filters():
+    index = PresetIndex()
+    index.extend(_presets())
+    assert _texts(index.search(parse_query("voice:it speed:140-180"))) == ["Ciao mondo"]
+    assert _texts(index.search(parse_query("pitch:60-"))) == ["Buongiorno a tutti", "Say hello again"]
+    # non numeric values never match a range
+    assert "Odd speed" not in _texts(index.search(parse_query("speed:0-")))
+    assert len(index.search(PresetQuery())) == 5
+
+
+def test_incremental_updates_keep_document_order():
+    presets = _presets()
+    index = PresetIndex()
+    index.extend(presets)
+    index.remove(presets[0])
+    added = MessagePreset("hello there", "en", "175", "50", "100", "0")
+    index.add(added)
+    assert _texts(index.search(parse_query("hello"))) == ["Say hello again", "hello there"]
+    index.add(presets[0], order=-1)
+    assert _texts(index.search(parse_query("hello"))) == ["Hello world", "Say hello again", "hello there"]
+    assert len(index) == 6
+
+
+def test_results_match_linear_scan():
+    presets = [
+        MessagePreset(f"message {i} {'abc' if i % 3 else 'xyz'}", "it" if i % 2 else "en", str(80 + i), "50", "100", "0")
+        for i in range(300)
+    ]
+    index = PresetIndex()
+    index.extend(presets)
+    for text in ("ge 1", "^message 2", "xyz", "voice:en speed:100-150 abc", "99 x"):
+        query = parse_query(text)
+        assert index.search(query) == [p for p in presets if query.matches(p)]
+
+
+def test_content_index_counts_duplicates():
+    presets = _presets()
+    copy = MessagePreset("Ciao  mondo ", "it", "0150", "40", "100", "0")
+    again = MessagePreset("Hello world", "en", "175", "50", "100", "0")
+    index = ContentIndex(presets)
+    assert len(index) == len(presets)
+    assert index.count(copy) == 1
+    index.add(copy)
+    index.add(again)
+    assert index.count(presets[1]) == 2
+    index.remove(presets[0])
+    assert index.count(again) == 1
+
+    positions, kept = unique_positions([*presets, copy, again])
+    assert positions == list(range(len(presets)))
+    assert len(kept) == len(presets)
+    assert kept.count(copy) == 1
+
@@ -0,0 +1,218 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_preset_store.py                      #
+# ######################################### #
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.presets import MessageDocument, MessagePreset
+from app.preset_store import (
+    JsonlPresetStore,
+    PresetReader,
+    StaleDocumentError,
+    _json_messages,
+    convert,
+    load_presets,
+    save_presets,
+)
+
+
+def _preset(text: str) -> MessagePreset:
+    return MessagePreset(text=text, voice="it", speed="175", pitch="50", volume="100", word_gap="0")
+
+
+def test_lazy_loading(tmp_path):
+    path = tmp_path / "m.jsonl"
+    save_presets(str(path), [_preset("a"), _preset("b"), _preset("c")])
+    store = JsonlPresetStore(str(path))
+    assert len(store) == 3
+    assert store._items == [None, None, None]
+    assert store[1] == _preset("b")
+    assert store._items[0] is None and store._items[2] is None
+    assert list(store) == [_preset("a"), _preset("b"), _preset("c")]
+
+
+def test_incremental_save_keeps_unchanged_lines(tmp_path):
+    path = tmp_path / "m.jsonl"
+    # hand formatted lines must survive byte for byte when left untouched
+    path.write_text(
+        '{"text": "a",   "voice": "it", "speed": "175", "pitch": "50", "volume": "100", "word_gap": "0"}\n'
+        '{"text": "b",   "voice": "it", "speed": "175", "pitch": "50", "volume": "100", "word_gap": "0"}\n'
+        '{"text": "c",   "voice": "it", "speed": "175", "pitch": "50", "volume": "100", "word_gap": "0"}\n',
+        encoding="utf-8",
+    )
+    original = path.read_text(encoding="utf-8").splitlines()
+    store = JsonlPresetStore(str(path))
+    store[1] = _preset("B")
+    del store[2]
+    store.append(_preset("d"))
+    store.save()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == original[0]
+    assert len(lines) == 3
+    assert list(JsonlPresetStore(str(path))) == [_preset("a"), _preset("B"), _preset("d")]
+    assert not store.modified
+    assert store[2] == _preset("d")
+    assert sorted(os.listdir(tmp_path)) == ["m.jsonl"]
+
+
+def test_slices(tmp_path):
+    path = tmp_path / "m.jsonl"
+    save_presets(str(path), [_preset(text) for text in "abcde"])
+    store = JsonlPresetStore(str(path))
+    assert store[1:3] == [_preset("b"), _preset("c")]
+    assert store[::-2] == [_preset("e"), _preset("c"), _preset("a")]
+    assert store._items[3] is None
+    store[1:3] = [_preset("X")]
+    del store[-1:]
+    assert len(store) == 3
+    store.save()
+    assert [preset.text for preset in JsonlPresetStore(str(path))] == ["a", "X", "d"]
+
+
+def test_last_line_without_newline(tmp_path):
+    path = tmp_path / "m.jsonl"
+    save_presets(str(path), [_preset("a"), _preset("b")])
+    path.write_bytes(path.read_bytes().rstrip(b"\n"))
+    store = JsonlPresetStore(str(path))
+    store.append(_preset("c"))
+    store.save()
+    assert list(JsonlPresetStore(str(path))) == [_preset("a"), _preset("b"), _preset("c")]
+
+
+def test_convert_round_trip(tmp_path):
+    presets = [_preset("a"), _preset("è")]
+    MessageDocument(presets).save(tmp_path / "m.json")
+    assert convert(str(tmp_path / "m.json"), str(tmp_path / "m.jsonl")) == 2
+    assert list(load_presets(str(tmp_path / "m.jsonl"))) == presets
+    convert(str(tmp_path / "m.jsonl"), str(tmp_path / "back.json"))
+    assert MessageDocument.load(tmp_path / "back.json").messages == presets
+
+
+def test_reader_batches(tmp_path):
+    for name in ("m.json", "m.jsonl"):
+        path = tmp_path / name
+        save_presets(str(path), [_preset(str(i)) for i in range(5)])
+        reader = PresetReader(str(path), batch_size=2)
+        batches = list(reader.batches())
+        assert len(reader.presets) == 0  # reading leaves the document alone
+        assert [progress for _, progress in batches][-1] == 1.0
+        assert [reader.add(batch) for batch, _ in batches] == [range(0, 2), range(2, 4), range(4, 5)]
+        assert list(reader.presets) == [_preset(str(i)) for i in range(5)]
+
+
+def test_reader_leaves_out_invalid_presets(tmp_path):
+    path = tmp_path / "m.json"
+    messages = [_preset(str(i)).to_dict() for i in range(5)]
+    messages[2]["speed"] = "175.5"
+    messages[4] = ["not", "a", "preset"]
+    path.write_text(json.dumps({"messages": messages}), encoding="utf-8")
+    reader = PresetReader(str(path))
+    for batch, _ in reader.batches():
+        reader.add(batch)
+    assert [preset.text for preset in reader.presets] == ["0", "1", "3"]
+    assert [error.split(":")[0] for error in reader.errors] == ["message 3", "message 5"]
+    assert "175.5" in reader.errors[0]
+
+
+def test_json_messages_are_parsed_as_the_file_is_read(tmp_path):
+    path = tmp_path / "m.json"
+    messages = [_preset(f"caffè {i} \U0001F603 \"x\"").to_dict() for i in range(50)]
+    data = {"version": 12345, "title": {"nested": [1, "]}"]}, "messages": messages, "end": []}
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    parsed = list(_json_messages(str(path), chunk_size=7))
+    assert [message for message, _ in parsed] == messages
+    assert parsed[0][1] < 0.1
+    assert [progress for _, progress in parsed] == sorted(progress for _, progress in parsed)
+
+    path.write_text('{"messages": []}', encoding="utf-8")
+    assert list(_json_messages(str(path))) == []
+    for text in (
+        "",
+        '{"messages": [{"text": "a"}',
+        '{"messages": {}}',
+        "[]",
+        '{1: 2}',
+        '{"messages": []} {"messages": []}',
+        '{} x',
+    ):
+        path.write_text(text, encoding="utf-8")
+        with pytest.raises(ValueError):
+            list(_json_messages(str(path), chunk_size=4))
+
+
+def test_json_numbers_are_not_cut_at_chunk_boundaries(tmp_path):
+    path = tmp_path / "m.json"
+    preset = json.dumps(_preset("a").to_dict())
+    path.write_text(f'{{"version": 1.25e+3, "ratio": -0.5, "messages": [{preset}], "last": 10}}\n', encoding="utf-8")
+    for chunk_size in range(1, 24):
+        assert [message for message, _ in _json_messages(str(path), chunk_size)] == [_preset("a").to_dict()]
+
+
+def test_snapshot_saves_while_store_is_edited(tmp_path):
+    path = tmp_path / "m.jsonl"
+    save_presets(str(path), [_preset("a"), _preset("b")])
+    store = JsonlPresetStore(str(path))
+    store.append(_preset("c"))
+    snapshot = store.snapshot()
+    store[0] = _preset("A")  # edited while the snapshot is being written
+    snapshot.save()
+    assert not store.adopt(snapshot)
+    assert list(JsonlPresetStore(str(path))) == [_preset("a"), _preset("b"), _preset("c")]
+    # the store still reads its unchanged lines from the file it was loaded from
+    assert store[1] == _preset("b") and store.modified
+
+    snapshot = store.snapshot()
+    snapshot.save()
+    assert store.adopt(snapshot) and not store.modified
+    assert list(JsonlPresetStore(str(path))) == [_preset("A"), _preset("b"), _preset("c")]
+    store._items = [None] * 3  # force reading every line back from the new file
+    assert list(store) == [_preset("A"), _preset("b"), _preset("c")]
+
+
+def test_snapshots_read_on_after_the_store_adopts_another(tmp_path):
+    path = tmp_path / "m.jsonl"
+    save_presets(str(path), [_preset(text) for text in "abc"])
+    store = JsonlPresetStore(str(path))
+    reading = store.snapshot()  # e.g. counted in a worker
+    store.append(_preset("d"))
+    saved = store.snapshot()
+    saved.save()
+    assert store.adopt(saved)
+    store.close()
+    assert list(reading) == [_preset(text) for text in "abc"]
+    reading.close()
+    assert list(store) == [_preset(text) for text in "abcd"]
+
+
+def test_lazy_reads_stop_once_the_file_changed_in_place(tmp_path):
+    path = tmp_path / "m.jsonl"
+    save_presets(str(path), [_preset(text) for text in "abc"])
+    original = path.read_bytes()
+    store = JsonlPresetStore(str(path))
+    assert store[0] == _preset("a")
+    # rewritten in place: every line moves by one byte
+    path.write_bytes(b"\n" + original)
+    with pytest.raises(StaleDocumentError):
+        store[2]
+    assert store.stale
+    with pytest.raises(StaleDocumentError):
+        store[1]
+    store.append(_preset("d"))
+    with pytest.raises(StaleDocumentError):
+        store.save()
+    assert path.read_bytes() == b"\n" + original
+    del store[3]
+    store.rebase(JsonlPresetStore(str(path)))
+    assert not store.stale
+    assert list(store) == [_preset(text) for text in "abc"]
@@ -8,10 +8,14 @@
 # ######################################### #
 
 import os
+import subprocess
 import sys
+
+import pytest
+
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from app.presets import MessagePreset
+from app.presets import NUMBER_CACHE_SIZE, MessagePreset, parameter_number
 
 
 def test_preset_fields():
@@ -30,3 +34,67 @@ def test_preset_fields():
     assert preset.volume == "100"
     assert preset.word_gap == "0"
 
+
+def test_preset_is_compact_and_interned():
+    a = MessagePreset("a", "".join(["i", "t"]), "".join(["1", "75"]), "50", "100", "0")
+    b = MessagePreset("b", "it", "175", "50", "100", "0")
+    assert not hasattr(a, "__dict__")
+    assert a.voice is b.voice
+    assert a.speed is b.speed
+    assert parameter_number(a.speed) == 175
+    assert parameter_number("fast") is None
+    assert parameter_number(" 050") == 50
+    for value in range(2 * NUMBER_CACHE_SIZE):
+        parameter_number(str(value))
+    assert parameter_number.cache_info().currsize <= NUMBER_CACHE_SIZE
+
+
+def test_dict_round_trip_is_lossless():
+    data = {"text": "hi", "voice": "en+f2", "speed": "0175", "pitch": " 50", "volume": "", "word_gap": "0"}
+    preset = MessagePreset.from_dict(data)
+    assert preset.to_dict() == data
+    assert list(preset.to_dict()) == ["text", "voice", "speed", "pitch", "volume", "word_gap"]
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"text": "hi", "voice": "en", "speed": "175", "pitch": "50", "volume": "100"},
+        {"text": "hi", "voice": "en", "speed": 175, "pitch": "50", "volume": "100", "word_gap": "0"},
+        ["hi", "en"],
+        {"text": "hi", "voice": "en", "speed": "fast", "pitch": "50", "volume": "100", "word_gap": "0"},
+        {"text": "hi", "voice": "en", "speed": "175", "pitch": "-5", "volume": "100", "word_gap": "0"},
+        {"text": "hi", "voice": "en", "speed": "175", "pitch": "50", "volume": "1e2", "word_gap": "0"},
+        {"text": "hi", "voice": "en", "speed": "175", "pitch": "50", "volume": "100", "word_gap": "\u0661"},
+    ],
+)
+def test_from_dict_rejects_invalid_presets(data):
+    with pytest.raises(ValueError):
+        MessagePreset.from_dict(data)
+
+
+def test_content_digest_is_stable_over_normalized_values():
+    preset = MessagePreset("Ciao  mondo\n", "it", "175", "50", "100", "0")
+    same = MessagePreset(" Ciao mondo", "it ", "0175", "50", "100", "00")
+    assert preset.content_digest() == same.content_digest()
+    # the same in every process, whatever the hash seed
+    script = (
+        "from app.presets import MessagePreset; "
+        "print(MessagePreset('Ciao mondo', 'it', '175', '50', '100', '0').content_digest())"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=root,
+        env={**os.environ, "PYTHONHASHSEED": "12345"},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+    assert digest == preset.content_digest()
+    for other in (
+        MessagePreset("Ciao mondo!", "it", "175", "50", "100", "0"),
+        MessagePreset("Ciao mondo", "en", "175", "50", "100", "0"),
+        MessagePreset("Ciao mondo", "it", "175", "51", "100", "0"),
+    ):
+        assert other.content_digest() != preset.content_digest()
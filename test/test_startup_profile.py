@@ -0,0 +1,54 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_startup_profile.py                   #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.espeak_ng_tui_app import EspeakNgTuiApp
+from app.presets import MessagePreset
+from app.preset_store import save_presets
+from app.startup_profile import StartupProfile
+
+
+def test_report_lists_phases_and_background_work():
+    profile = StartupProfile(start=0.0)
+    profile.phases = [("imports", 0.05), ("first frame", 0.2)]
+    profile._last = 0.25
+    profile.background = [("document", 0.4)]
+    profile.done("document")  # recorded once
+    assert [" ".join(line.split()) for line in profile.report().splitlines()] == [
+        "Start-up phases:",
+        "imports 50.0 ms",
+        "first frame 200.0 ms",
+        "total 250.0 ms",
+        "After the first frame (done at):",
+        "document 400.0 ms",
+    ]
+
+
+def test_document_is_opened_after_the_first_frame(tmp_path):
+    path = tmp_path / "presets.json"
+    save_presets(str(path), [MessagePreset("hi", "it", "175", "50", "100", "0")] * 10)
+
+    async def main():
+        profile = StartupProfile()
+        app = EspeakNgTuiApp(str(path), voices_path=None, profile=profile)
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            await app.workers.wait_for_complete()
+            await pilot.pause()
+            return len(app.screen.document), profile
+
+    count, profile = asyncio.run(main())
+    assert count == 10
+    assert [name for name, _ in profile.phases] == ["first frame"]
+    assert [name for name, _ in profile.background] == ["document"]
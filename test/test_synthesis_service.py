@@ -0,0 +1,129 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_synthesis_service.py                 #
+# ######################################### #
+
+import asyncio
+import os
+import sys
+
+import aiohttp
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.audio_cache import AudioCache
+from app.command_builder import EspeakParameters
+from app.engines import SynthesisEngine
+from app.synthesis_service import (
+    Overloaded,
+    SynthesisServer,
+    SynthesisService,
+    parse_parameters,
+)
+from app.wav import pcm_to_wav
+
+
+class SlowEngine(SynthesisEngine):
+    name = "slow"
+
+    def __init__(self, delay: float = 0.05) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls: list[str] = []
+
+    async def synthesize(self, params):
+        self.calls.append(params.text)
+        await asyncio.sleep(self.delay)
+        if params.text == "fail":
+            raise RuntimeError("espeak-ng exited with status 1")
+        return pcm_to_wav(params.text.encode(), 22050)
+
+
+def test_parse_parameters():
+    params = parse_parameters({"text": "hi\x07", "voice": "it", "speed": 180, "pitch": " 040"})
+    assert params == EspeakParameters(text="hi", voice="it", speed="180", pitch="40")
+    invalid = [
+        [], {"text": ""}, {"text": "a", "rate": "1"}, {"text": "a", "speed": 1.5},
+        {"text": "a", "speed": "fast"}, {"text": "a", "pitch": -1}, {"text": "a", "volume": "-5"},
+        {"text": "a", "word_gap": ""}, {"text": "a", "speed": "\uff11"},
+    ]
+    for data in invalid:
+        with pytest.raises(ValueError):
+            parse_parameters(data)
+
+
+def test_identical_requests_are_coalesced(tmp_path):
+    async def main():
+        engine = SlowEngine()
+        service = SynthesisService(engine, AudioCache(tmp_path, 10**6), workers=2)
+        params = EspeakParameters(text="hello")
+        results = await asyncio.gather(*(service.synthesize(params) for _ in range(5)))
+        again = await service.synthesize(params)
+        return engine, results, again
+
+    engine, results, again = asyncio.run(main())
+    assert engine.calls == ["hello"]
+    assert sorted(source for _, source in results) == ["coalesced"] * 4 + ["miss"]
+    assert len({data for data, _ in results}) == 1
+    assert again == (results[0][0], "hit")
+
+
+def test_workers_bound_concurrency_and_overload_is_shed():
+    async def main():
+        engine = SlowEngine()
+        service = SynthesisService(engine, workers=1, backlog=1)
+        first = asyncio.create_task(service.synthesize(EspeakParameters(text="a")))
+        second = asyncio.create_task(service.synthesize(EspeakParameters(text="b")))
+        await asyncio.sleep(0.01)
+        assert service.inflight == 2
+        assert engine.calls == ["a"]  # "b" waits for the only worker
+        with pytest.raises(Overloaded):
+            await service.synthesize(EspeakParameters(text="c"))
+        await asyncio.gather(first, second)
+        return service
+
+    service = asyncio.run(main())
+    assert service.stats()["rejected"] == 1
+    assert service.inflight == 0
+
+
+def test_http_api():
+    async def main():
+        server = SynthesisServer(SynthesisService(SlowEngine(0.01), workers=1, backlog=0), 0)
+        await server.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                url = f"{server.url}/synthesize"
+                async with session.post(url, json={"text": "hello", "voice": "en"}) as response:
+                    ok = (response.status, response.content_type, response.headers["X-Cache"], await response.read())
+                async with session.post(url, json={"text": "hi", "rate": 3}) as response:
+                    bad = [response.status]
+                async with session.post(url, json={"text": "hi", "speed": "fast"}) as response:
+                    bad.append(response.status)
+                async with session.post(url, json={"text": "fail"}) as response:
+                    failed = (response.status, (await response.json())["error"])
+                slow = [session.post(url, json={"text": f"t{i}"}) for i in range(3)]
+                statuses = []
+                for response in await asyncio.gather(*slow):
+                    statuses.append(response.status)
+                    if response.status == 503:
+                        assert response.headers["Retry-After"] == "1"
+                    response.release()
+                async with session.get(f"{server.url}/health") as response:
+                    health = await response.json()
+            return ok, bad, failed, statuses, health
+        finally:
+            await server.close()
+
+    ok, bad, failed, statuses, health = asyncio.run(main())
+    assert ok[:3] == (200, "audio/wav", "miss")
+    assert ok[3].startswith(b"RIFF")
+    assert bad == [400, 400]
+    assert failed[0] == 500 and "status 1" in failed[1]
+    assert statuses.count(200) == 1 and statuses.count(503) == 2
+    assert health["engine"] == "slow" and health["rejected"] == 2
@@ -0,0 +1,84 @@
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# test_voice_catalog.py                     #
+# ######################################### #
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from app.espeak_checker import EspeakNgChecker
+from app.voice_catalog import VoiceCatalog, VoiceValidator, parse_voices
+
+FAKE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "fake_espeak_ng.py")
+
+VOICES = """Pty Language       Age/Gender VoiceName          File                 Other Languages
+ 5  af              --/M      Afrikaans          gmw/af
+ 2  en-gb           --/M      English_(Great_Britain) gmw/en           (en 2)
+ 5  it              --/F      Italian            roa/it
+"""
+
+
+def _catalog() -> VoiceCatalog:
+    return VoiceCatalog(parse_voices(VOICES), ["f1", "m3", "klatt"])
+
+
+def test_parse_voices():
+    voices = parse_voices(VOICES)
+    assert [v.language for v in voices] == ["af", "en-gb", "it"]
+    assert voices[1].name == "English_(Great_Britain)"
+    assert voices[1].other_languages == ["en"]
+    assert (voices[2].file, voices[2].gender, voices[2].priority) == ("roa/it", "F", 5)
+
+
+def test_validation():
+    catalog = _catalog()
+    for spec in ("it", "IT", "Italian", "roa/it", "en", "en-gb+f1", "it+Klatt"):
+        assert catalog.is_valid(spec), spec
+    for spec in ("xx", "ital", "it+f9", "it+"):
+        assert not catalog.is_valid(spec), spec
+    assert [v.language for v in catalog.by_language("en")] == ["en-gb"]
+
+    validator = VoiceValidator()
+    assert validator.validate("anything").is_valid  # no catalog yet
+    validator.catalog = catalog
+    assert not validator.validate("xx").is_valid
+    assert validator.validate("").is_valid
+
+
+def test_suggest():
+    catalog = _catalog()
+    assert catalog.suggest("ita") == "italian"
+    assert catalog.suggest("Ita") == "Italian"
+    assert catalog.suggest("it+k") == "it+klatt"
+    assert catalog.suggest("en-") == "en-gb"
+    assert catalog.suggest("zz") is None
+    assert catalog.suggest("zz+f") is None
+
+
+def test_checker_builds_then_reuses_catalog(tmp_path):
+    path = tmp_path / "voices.json"
+    checker = EspeakNgChecker(FAKE)
+    catalog = checker.voice_catalog(str(path))
+    assert catalog.is_valid("it+f1")
+    data = json.loads(path.read_text())
+    assert FAKE in data["fingerprint"]
+
+    # a catalog saved for another binary or voice data is rebuilt
+    data["fingerprint"] = "other"
+    data["voices"] = []
+    path.write_text(json.dumps(data))
+    assert VoiceCatalog.load(str(path), "other").voices == []
+    assert len(checker.voice_catalog(str(path))) == len(catalog)
+
+    # an up to date catalog is read back without running espeak-ng
+    data = json.loads(path.read_text())
+    data["variants"] = ["only"]
+    path.write_text(json.dumps(data))
+    assert checker.voice_catalog(str(path)).variants == ["only"]
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# ######################################### #
+# Textual User Interface for ESpeak-NG      #
+#                                           #
+# Copyright 2025 - Oreste Riccardo Natale   #
+# Released under MIT License                #
+#                                           #
+# fake_espeak_ng.py                         #
+# ######################################### #
+
+"""Deterministic stand-in for ``espeak-ng``.
+
+It accepts the arguments produced by :func:`app.command_builder.compose_args`
+and :func:`~app.command_builder.phoneme_args`, plus ``--version`` and ``--voices``. With ``--stdout`` it writes a WAV whose
+duration follows the text length and speed, like real speech would; without
+it nothing is played. ``-x`` prints pseudo phonemes, one line per clause. Behaviour is configured through the environment:
+
+``FAKE_ESPEAK_DELAY``
+    seconds spent before producing any audio (default 0)
+``FAKE_ESPEAK_DELAY_PER_CHAR``
+    additional seconds per character of text, spread over the stream (default 0)
+``FAKE_ESPEAK_SAMPLE_RATE``
+    sample rate of the WAV (default 22050)
+``FAKE_ESPEAK_FAIL_TEXT``
+    fail when the text contains this string
+``FAKE_ESPEAK_FAIL_RATE``
+    fraction of texts that fail, chosen by hashing the text (default 0)
+``FAKE_ESPEAK_SEED``
+    changes which texts fail with ``FAKE_ESPEAK_FAIL_RATE``
+``FAKE_ESPEAK_EXIT_CODE``
+    exit status of a failure (default 1)
+``FAKE_ESPEAK_LOG``
+    file receiving one JSON line per invocation with its arguments
+
+Use it with ``python estui.py --espeak tools/fake_espeak_ng.py``.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.wav import wav_header
+
+VERSION = "eSpeak NG text-to-speech: 1.51-fake  Data at: {data}"
+CHARS_PER_WORD = 5
+CHUNKS = 8
+PHONEMES = str.maketrans({"c": "k", "e": "E", "j": "dZ", "o": "O", "q": "k", "x": "ks", "y": "j"})
+
+VOICES = """Pty Language       Age/Gender VoiceName          File                 Other Languages
+ 5  de              --/M      German             gmw/de
+ 2  en-gb           --/M      English_(Great_Britain) gmw/en           (en 2)
+ 2  en-us           --/M      English_(America)  gmw/en-US            (en 3)
+ 5  fr-fr           --/M      French_(France)    roa/fr               (fr 5)
+ 5  it              --/M      Italian            roa/it
+"""
+
+VARIANTS = """Pty Language       Age/Gender VoiceName          File                 Other Languages
+ 5  variant         --/F      female1            !v/f1
+ 5  variant         --/F      female2            !v/f2
+ 5  variant         --/M      male1              !v/m1
+ 5  variant         --/M      klatt              !v/klatt
+"""
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="espeak-ng", add_help=False)
+    parser.add_argument("-v", dest="voice", default="en")
+    parser.add_argument("-s", dest="speed", type=int, default=175)
+    parser.add_argument("-p", dest="pitch", type=int, default=50)
+    parser.add_argument("-a", dest="volume", type=int, default=100)
+    parser.add_argument("-g", dest="word_gap", type=int, default=0)
+    parser.add_argument("-q", dest="quiet", action="store_true")
+    parser.add_argument("-x", dest="phonemes", action="store_true")
+    parser.add_argument("--stdout", action="store_true")
+    parser.add_argument("--version", action="store_true")
+    parser.add_argument("--voices", nargs="?", const="")
+    parser.add_argument("text", nargs="?", default="")
+    # like espeak-ng, a text starting with "-" must follow "--"
+    return parser.parse_args(argv)
+
+
+def duration(text: str, speed: int, word_gap: int) -> float:
+    """Return the seconds real speech of ``text`` would last at ``speed`` words/min."""
+    words = len(text.split())
+    return len(text) / CHARS_PER_WORD * 60 / max(speed, 1) + words * word_gap * 0.01
+
+
+def phonemes(text: str) -> str:
+    """Return made-up phonemes of ``text``: each clause on a line, each word stressed."""
+    lines = []
+    for clause in re.split(r"[.,;:!?]+", text):
+        words = ["'" + word.lower().translate(PHONEMES) for word in clause.split()]
+        if words:
+            lines.append(" " + " ".join(words))
+    return "\n".join(lines)
+
+
+def should_fail(text: str) -> bool:
+    fail_text = os.environ.get("FAKE_ESPEAK_FAIL_TEXT")
+    if fail_text and fail_text in text:
+        return True
+    rate = float(os.environ.get("FAKE_ESPEAK_FAIL_RATE", "0"))
+    if rate <= 0:
+        return False
+    seed = os.environ.get("FAKE_ESPEAK_SEED", "")
+    digest = hashlib.sha256(f"{seed}\0{text}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64 < rate
+
+
+def tone(sample_rate: int, samples: int, pitch: int, volume: int) -> bytes:
+    """Return ``samples`` of a square wave whose frequency follows ``pitch``."""
+    period = max(2, sample_rate // (100 + 4 * pitch))
+    amplitude = min(32767, 80 * volume)
+    half = period // 2
+    cycle = (amplitude.to_bytes(2, "little", signed=True) * half
+             + (-amplitude).to_bytes(2, "little", signed=True) * (period - half))
+    repeats = math.ceil(samples / period)
+    return (cycle * repeats)[:samples * 2]
+
+
+def main(argv: list[str]) -> int:
+    args = parse_args(argv)
+    data_dir = os.path.dirname(os.path.abspath(__file__))
+    if args.version:
+        print(VERSION.format(data=data_dir))
+        return 0
+    if args.voices is not None:
+        print(VARIANTS if args.voices == "variant" else VOICES, end="")
+        return 0
+    log = os.environ.get("FAKE_ESPEAK_LOG")
+    if log:
+        with open(log, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"args": argv, "pid": os.getpid()}) + "\n")
+
+    delay = float(os.environ.get("FAKE_ESPEAK_DELAY", "0"))
+    per_char = float(os.environ.get("FAKE_ESPEAK_DELAY_PER_CHAR", "0")) * len(args.text)
+    time.sleep(delay)
+    if should_fail(args.text):
+        time.sleep(per_char)
+        print(f"espeak-ng: injected failure for {args.text!r}", file=sys.stderr)
+        return int(os.environ.get("FAKE_ESPEAK_EXIT_CODE", "1"))
+
+    if args.phonemes:
+        time.sleep(per_char)
+        print(phonemes(args.text))
+        return 0
+    sample_rate = int(os.environ.get("FAKE_ESPEAK_SAMPLE_RATE", "22050"))
+    samples = round(duration(args.text, args.speed, args.word_gap) * sample_rate)
+    pcm = tone(sample_rate, samples, args.pitch, args.volume)
+    if not args.stdout:
+        time.sleep(per_char)
+        return 0
+    out = sys.stdout.buffer
+    out.write(wav_header(sample_rate, len(pcm)))
+    # the audio is produced progressively, like espeak-ng does
+    step = math.ceil(len(pcm) / CHUNKS / 2) * 2
+    for index in range(CHUNKS):
+        time.sleep(per_char / CHUNKS)
+        out.write(pcm[index * step:(index + 1) * step])
+        out.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))